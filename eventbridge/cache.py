@@ -0,0 +1,89 @@
+"""
+Topology cache for AWS EventBridge Explorer.
+This module contains the TTL cache of topology snapshots keyed by account, region and event bus.
+"""
+
+import threading
+import time
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+from eventbridge.topology import TopologySnapshot
+
+
+class TopologyCache:
+    """Thread-safe TTL cache of topology snapshots.
+
+    Keys are (account, region, event bus) tuples. Concurrent requests for the
+    same key share a single crawl instead of each starting their own.
+    """
+
+    def __init__(self, ttl: float = 300):
+        """Initialize the cache.
+
+        Args:
+            ttl: Seconds a snapshot stays fresh; 0 disables caching
+        """
+        self.ttl = ttl
+        self._entries: Dict[Hashable, Tuple[float, TopologySnapshot]] = {}
+        self._lock = threading.Lock()
+        self._key_locks: Dict[Hashable, threading.Lock] = {}
+
+    def get(self, key: Hashable) -> Optional[TopologySnapshot]:
+        """Get a fresh snapshot for a key, or None if it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, snapshot = entry
+        if time.monotonic() - stored_at > self.ttl:
+            return None
+        return snapshot
+
+    def put(self, key: Hashable, snapshot: TopologySnapshot) -> None:
+        """Store a snapshot for a key."""
+        with self._lock:
+            self._entries[key] = (time.monotonic(), snapshot)
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        """Drop one key, or every key when none is given."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def get_or_build(self, key: Hashable, builder: Callable[[], TopologySnapshot],
+                     force_refresh: bool = False) -> TopologySnapshot:
+        """Get a fresh snapshot for a key, building it at most once at a time.
+
+        Args:
+            key: Cache key, usually (account, region, event bus)
+            builder: Callable that crawls the bus and returns a new snapshot
+            force_refresh: Rebuild even if a fresh snapshot is cached
+
+        Returns:
+            The cached or newly built snapshot
+        """
+        if not force_refresh:
+            snapshot = self.get(key)
+            if snapshot is not None:
+                return snapshot
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        requested_at = time.monotonic()
+        with key_lock:
+            # Another request may have finished the crawl while we waited
+            with self._lock:
+                entry = self._entries.get(key)
+            if entry is not None and entry[0] >= requested_at:
+                return entry[1]
+            if not force_refresh:
+                snapshot = self.get(key)
+                if snapshot is not None:
+                    return snapshot
+
+            snapshot = builder()
+            self.put(key, snapshot)
+            return snapshot
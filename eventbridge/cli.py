@@ -6,8 +6,75 @@ CLI entry point for AWS EventBridge Explorer.
 import sys
 import os
 import argparse
+import datetime
 import time
 
+
+def parse_time(value):
+    """Parse a Unix timestamp in seconds or an ISO 8601 time (UTC unless it has an offset)."""
+    try:
+        return int(float(value))
+    except ValueError:
+        pass
+    parsed = datetime.datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=datetime.timezone.utc)
+    return int(parsed.timestamp())
+
+
+def run_export(args, explorer):
+    """Export the logs selected by the export subcommand to a file."""
+    from eventbridge.export import export_to_file
+    
+    log_group = args.log_group or explorer.target_log_group_name(args.target_arn or '')
+    if not log_group:
+        print("Error: --log-group or a Lambda or Step Functions --target-arn is required")
+        return 2
+    
+    end_time = parse_time(args.end) if args.end else int(time.time())
+    start_time = parse_time(args.start) if args.start else end_time - int(args.hours * 3600)
+    output = args.output or "{}_{}_{}.ndjson.gz".format(log_group.strip('/').replace('/', '_'), start_time, end_time)
+    
+    exporter = explorer.create_log_exporter(log_group, search_term=args.search_term,
+                                            search_terms=args.search_terms, search_regex=args.search_regex,
+                                            max_workers=args.workers)
+    print("Exporting {} from {} to {} into {}".format(log_group, start_time, end_time, output))
+    try:
+        result = export_to_file(exporter, start_time, end_time, output, resume=not args.restart)
+    except KeyboardInterrupt:
+        print("Interrupted; run the same command again to resume.")
+        return 130
+    except Exception as e:
+        print("Error: {}. Run the same command again to resume.".format(e))
+        return 1
+    
+    print(result['message'])
+    print("Queries: {queries}, splits: {splits}, truncated slices: {truncated_slices}".format(**exporter.stats))
+    return 0 if result['success'] else 1
+
+
+def run_publish(args, explorer):
+    """Publish the events of an NDJSON file (or stdin) in PutEvents batches."""
+    publisher = explorer.create_event_publisher(args.event_bus, rate=args.rate, max_workers=args.workers)
+    source = sys.stdin if args.input == '-' else open(args.input, encoding='utf-8')
+    print("Publishing events from {} to {}{}".format(
+        'stdin' if args.input == '-' else args.input, args.event_bus,
+        " at {} events/s".format(args.rate) if args.rate else ''))
+    try:
+        with source:
+            result = publisher.publish(source)
+    except KeyboardInterrupt:
+        print("Interrupted.")
+        return 130
+    
+    print(result['message'])
+    print("Batches: {batches}, calls: {calls}, retried entries: {retried}".format(**result))
+    print("PutEvents latency (ms): p50 {p50}, p90 {p90}, p99 {p99}, max {max}".format(**result['latency_ms']))
+    for code, count in sorted(result['errors'].items()):
+        print("  {}: {}".format(code, count))
+    return 0 if result['success'] else 1
+
+
 def main():
     """Main entry point for the application."""
     parser = argparse.ArgumentParser(
@@ -17,14 +84,110 @@ def main():
     
     parser.add_argument('--port', '-p', type=int, default=5050,
                         help='Port for web server')
+    parser.add_argument('--max-in-flight', type=int, default=8,
+                        help='Maximum concurrent AWS calls when fetching rule targets')
+    parser.add_argument('--max-pool-connections', type=int, default=50,
+                        help='HTTP connections kept per shared AWS client')
+    parser.add_argument('--cache-ttl', type=float, default=300,
+                        help='Seconds to reuse a crawled event bus topology (0 disables caching)')
+    parser.add_argument('--inventory', action='store_true',
+                        help='Persist crawled topologies on disk and start from the last-known state')
+    parser.add_argument('--inventory-path', default=None,
+                        help='SQLite file for --inventory (defaults to the user cache directory)')
+    parser.add_argument('--targets', default='',
+                        help='Comma-separated profile:region pairs for multi-region crawls, '
+                             'e.g. prod:us-east-1,prod:eu-west-1,dev:us-east-1')
+    parser.add_argument('--max-concurrent-queries', type=int, default=10,
+                        help='Maximum Logs Insights queries running at once')
+    parser.add_argument('--query-timeout', type=float, default=30,
+                        help='Seconds a Logs Insights query may run before it is stopped')
+    parser.add_argument('--query-shards', type=int, default=8,
+                        help='Time slices per sharded log search (opt in with "sharded": true)')
+    parser.add_argument('--log-cache-mb', type=float, default=32,
+                        help='Memory for cached log query results of closed time buckets')
+    parser.add_argument('--log-index-mb', type=float, default=64,
+                        help='Memory for the local search index over fetched log windows')
+    parser.add_argument('--filter-window', type=int, default=3600,
+                        help='Longest target log search window (seconds) answered with FilterLogEvents '
+                             'instead of Logs Insights')
+    parser.add_argument('--fake-aws', action='store_true',
+                        help='Run offline against an in-process fake AWS account with synthetic rules and logs')
+    parser.add_argument('--fake-rules', type=int, default=10000,
+                        help='Rules in the fake account for --fake-aws')
+    parser.add_argument('--fake-latency', type=float, default=0.0,
+                        help='Seconds each fake AWS call takes for --fake-aws')
+    parser.add_argument('--fake-throttle', type=float, default=0.0,
+                        help='Probability that a fake AWS call is throttled for --fake-aws')
+    
+    subparsers = parser.add_subparsers(dest='command')
+    export_parser = subparsers.add_parser(
+        'export', help='Export all logs of a time range as gzip-compressed NDJSON instead of starting the server')
+    export_parser.add_argument('--log-group', help='Log group to export')
+    export_parser.add_argument('--target-arn', help='Lambda or Step Functions target whose log group to export')
+    export_parser.add_argument('--start', help='Start time, Unix seconds or ISO 8601 (default: --hours before --end)')
+    export_parser.add_argument('--end', help='End time, Unix seconds or ISO 8601 (default: now)')
+    export_parser.add_argument('--hours', type=float, default=6, help='Length of the range if --start is not given')
+    export_parser.add_argument('--search-term', help='Only export rows containing this term')
+    export_parser.add_argument('--search-terms', nargs='+', default=[], help='Only export rows containing any of these')
+    export_parser.add_argument('--search-regex', help='Only export rows matching this regular expression')
+    export_parser.add_argument('--workers', type=int, default=4, help='Time slices queried at once')
+    export_parser.add_argument('--output', '-o', help='Output file (default: derived from log group and range)')
+    export_parser.add_argument('--restart', action='store_true',
+                               help='Ignore the checkpoint of an interrupted export and start over')
+    
+    publish_parser = subparsers.add_parser(
+        'publish', help='Send the events of an NDJSON file in PutEvents batches instead of starting the server')
+    publish_parser.add_argument('input', help='NDJSON file with one event or PutEvents entry per line, - for stdin')
+    publish_parser.add_argument('--event-bus', default='default', help='Bus for events that do not name one')
+    publish_parser.add_argument('--rate', type=float, help='Target events per second (default: as fast as possible)')
+    publish_parser.add_argument('--workers', type=int, default=8, help='Batches sent at once')
     
     args = parser.parse_args()
     
+    from eventbridge import clients, insights
     from eventbridge.core import EventBridgeExplorer
+    from eventbridge.fanout import parse_crawl_targets
+    from eventbridge.insights_cache import InsightsResultCache
+    from eventbridge.inventory import InventoryStore
+    from eventbridge.log_engine import LogEngineSelector
+    from eventbridge.log_index import LogWindowIndex
     from eventbridge.web_server import EventBridgeWebServer
     
+    # Serve every AWS call from a synthetic account instead of the real one
+    if args.fake_aws:
+        from eventbridge.fake_aws import FakeAWSBackend
+        backend = FakeAWSBackend.synthetic(rules=args.fake_rules, latency=args.fake_latency,
+                                           throttle_probability=args.fake_throttle)
+        backend.install(clients.registry)
+        print("Using a fake AWS account with {} rules".format(args.fake_rules))
+    
+    # Size the shared client pools so concurrent crawls do not wait for connections
+    clients.registry.configure(max_pool_connections=max(args.max_pool_connections, args.max_in_flight))
+    
+    # Cap the Logs Insights queries of all code paths together
+    insights.runner = insights.InsightsQueryRunner(max_concurrent=args.max_concurrent_queries,
+                                                   default_timeout=args.query_timeout)
+    
+    # Open the persistent inventory store if requested
+    inventory_store = None
+    if args.inventory or args.inventory_path:
+        inventory_store = InventoryStore(args.inventory_path)
+        print("Using inventory store at {}".format(inventory_store.path))
+    
     # Initialize the core explorer
-    explorer = EventBridgeExplorer()
+    explorer = EventBridgeExplorer(max_in_flight=args.max_in_flight, cache_ttl=args.cache_ttl,
+                                   inventory_store=inventory_store,
+                                   crawl_targets=parse_crawl_targets(args.targets),
+                                   query_timeout=args.query_timeout,
+                                   insights_cache=InsightsResultCache(max_bytes=int(args.log_cache_mb * 1024 * 1024)),
+                                   query_shards=args.query_shards,
+                                   log_index=LogWindowIndex(max_bytes=int(args.log_index_mb * 1024 * 1024)),
+                                   engine_selector=LogEngineSelector(max_filter_window_seconds=args.filter_window))
+    
+    if args.command == 'export':
+        sys.exit(run_export(args, explorer))
+    if args.command == 'publish':
+        sys.exit(run_publish(args, explorer))
     
     # Initialize the web server
     web_server = EventBridgeWebServer(port=args.port, explorer=explorer)
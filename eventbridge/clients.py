@@ -0,0 +1,124 @@
+"""
+Shared AWS clients for AWS EventBridge Explorer.
+This module contains the process-wide registry that hands out one boto3 client
+per service, region and profile instead of building a new client per call.
+"""
+
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import boto3
+from botocore.config import Config
+
+DEFAULT_MAX_POOL_CONNECTIONS = 50
+DEFAULT_CONNECT_TIMEOUT = 5
+DEFAULT_READ_TIMEOUT = 60
+
+# Every call site also retries throttling with retry.call_with_backoff (5 attempts),
+# so botocore makes at most 2 attempts per call: one retry of a throttled, dropped or
+# 5xx request. A call therefore makes at most 2 x 5 = 10 requests. Adaptive mode
+# additionally rate-limits requests on the client once AWS starts throttling.
+DEFAULT_MAX_ATTEMPTS = 2
+
+
+class ClientRegistry:
+    """Thread-safe registry of boto3 clients keyed by (service, region, profile).
+
+    boto3 clients are thread-safe once built, but sessions are not, so client
+    construction happens under a lock and each profile gets its own session.
+    Clients are created with a shared tuned Config: a larger connection pool,
+    adaptive retries with a small attempt budget and explicit timeouts.
+    """
+
+    def __init__(self, max_pool_connections: int = DEFAULT_MAX_POOL_CONNECTIONS,
+                 connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+                 read_timeout: float = DEFAULT_READ_TIMEOUT,
+                 max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+                 session_factory: Callable[..., Any] = boto3.session.Session):
+        """Initialize the registry.
+
+        Args:
+            max_pool_connections: HTTP connections kept per client
+            connect_timeout: Seconds to wait for a connection
+            read_timeout: Seconds to wait for a response
+            max_attempts: Attempts botocore makes per request, including its own retries
+            session_factory: Callable creating a boto3 session for a named profile
+
+        Setting client_factory to a callable taking (service, region, profile)
+        makes the registry hand out its clients instead, e.g. a fake backend's.
+        """
+        self._lock = threading.Lock()
+        self._clients: Dict[Tuple[str, Optional[str], Optional[str]], Any] = {}
+        self._sessions: Dict[str, Any] = {}
+        self.session_factory = session_factory
+        self.client_factory: Optional[Callable[..., Any]] = None
+        self.configure(max_pool_connections=max_pool_connections, connect_timeout=connect_timeout,
+                       read_timeout=read_timeout, max_attempts=max_attempts)
+
+    def configure(self, max_pool_connections: Optional[int] = None, connect_timeout: Optional[float] = None,
+                  read_timeout: Optional[float] = None, max_attempts: Optional[int] = None) -> None:
+        """Change the client settings. Existing clients are dropped so new ones pick them up."""
+        with self._lock:
+            current = getattr(self, '_settings', {})
+            self._settings = {
+                'max_pool_connections': max_pool_connections or current.get('max_pool_connections'),
+                'connect_timeout': connect_timeout or current.get('connect_timeout'),
+                'read_timeout': read_timeout or current.get('read_timeout'),
+                'max_attempts': max_attempts or current.get('max_attempts'),
+            }
+            self.config = Config(
+                max_pool_connections=self._settings['max_pool_connections'],
+                connect_timeout=self._settings['connect_timeout'],
+                read_timeout=self._settings['read_timeout'],
+                retries={'mode': 'adaptive', 'total_max_attempts': self._settings['max_attempts']},
+            )
+            self._clients.clear()
+
+    @property
+    def max_pool_connections(self) -> int:
+        """HTTP connections kept per client."""
+        return self._settings['max_pool_connections']
+
+    def get_client(self, service: str, region: Optional[str] = None, profile: Optional[str] = None):
+        """Get the shared client for a service, region and profile, creating it on first use.
+
+        Args:
+            service: AWS service name, e.g. 'events' or 'logs'
+            region: AWS region, None for the environment default
+            profile: AWS profile, None for the environment default credentials
+        """
+        key = (service, region, profile)
+        client = self._clients.get(key)
+        if client is not None:
+            return client
+
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                if self.client_factory is not None:
+                    client = self.client_factory(service, region, profile)
+                elif profile is None:
+                    client = boto3.client(service, region_name=region, config=self.config)
+                else:
+                    session = self._sessions.get(profile)
+                    if session is None:
+                        session = self.session_factory(profile_name=profile)
+                        self._sessions[profile] = session
+                    client = session.client(service, region_name=region, config=self.config)
+                self._clients[key] = client
+            return client
+
+    def clear(self) -> None:
+        """Drop all clients and sessions."""
+        with self._lock:
+            self._clients.clear()
+            self._sessions.clear()
+
+
+# Process-wide registry used by every code path
+registry = ClientRegistry()
+
+
+def get_client(service: str, region: Optional[str] = None, profile: Optional[str] = None):
+    """Get a shared client from the process-wide registry."""
+    return registry.get_client(service, region=region, profile=profile)
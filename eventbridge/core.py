@@ -4,42 +4,113 @@ Core functionality for AWS EventBridge Explorer.
 This module contains the core logic for fetching and processing EventBridge data.
 """
 
-import boto3
 import networkx as nx
 import json
 import datetime
+import threading
 import time
-from typing import Dict, List, Any, Tuple, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from eventbridge import insights
+from eventbridge.cache import TopologyCache
+from eventbridge.clients import get_client
+from eventbridge.crawler import AccountCrawler, AccountInventory
+from eventbridge.export import LogExporter
+from eventbridge.fanout import CrawlTarget, FanoutEngine, MultiRegionInventory
+from eventbridge.insights import InsightsQueryRunner
+from eventbridge.insights_cache import InsightsResultCache
+from eventbridge.inventory import InventoryStore
+from eventbridge.log_catalog import LogGroupCatalog
+from eventbridge.log_engine import ENGINE_FILTER, ENGINE_INSIGHTS, LogEngineSelector
+from eventbridge.log_index import LogWindowIndex
+from eventbridge.overlap import SUBSUMED, analyze_rule_overlaps
+from eventbridge.patterns import normalize_event
+from eventbridge.publisher import EventPublisher
+from eventbridge.retry import call_with_backoff
+from eventbridge.routing import RuleRoutingIndex
+from eventbridge.search import compile_search
+from eventbridge.tail import format_log_event
+from eventbridge.topology import TopologySnapshot
+
+# Logs Insights accepts at most 50 log groups per query and returns at most 10,000 rows
+MAX_LOG_GROUPS_PER_QUERY = 50
+MAX_INSIGHTS_RESULTS = 10000
+
 
 class EventBridgeExplorer:
     """Core class for AWS EventBridge exploration logic."""
     
-    def __init__(self):
-        """Initialize the EventBridge explorer."""
+    def __init__(self, max_in_flight: int = 8, cache_ttl: float = 300,
+                 inventory_store: Optional[InventoryStore] = None,
+                 crawl_targets: Optional[List[CrawlTarget]] = None,
+                 query_runner: Optional[InsightsQueryRunner] = None, query_timeout: float = 30,
+                 insights_cache: Optional[InsightsResultCache] = None, query_shards: int = 8,
+                 log_index: Optional[LogWindowIndex] = None,
+                 engine_selector: Optional[LogEngineSelector] = None):
+        """Initialize the EventBridge explorer.
+        
+        Args:
+            max_in_flight: Maximum number of concurrent AWS calls when fetching rule targets
+            cache_ttl: Seconds a crawled event bus topology is reused before re-crawling
+            inventory_store: Optional persistent store used to start from the last-known topology
+            crawl_targets: Default (profile, region) pairs for multi-region crawls
+            query_runner: Logs Insights query runner, defaults to the process-wide one
+            query_timeout: Seconds a Logs Insights query may run before it is stopped
+            insights_cache: Cache of target log query results by time bucket
+            query_shards: Number of time slices for sharded target log queries
+            log_index: Local index of fetched log windows used to answer repeated searches
+            engine_selector: Chooses between FilterLogEvents and Logs Insights for target log searches
+        """
         self.event_buses = []
         self.selected_bus = None
         self.rules = []
-        self.eventbridge_client = boto3.client('events')
-        self.logs_client = boto3.client('logs')
+        self.snapshot = None
+        self.max_in_flight = max_in_flight
+        self.topology_cache = TopologyCache(ttl=cache_ttl)
+        self.inventory_store = inventory_store
+        self.crawl_targets = crawl_targets or []
+        self._account_id = None
+        self._background_refreshes = set()
+        self._background_lock = threading.Lock()
+        self.query_runner = query_runner or insights.runner
+        self.query_timeout = query_timeout
+        self.insights_cache = insights_cache or InsightsResultCache()
+        self.query_shards = query_shards
+        self.log_index = log_index or LogWindowIndex()
+        self.engine_selector = engine_selector or LogEngineSelector()
+        self.log_catalog = None
+        self._log_catalog_lock = threading.Lock()
+        self._routing_indexes: Dict[str, Tuple[str, RuleRoutingIndex]] = {}
+        self._routing_indexes_lock = threading.Lock()
+        self._overlap_reports: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+        self._overlap_reports_lock = threading.Lock()
+        self.eventbridge_client = get_client('events')
+        self.logs_client = get_client('logs')
         
     def list_event_buses(self):
         """List all event buses in the account."""
         try:
-            response = self.eventbridge_client.list_event_buses()
             # Store the event buses in the instance variable
-            self.event_buses = response.get('EventBuses', [])
+            self.event_buses = AccountCrawler(self.eventbridge_client).list_event_buses()
             print(f"Found and stored {len(self.event_buses)} event buses")
+            inventory_key = self._inventory_key()
+            if inventory_key:
+                self.inventory_store.save_event_buses(*inventory_key, self.event_buses)
             return self.event_buses
         except Exception as e:
             print(f"Error listing event buses: {str(e)}")
+            # Fall back to the last-known buses if we have them
+            inventory_key = self._inventory_key()
+            if inventory_key:
+                self.event_buses = self.inventory_store.load_event_buses(*inventory_key)
+                return self.event_buses
             return []
     
     def fetch_event_buses(self) -> List[Dict[str, Any]]:
         """Fetch all event buses from AWS."""
         try:
-            events_client = boto3.client('events')
-            response = events_client.list_event_buses()
-            self.event_buses = response.get('EventBuses', [])
+            self.event_buses = AccountCrawler(self.eventbridge_client).list_event_buses()
             return self.event_buses
         except Exception as e:
             raise Exception(f"Failed to fetch event buses: {str(e)}")
@@ -48,6 +119,7 @@ class EventBridgeExplorer:
         """Select an event bus by name."""
         # Reset state when selecting a new event bus
         self.rules = []
+        self.snapshot = None
         self.selected_rules = []
         self.rule_logs = {}
         self.rule_payloads = {}
@@ -64,8 +136,17 @@ class EventBridgeExplorer:
                 return bus
         raise ValueError(f"Event bus '{bus_name}' not found")
     
-    def fetch_rules(self, event_bus_name=None):
-        """Fetch rules for an event bus."""
+    def fetch_rules(self, event_bus_name=None, max_in_flight: Optional[int] = None):
+        """Fetch rules for an event bus.
+        
+        Args:
+            event_bus_name: Name of the event bus, defaults to the selected bus
+            max_in_flight: Maximum number of concurrent list_targets_by_rule calls.
+                Defaults to the explorer setting; 1 fetches targets sequentially.
+        
+        Returns:
+            List of rules, each with a 'Targets' list
+        """
         # Use the provided event_bus_name or fall back to the selected_bus
         bus_name = event_bus_name or self.selected_bus
         
@@ -83,27 +164,7 @@ class EventBridgeExplorer:
                 
             print(f"Using event bus name: {actual_bus_name}")
             
-            # Use pagination to get all rules
-            rules = []
-            paginator = self.eventbridge_client.get_paginator('list_rules')
-            page_iterator = paginator.paginate(EventBusName=actual_bus_name)
-            
-            for page in page_iterator:
-                rules.extend(page.get('Rules', []))
-            
-            # Get targets for each rule
-            for rule in rules:
-                try:
-                    targets_response = self.eventbridge_client.list_targets_by_rule(
-                        Rule=rule['Name'],
-                        EventBusName=actual_bus_name
-                    )
-                    rule['Targets'] = targets_response.get('Targets', [])
-                except Exception as e:
-                    print(f"Error fetching targets for rule {rule['Name']}: {e}")
-                    rule['Targets'] = []
-            
-            self.rules = rules
+            self.rules = self._crawl_rules(actual_bus_name, max_in_flight)
             return self.rules
         except Exception as e:
             import traceback
@@ -111,6 +172,307 @@ class EventBridgeExplorer:
             print(f"Error fetching rules for event bus {bus_name}: {str(e)}\n{error_details}")
             return []
     
+    def _crawl_rules(self, event_bus_name: str, max_in_flight: Optional[int] = None) -> List[Dict[str, Any]]:
+        """List all rules of an event bus with their targets, raising on failure."""
+        crawler = AccountCrawler(self.eventbridge_client, max_in_flight=max_in_flight or self.max_in_flight)
+        return crawler.crawl_rules(event_bus_name)
+    
+    def crawl_account(self, force_refresh: bool = False,
+                      progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None) -> AccountInventory:
+        """Crawl every event bus of the account in parallel under one concurrency limit.
+        
+        Fresh cached topologies are reused unless a refresh is forced. Crawled
+        snapshots are added to the topology cache and the inventory store.
+        
+        Args:
+            force_refresh: Re-crawl buses even if a fresh snapshot is cached
+            progress_callback: Optional callable receiving a progress dict per bus
+            
+        Returns:
+            AccountInventory combining the rules and targets of all buses
+        """
+        crawler = AccountCrawler(self.eventbridge_client, max_in_flight=self.max_in_flight,
+                                 progress_callback=progress_callback)
+        self.event_buses = crawler.list_event_buses()
+        inventory_key = self._inventory_key()
+        if inventory_key:
+            self.inventory_store.save_event_buses(*inventory_key, self.event_buses)
+        
+        known = {}
+        if not force_refresh:
+            for bus in self.event_buses:
+                snapshot = self.topology_cache.get(self.topology_cache_key(bus['Name']))
+                if snapshot is not None:
+                    known[bus['Name']] = snapshot
+        
+        region = self.eventbridge_client.meta.region_name
+        inventory = crawler.crawl(self.event_buses, known_snapshots=known,
+                                  account=self.get_account_id(), region=region)
+        
+        for name, snapshot in inventory.snapshots.items():
+            if name in known:
+                continue
+            self.topology_cache.put(self.topology_cache_key(name), snapshot)
+            if inventory_key:
+                try:
+                    self.inventory_store.save_snapshot(*inventory_key, snapshot)
+                except Exception as e:
+                    print(f"Error saving topology of {name} to the inventory store: {str(e)}")
+        return inventory
+    
+    def crawl_regions(self, targets: Optional[List[CrawlTarget]] = None,
+                      progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None) -> MultiRegionInventory:
+        """Crawl several (profile, region) pairs in parallel and merge their inventories.
+        
+        Args:
+            targets: (profile, region) pairs, defaults to the explorer's crawl targets
+            progress_callback: Optional callable receiving per-bus progress dicts
+            
+        Returns:
+            MultiRegionInventory tagged by account and region
+        """
+        targets = targets or self.crawl_targets
+        if not targets:
+            raise ValueError("No (profile, region) targets provided")
+        
+        engine = FanoutEngine(targets, max_in_flight=self.max_in_flight)
+        return engine.crawl(progress_callback=progress_callback)
+    
+    def get_account_id(self) -> str:
+        """Get the AWS account ID, from the event bus ARNs or STS, or 'unknown'."""
+        if self._account_id is None:
+            for bus in self.event_buses:
+                parts = bus.get('Arn', '').split(':')
+                if len(parts) > 4 and parts[4]:
+                    self._account_id = parts[4]
+                    break
+            else:
+                try:
+                    self._account_id = get_client('sts').get_caller_identity()['Account']
+                except Exception as e:
+                    print(f"Could not determine AWS account ID: {str(e)}")
+                    self._account_id = 'unknown'
+        return self._account_id
+    
+    def topology_cache_key(self, event_bus_name: str) -> Tuple[str, str, str]:
+        """Get the (account, region, event bus) key used by the topology cache."""
+        region = self.eventbridge_client.meta.region_name or 'unknown'
+        return (self.get_account_id(), region, event_bus_name)
+    
+    def build_topology_snapshot(self, event_bus_name=None) -> TopologySnapshot:
+        """Crawl an event bus once and return an immutable snapshot of its topology.
+        
+        The snapshot replaces any cached snapshot for the bus.
+        
+        Args:
+            event_bus_name: Name of the event bus, defaults to the selected bus
+            
+        Returns:
+            TopologySnapshot holding the rules, event patterns and targets of the bus
+        """
+        bus_name = event_bus_name or self.selected_bus
+        if isinstance(bus_name, dict) and 'Name' in bus_name:
+            bus_name = bus_name['Name']
+        if not bus_name:
+            raise ValueError("No event bus selected or provided")
+        
+        snapshot = self._crawl_topology(bus_name)
+        self.topology_cache.put(self.topology_cache_key(bus_name), snapshot)
+        self.rules = snapshot.to_list()
+        self.snapshot = snapshot
+        return snapshot
+    
+    def _crawl_topology(self, event_bus_name: str) -> TopologySnapshot:
+        """Crawl an event bus into a new snapshot and persist it to the inventory store."""
+        print(f"Crawling topology of event bus: {event_bus_name}")
+        snapshot = TopologySnapshot(event_bus_name, self._crawl_rules(event_bus_name))
+        inventory_key = self._inventory_key()
+        if inventory_key:
+            try:
+                self.inventory_store.save_snapshot(*inventory_key, snapshot)
+            except Exception as e:
+                print(f"Error saving topology of {event_bus_name} to the inventory store: {str(e)}")
+        return snapshot
+    
+    def _inventory_key(self) -> Optional[Tuple[str, str]]:
+        """Get the (account, region) the inventory store is keyed by, or None if unusable."""
+        if self.inventory_store is None:
+            return None
+        account = self.get_account_id()
+        if account == 'unknown':
+            # Without an account the rows could mix up several profiles
+            return None
+        return (account, self.eventbridge_client.meta.region_name or 'unknown')
+    
+    def get_log_catalog(self) -> LogGroupCatalog:
+        """Get the log group catalog of the account and region, creating it on first use."""
+        with self._log_catalog_lock:
+            if self.log_catalog is None:
+                self.log_catalog = LogGroupCatalog(self.logs_client, store=self.inventory_store,
+                                                   inventory_key=self._inventory_key())
+            return self.log_catalog
+    
+    def _refresh_in_background(self, event_bus_name: str) -> None:
+        """Re-crawl an event bus in a background thread, at most once at a time per bus."""
+        with self._background_lock:
+            if event_bus_name in self._background_refreshes:
+                return
+            self._background_refreshes.add(event_bus_name)
+        
+        def refresh():
+            try:
+                self.get_topology_snapshot(event_bus_name, force_refresh=True)
+            except Exception as e:
+                print(f"Background refresh of event bus {event_bus_name} failed: {str(e)}")
+            finally:
+                with self._background_lock:
+                    self._background_refreshes.discard(event_bus_name)
+        
+        thread = threading.Thread(target=refresh, daemon=True)
+        thread.start()
+    
+    def get_topology_snapshot(self, event_bus_name: str, force_refresh: bool = False) -> TopologySnapshot:
+        """Get the snapshot for an event bus, crawling it only if the cached one is stale.
+        
+        This is stateless: it does not touch the selected bus, rules or graph, so
+        request handlers can call it concurrently for different buses. Crawls of
+        different buses run in parallel; requests for the same bus share one crawl.
+        
+        Args:
+            event_bus_name: Name of the event bus
+            force_refresh: Crawl the bus even if a fresh snapshot is cached
+            
+        Returns:
+            TopologySnapshot of the event bus
+        """
+        key = self.topology_cache_key(event_bus_name)
+        
+        # On a cold cache, serve the last-known topology and refresh it in the background
+        if not force_refresh and self.topology_cache.get(key) is None:
+            inventory_key = self._inventory_key()
+            stored = self.inventory_store.load_snapshot(*inventory_key, event_bus_name) if inventory_key else None
+            if stored is not None:
+                print(f"Serving stored topology of {event_bus_name} from {stored.fetched_at}")
+                self.topology_cache.put(key, stored)
+                self._refresh_in_background(event_bus_name)
+                return stored
+        
+        snapshot = self.topology_cache.get_or_build(
+            key,
+            lambda: self._crawl_topology(event_bus_name),
+            force_refresh=force_refresh
+        )
+        return snapshot
+    
+    def get_routing_index(self, event_bus_name: str, snapshot: Optional[TopologySnapshot] = None) -> RuleRoutingIndex:
+        """Get the rule routing index of a bus, compiling its event patterns once per snapshot.
+        
+        Args:
+            event_bus_name: Name of the event bus
+            snapshot: Optional snapshot to index. Defaults to the cached topology of the bus.
+            
+        Returns:
+            RuleRoutingIndex of the rules that have an event pattern
+        """
+        if snapshot is None:
+            snapshot = self.get_topology_snapshot(event_bus_name)
+        with self._routing_indexes_lock:
+            cached = self._routing_indexes.get(event_bus_name)
+            if cached is not None and cached[0] == snapshot.etag:
+                return cached[1]
+        patterns = {rule['Name']: rule['EventPattern'] for rule in snapshot.rules if rule.get('EventPattern')}
+        index = RuleRoutingIndex(patterns)
+        with self._routing_indexes_lock:
+            self._routing_indexes[event_bus_name] = (snapshot.etag, index)
+        return index
+    
+    def analyze_overlaps(self, event_bus_name: str, snapshot: Optional[TopologySnapshot] = None) -> Dict[str, Any]:
+        """Find the rules of a bus that match the same events, or can never match, once per snapshot.
+        
+        Args:
+            event_bus_name: Name of the event bus
+            snapshot: Optional snapshot to analyze. Defaults to the cached topology of the bus.
+            
+        Returns:
+            Overlap report of the enabled rules, see analyze_rule_overlaps
+        """
+        if snapshot is None:
+            snapshot = self.get_topology_snapshot(event_bus_name)
+        with self._overlap_reports_lock:
+            cached = self._overlap_reports.get(event_bus_name)
+            if cached is not None and cached[0] == snapshot.etag:
+                return cached[1]
+        report = analyze_rule_overlaps(snapshot.rules)
+        print(f"Analyzed {report['rules']} rules of {event_bus_name} for overlaps: "
+              f"{len(report['findings'])} findings from {report['stats']['candidate_pairs']} of "
+              f"{report['stats']['total_pairs']} pairs in {report['stats']['elapsed_ms']}ms")
+        with self._overlap_reports_lock:
+            self._overlap_reports[event_bus_name] = (snapshot.etag, report)
+        return report
+    
+    def match_events(self, event_bus_name: str, events: List[Dict[str, Any]]) -> List[List[str]]:
+        """Find the rules of a bus whose event pattern matches each event, without AWS calls.
+        
+        Args:
+            event_bus_name: Name of the event bus
+            events: Events in delivered form or as PutEvents entries
+            
+        Returns:
+            The names of the matching rules for each event
+        """
+        return self.get_routing_index(event_bus_name).match_batch(normalize_event(event) for event in events)
+    
+    def route_events(self, event_bus_name: str, events: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Find the matching rules and their targets for each event, with timings.
+        
+        Args:
+            event_bus_name: Name of the event bus
+            events: Events in delivered form or as PutEvents entries
+            
+        Returns:
+            Dictionary with per-event 'results' (matched rules with state and targets),
+            'timings' in milliseconds and 'index' statistics
+        """
+        started = time.monotonic()
+        # Index the same snapshot the rules are looked up in, even if a refresh lands in between
+        snapshot = self.get_topology_snapshot(event_bus_name)
+        index = self.get_routing_index(event_bus_name, snapshot)
+        prepared = time.monotonic()
+        
+        results = []
+        for position, event in enumerate(events):
+            event_started = time.monotonic()
+            try:
+                rule_names = index.match(normalize_event(event))
+            except (TypeError, ValueError, AttributeError) as e:
+                results.append({'index': position, 'error': f"Invalid event: {e}", 'rules': []})
+                continue
+            rules = []
+            for rule_name in rule_names:
+                rule = snapshot.get_rule(rule_name)
+                if rule is None:
+                    continue
+                rules.append({
+                    'name': rule_name,
+                    'state': rule.get('State'),
+                    'targets': [{'id': target.get('Id'), 'arn': target.get('Arn')}
+                                for target in snapshot.get_targets(rule_name)]
+                })
+            results.append({'index': position, 'rules': rules,
+                            'elapsed_us': round((time.monotonic() - event_started) * 1e6, 1)})
+        finished = time.monotonic()
+        
+        return {
+            'results': results,
+            'timings': {
+                'prepare_ms': round((prepared - started) * 1000, 3),
+                'match_ms': round((finished - prepared) * 1000, 3),
+                'total_ms': round((finished - started) * 1000, 3)
+            },
+            'index': index.get_stats(),
+            'invalid_patterns': index.errors
+        }
+    
     def select_rules(self, rule_names: List[str]) -> List[Dict[str, Any]]:
         """Select rules by name."""
         self.selected_rules = []
@@ -121,6 +483,13 @@ class EventBridgeExplorer:
     
     def create_graph(self, event_bus_name: str, rules: List[Dict[str, Any]]) -> Tuple[nx.DiGraph, Dict[str, str]]:
         """Create a graph visualization of the event bus and rules."""
+        G, node_colors = self._build_basic_graph(event_bus_name, rules)
+        self.graph = G
+        return G, node_colors
+    
+    @staticmethod
+    def _build_basic_graph(event_bus_name: str, rules: List[Dict[str, Any]]) -> Tuple[nx.DiGraph, Dict[str, str]]:
+        """Build the basic event bus graph and node colors without touching explorer state."""
         # Create graph
         G = nx.DiGraph()
         
@@ -158,92 +527,38 @@ class EventBridgeExplorer:
                 # Connect rule to target
                 G.add_edge(rule_name, target_label)
         
-        self.graph = G
         return G, node_colors
     
-    def fetch_rule_events_and_logs(self, rules: List[Dict[str, Any]], event_bus_name: str) -> Dict[str, Dict[str, str]]:
-        """Fetch recent events and logs for the selected rules."""
+    def fetch_rule_events_and_logs(self, rules: List[Dict[str, Any]], event_bus_name: str,
+                                   batched: bool = False, max_concurrent_queries: int = 4) -> Dict[str, Dict[str, str]]:
+        """Fetch recent events and logs for the selected rules.
+        
+        Args:
+            rules: Rules as returned by fetch_rules
+            event_bus_name: Name of the event bus the rules belong to
+            batched: Query many rule log groups per Logs Insights query instead of one per rule
+            max_concurrent_queries: Maximum number of batched queries running at once
+            
+        Returns:
+            Dictionary with 'logs' and 'payloads' keyed by rule name
+        """
         result = {'logs': {}, 'payloads': {}}
         
         try:
-            # Create CloudWatch Logs client
-            logs_client = boto3.client('logs')
-            
-            # Create CloudWatch Events client
-            events_client = boto3.client('events')
-            
-            # Process each rule
+            # The event pattern is already part of the rule, so no describe_rule call is needed
             for rule in rules:
-                rule_name = rule['Name']
-                
-                # Try to fetch recent events
-                try:
-                    # Check if the rule has a log group
-                    log_group_name = f"/aws/events/{rule_name}"
-                    
-                    # Try to fetch logs
-                    try:
-                        # Check if log group exists
-                        logs_client.describe_log_groups(logGroupNamePrefix=log_group_name)
-                        
-                        # Query recent logs
-                        end_time = int(datetime.datetime.now().timestamp())
-                        start_time = end_time - (24 * 60 * 60)  # Last 24 hours
-                        
-                        query = f"fields @timestamp, @message | sort @timestamp desc | limit 10"
-                        start_query_response = logs_client.start_query(
-                            logGroupName=log_group_name,
-                            startTime=start_time,
-                            endTime=end_time,
-                            queryString=query
-                        )
-                        
-                        query_id = start_query_response['queryId']
-                        
-                        # Wait for query to complete
-                        response = None
-                        while response is None or response['status'] == 'Running':
-                            time.sleep(1)
-                            response = logs_client.get_query_results(queryId=query_id)
-                        
-                        # Process results
-                        log_entries = []
-                        for result_item in response.get('results', []):
-                            message = next((field['value'] for field in result_item if field['field'] == '@message'), None)
-                            timestamp = next((field['value'] for field in result_item if field['field'] == '@timestamp'), None)
-                            if message and timestamp:
-                                log_entries.append(f"{timestamp}: {message}")
-                        
-                        if log_entries:
-                            result['logs'][rule_name] = "\n".join(log_entries)
-                        else:
-                            result['logs'][rule_name] = "No logs found in the last 24 hours."
-                    except Exception as e:
-                        result['logs'][rule_name] = f"Could not fetch logs: {str(e)}"
-                    
-                    # Try to fetch recent events using CloudWatch Events TestEventPattern
-                    try:
-                        # Get the rule's event pattern
-                        rule_details = events_client.describe_rule(
-                            Name=rule_name,
-                            EventBusName=event_bus_name
-                        )
-                        
-                        event_pattern = rule_details.get('EventPattern')
-                        
-                        if event_pattern:
-                            # For demonstration, we'll create a sample event based on the pattern
-                            result['payloads'][rule_name] = f"Event Pattern:\n{event_pattern}\n\n" + \
-                                                          "Note: AWS doesn't provide direct access to past events. " + \
-                                                          "This is the event pattern the rule is looking for."
-                        else:
-                            result['payloads'][rule_name] = "No event pattern defined for this rule."
-                    except Exception as e:
-                        result['payloads'][rule_name] = f"Could not fetch event pattern: {str(e)}"
-                
-                except Exception as e:
-                    result['logs'][rule_name] = f"Error fetching logs: {str(e)}"
-                    result['payloads'][rule_name] = f"Error fetching events: {str(e)}"
+                event_pattern = rule.get('EventPattern')
+                if event_pattern:
+                    result['payloads'][rule['Name']] = f"Event Pattern:\n{event_pattern}\n\n" + \
+                                                     "Note: AWS doesn't provide direct access to past events. " + \
+                                                     "This is the event pattern the rule is looking for."
+                else:
+                    result['payloads'][rule['Name']] = "No event pattern defined for this rule."
+            
+            if batched:
+                result['logs'] = self._fetch_rule_logs_batched(rules, max_concurrent_queries)
+            else:
+                result['logs'] = self._fetch_rule_logs_sequential(rules)
             
             self.rule_logs = result['logs']
             self.rule_payloads = result['payloads']
@@ -251,8 +566,141 @@ class EventBridgeExplorer:
             
         except Exception as e:
             raise Exception(f"Failed to fetch events and logs: {str(e)}")
+    
+    def _fetch_rule_logs_sequential(self, rules: List[Dict[str, Any]]) -> Dict[str, str]:
+        """Fetch the last 24 hours of logs of each rule with one Insights query per rule."""
+        logs = {}
+        logs_client = self.logs_client
+        
+        for rule in rules:
+            rule_name = rule['Name']
+            
+            # Check if the rule has a log group
+            log_group_name = f"/aws/events/{rule_name}"
             
-    def fetch_target_logs(self, target_arn: str, limit: int = 10, start_time=None, end_time=None, search_term=None) -> Dict[str, Any]:
+            # Try to fetch logs
+            try:
+                # Check if log group exists
+                if not self.get_log_catalog().exists(log_group_name):
+                    logs[rule_name] = f"Could not fetch logs: log group {log_group_name} does not exist"
+                    continue
+                
+                # Query recent logs
+                end_time = int(datetime.datetime.now().timestamp())
+                start_time = end_time - (24 * 60 * 60)  # Last 24 hours
+                
+                query = f"fields @timestamp, @message | sort @timestamp desc | limit 10"
+                response = self.query_runner.run(logs_client, query, start_time, end_time,
+                                                 log_group_name=log_group_name, timeout=self.query_timeout)
+                if response['status'] == 'Failed':
+                    raise Exception(response.get('error', 'Query failed'))
+                
+                # Process results, which may be partial if the query timed out
+                log_entries = []
+                for result_item in response.get('results', []):
+                    message = next((field['value'] for field in result_item if field['field'] == '@message'), None)
+                    timestamp = next((field['value'] for field in result_item if field['field'] == '@timestamp'), None)
+                    if message and timestamp:
+                        log_entries.append(f"{timestamp}: {message}")
+                
+                if log_entries:
+                    logs[rule_name] = "\n".join(log_entries)
+                else:
+                    logs[rule_name] = "No logs found in the last 24 hours."
+            except Exception as e:
+                logs[rule_name] = f"Could not fetch logs: {str(e)}"
+        
+        return logs
+    
+    def _fetch_rule_logs_batched(self, rules: List[Dict[str, Any]], max_concurrent_queries: int = 4,
+                                 per_rule_limit: int = 10) -> Dict[str, str]:
+        """Fetch the last 24 hours of logs of many rules with as few Insights queries as possible.
+        
+        Rule log groups are packed into queries of up to MAX_LOG_GROUPS_PER_QUERY groups,
+        the queries run concurrently and the rows are split back per rule using @log.
+        A batch returns at most per_rule_limit rows per rule in total, so a busy rule can
+        crowd out quieter ones; rules left short by a truncated batch are queried again.
+        """
+        logs = {}
+        group_to_rule = {f"/aws/events/{rule['Name']}": rule['Name'] for rule in rules}
+        
+        # StartQuery fails for the whole batch if any log group is missing, so filter first
+        existing = set(self.get_log_catalog().names_with_prefix('/aws/events/'))
+        
+        pending = []
+        for log_group_name, rule_name in group_to_rule.items():
+            if log_group_name in existing:
+                pending.append(log_group_name)
+            else:
+                logs[rule_name] = f"Could not fetch logs: log group {log_group_name} does not exist"
+        
+        end_time = int(datetime.datetime.now().timestamp())
+        start_time = end_time - (24 * 60 * 60)  # Last 24 hours
+        entries: Dict[str, List[Tuple[str, str]]] = {name: [] for name in pending}
+        
+        def run_batch(log_group_names):
+            limit = min(MAX_INSIGHTS_RESULTS, per_rule_limit * len(log_group_names))
+            query = f"fields @timestamp, @message, @log | sort @timestamp desc | limit {limit}"
+            response = self._run_insights_query(log_group_names, query, start_time, end_time)
+            return log_group_names, response, limit
+        
+        with ThreadPoolExecutor(max_workers=max(1, max_concurrent_queries)) as executor:
+            while pending:
+                batches = [pending[i:i + MAX_LOG_GROUPS_PER_QUERY]
+                           for i in range(0, len(pending), MAX_LOG_GROUPS_PER_QUERY)]
+                pending = []
+                for log_group_names, response, limit in executor.map(run_batch, batches):
+                    if response.get('error'):
+                        for log_group_name in log_group_names:
+                            logs[group_to_rule[log_group_name]] = f"Could not fetch logs: {response['error']}"
+                        continue
+                    
+                    rows = response.get('results', [])
+                    for result_item in rows:
+                        fields = {field['field']: field['value'] for field in result_item}
+                        # @log is "<account-id>:<log-group-name>"
+                        log_group_name = fields.get('@log', '').split(':', 1)[-1]
+                        if log_group_name in entries and fields.get('@message') and fields.get('@timestamp'):
+                            if len(entries[log_group_name]) < per_rule_limit:
+                                entries[log_group_name].append((fields['@timestamp'], fields['@message']))
+                    
+                    # A truncated batch may have crowded out quieter rules; query those again
+                    if len(rows) >= limit:
+                        short = [name for name in log_group_names if len(entries[name]) < per_rule_limit]
+                        if len(short) < len(log_group_names):
+                            for name in short:
+                                entries[name] = []
+                            pending.extend(short)
+        
+        for log_group_name, rule_entries in entries.items():
+            rule_name = group_to_rule[log_group_name]
+            if rule_name in logs:
+                continue
+            if rule_entries:
+                logs[rule_name] = "\n".join(f"{timestamp}: {message}" for timestamp, message in rule_entries)
+            else:
+                logs[rule_name] = "No logs found in the last 24 hours."
+        return logs
+    
+    def _run_insights_query(self, log_group_names: List[str], query: str, start_time: int,
+                            end_time: int) -> Dict[str, Any]:
+        """Run a Logs Insights query over several log groups through the shared query runner.
+        
+        Returns:
+            The runner result, with an 'error' message if the query produced no usable rows
+        """
+        response = self.query_runner.run(self.logs_client, query, start_time, end_time,
+                                         log_group_names=log_group_names, timeout=self.query_timeout)
+        if response['status'] != 'Complete' and not response['results']:
+            response.setdefault('error', f"Query ended with status {response['status']}")
+        else:
+            response.pop('error', None)
+        return response
+    
+    def fetch_target_logs(self, target_arn: str, limit: int = 10, start_time=None, end_time=None, search_term=None,
+                          cancel_event: Optional[threading.Event] = None, sharded: bool = False,
+                          search_terms: Optional[List[str]] = None,
+                          search_regex: Optional[str] = None, engine: Optional[str] = None) -> Dict[str, Any]:
         """Fetch logs for a specific target with enhanced search capabilities.
         
         Args:
@@ -261,18 +709,24 @@ class EventBridgeExplorer:
             start_time: Start time for log query (Unix timestamp in seconds)
             end_time: End time for log query (Unix timestamp in seconds)
             search_term: Optional search term to filter logs
+            cancel_event: Optional event that stops the query when set, e.g. on client disconnect
+            sharded: Split the time range into concurrent slices and stop once limit rows are found
+            search_terms: Optional further terms; a log entry matches if it contains any term
+            search_regex: Optional regular expression a log entry may match instead
+            engine: 'filter_log_events' or 'insights' to force a backend, None to choose by window and size
             
         Returns:
             Dictionary containing log entries, metadata, and search results
         """
         try:
-            # Create CloudWatch Logs client
-            logs_client = boto3.client('logs')
+            # Use the shared CloudWatch Logs client
+            logs_client = self.logs_client
             
             # Print the ARN for debugging
             print(f"Fetching logs for ARN: {target_arn}")
             print(f"Start time: {start_time}, End time: {end_time}")
             print(f"Search term: {search_term}")
+            search = compile_search(search_term, search_terms, search_regex)
             
             # Convert start_time and end_time to datetime objects if provided
             start_datetime = None
@@ -372,16 +826,9 @@ class EventBridgeExplorer:
                 
             # Check if log group exists
             try:
-                log_groups = logs_client.describe_log_groups(logGroupNamePrefix=log_group_name)
+                log_group = self.get_log_catalog().get(log_group_name)
                 
-                # Check if the exact log group exists
-                exact_match = False
-                for log_group in log_groups.get('logGroups', []):
-                    if log_group.get('logGroupName') == log_group_name:
-                        exact_match = True
-                        break
-                
-                if not exact_match:
+                if log_group is None:
                     return {
                         "success": False,
                         "message": f"Log group {log_group_name} does not exist. This could mean:\n" + 
@@ -419,40 +866,71 @@ class EventBridgeExplorer:
                 # Build CloudWatch Logs Insights query
                 query = f"fields @timestamp, @message"
                 
-                # Add search filter if provided
-                if search_term:
-                    # Escape special characters in search term
-                    escaped_term = search_term.replace("'", "\\'").replace('"', '\\"')
-                    # Use CloudWatch Logs Insights patterns with wildcards for partial matching
-                    query += f" | filter @message like '%{escaped_term}%'"
-                    # Add a second filter for case-insensitive matching
-                    query += f" | filter @message like '%{escaped_term.lower()}%' or @message like '%{escaped_term.upper()}%'"
+                # Add search filter if provided: one case-insensitive regex alternation for all terms
+                if not search.empty:
+                    query += f" | {search.insights_filter()}"
                     # Log the query for debugging
                     print(f"Search query: {query}")
                 
                 query += f" | sort @timestamp desc | limit {limit}"
                 
-                # Start the query
-                start_query_response = logs_client.start_query(
-                    logGroupName=log_group_name,
-                    startTime=int(start_time_ms / 1000),  # Convert back to seconds for API
-                    endTime=int(end_time_ms / 1000),      # Convert back to seconds for API
-                    queryString=query
-                )
+                # Answer from an already fetched window if one holds every possible match
+                retrieval_started = time.monotonic()
+                indexed_rows = self.log_index.search(log_group_name, start_time_ms, end_time_ms,
+                                                     search, int(limit))
+                if indexed_rows is not None:
+                    response = {'status': 'Complete', 'results': indexed_rows, 'partial': False,
+                                'cache': {'hits': 0, 'queries': 0}, 'source': 'index'}
+                    engine_used, engine_reason = 'index', 'answered from an indexed window'
+                else:
+                    engine_used, engine_reason = self.engine_selector.choose(
+                        (end_time_ms - start_time_ms) / 1000,
+                        stored_bytes=log_group.get('storedBytes'),
+                        retention_days=log_group.get('retentionInDays'),
+                        search=search,
+                        sharded=sharded,
+                        engine=engine
+                    )
+                    response = None
+                    fallback = False
+                    if engine_used == ENGINE_FILTER:
+                        # Small windows come back faster from FilterLogEvents than from a new query
+                        response = self.engine_selector.fetch(logs_client, log_group_name, start_time_ms,
+                                                              end_time_ms, int(limit), search=search)
+                        if response is None:
+                            engine_used, engine_reason, fallback = ENGINE_INSIGHTS, 'too many events to filter', True
+                        else:
+                            response.update(cache={'hits': 0, 'queries': 0}, source=ENGINE_FILTER)
                 
-                query_id = start_query_response['queryId']
+                if response is None:
+                    # Run the query for the buckets that are not cached yet; on timeout it is
+                    # stopped on AWS and its partial rows are kept
+                    response = self.insights_cache.run(
+                        self.query_runner,
+                        logs_client,
+                        log_group_name,
+                        query,
+                        int(start_time_ms / 1000),  # Convert back to seconds for API
+                        int(end_time_ms / 1000),    # Convert back to seconds for API
+                        limit=int(limit),
+                        shards=self.query_shards if sharded else 1,
+                        timeout=self.query_timeout,
+                        cancel_event=cancel_event
+                    )
+                    response['source'] = 'insights'
                 
-                # Wait for query to complete
-                response = None
-                max_attempts = 20
-                attempts = 0
+                latency = time.monotonic() - retrieval_started
+                if response['source'] != 'index':
+                    self.engine_selector.record(engine_used, latency, fallback=fallback)
+                    if response['status'] == 'Complete' and len(response['results']) < int(limit):
+                        # The window holds every matching event, so later searches can use it
+                        self.log_index.add(log_group_name, start_time_ms, end_time_ms,
+                                           response['results'], search=search)
                 
-                while (response is None or response['status'] == 'Running') and attempts < max_attempts:
-                    time.sleep(1)
-                    response = logs_client.get_query_results(queryId=query_id)
-                    attempts += 1
+                if response['status'] == 'Failed':
+                    raise Exception(response.get('error', 'Query failed'))
                 
-                if attempts >= max_attempts and (response is None or response['status'] == 'Running'):
+                if response['status'] != 'Complete' and not response['results']:
                     return {
                         "success": False,
                         "message": f"Query timed out for {log_group_name}. Please try again later or with a narrower time range.",
@@ -488,25 +966,16 @@ class EventBridgeExplorer:
                             "timestamp": timestamp_ms,
                             "formatted_time": formatted_time,
                             "message": message,
-                            "stream": "unknown",  # CloudWatch Insights doesn't return stream info
+                            # Only FilterLogEvents results carry the stream; the Insights query does not select it
+                            "stream": next((field['value'] for field in result_item
+                                            if field['field'] == '@logStream'), "unknown"),
                             "matches": []
                         }
                         
-                        # If search term is provided, highlight matches
-                        if search_term and search_term.lower() in message.lower():
-                            # Find all occurrences of the search term (case insensitive)
-                            message_lower = message.lower()
-                            search_term_lower = search_term.lower()
-                            start_idx = 0
-                            while True:
-                                idx = message_lower.find(search_term_lower, start_idx)
-                                if idx == -1:
-                                    break
-                                log_entry["matches"].append({
-                                    "start": idx,
-                                    "end": idx + len(search_term)
-                                })
-                                start_idx = idx + len(search_term)
+                        # If a search is provided, highlight every match of every term in one pass
+                        if not search.empty:
+                            log_entry["matches"] = [{"start": start, "end": end}
+                                                    for start, end in search.spans(message)]
                         
                         log_entries.append(log_entry)
                 
@@ -531,7 +1000,19 @@ class EventBridgeExplorer:
                             "end_time": end_str,
                             "query": query,
                             "search_term": search_term,
-                            "total_logs": len(log_entries)
+                            "search_terms": search_terms or [],
+                            "search_regex": search_regex,
+                            "total_logs": len(log_entries),
+                            "partial": response['partial'],
+                            "query_status": response['status'],
+                            "cache": response['cache'],
+                            "shards": response.get('shards', []),
+                            "source": response['source'],
+                            "engine": engine_used,
+                            "engine_reason": engine_reason,
+                            "latency_ms": round(latency * 1000, 1),
+                            "stored_bytes": log_group.get('storedBytes'),
+                            "retention_days": log_group.get('retentionInDays')
                         }
                     }
                 else:
@@ -547,7 +1028,13 @@ class EventBridgeExplorer:
                             "start_time": start_str,
                             "end_time": end_str,
                             "query": query,
-                            "search_term": search_term
+                            "search_term": search_term,
+                            "search_terms": search_terms or [],
+                            "search_regex": search_regex,
+                            "source": response['source'],
+                            "engine": engine_used,
+                            "engine_reason": engine_reason,
+                            "latency_ms": round(latency * 1000, 1)
                         }
                     }
                     
@@ -583,8 +1070,8 @@ class EventBridgeExplorer:
             List of log stream information
         """
         try:
-            # Create CloudWatch Logs client
-            logs_client = boto3.client('logs')
+            # Use the shared CloudWatch Logs client
+            logs_client = self.logs_client
             
             # Print the ARN for debugging
             print(f"Fetching log streams for ARN: {target_arn}")
@@ -653,16 +1140,7 @@ class EventBridgeExplorer:
                 
             # Check if log group exists
             try:
-                log_groups = logs_client.describe_log_groups(logGroupNamePrefix=log_group_name)
-                
-                # Check if the exact log group exists
-                exact_match = False
-                for log_group in log_groups.get('logGroups', []):
-                    if log_group.get('logGroupName') == log_group_name:
-                        exact_match = True
-                        break
-                
-                if not exact_match:
+                if not self.get_log_catalog().exists(log_group_name):
                     return []
                 
             except Exception as e:
@@ -716,8 +1194,116 @@ class EventBridgeExplorer:
             print(f"Error fetching log streams: {str(e)}")
             return []
             
+    @staticmethod
+    def target_log_group_name(target_arn: str) -> Optional[str]:
+        """Get the log group of a Lambda function or Step Functions target, or None for other targets."""
+        parts = target_arn.split(':')
+        if len(parts) < 7:
+            return None
+        if parts[2] == 'lambda':
+            return f"/aws/lambda/{parts[6]}"
+        if parts[2] == 'states':
+            return f"/aws/states/{parts[6]}"
+        return None
+
+    def create_log_exporter(self, log_group_name: str, search_term: Optional[str] = None,
+                            search_terms: Optional[List[str]] = None, search_regex: Optional[str] = None,
+                            max_workers: int = 4) -> LogExporter:
+        """Create an exporter streaming every matching row of a log group.
+        
+        Args:
+            log_group_name: Log group to export
+            search_term: Optional search term the rows must contain
+            search_terms: Optional further terms; a row matches if it contains any term
+            search_regex: Optional regular expression a row may match instead
+            max_workers: Maximum number of time slices queried at once
+            
+        Returns:
+            LogExporter using the shared query runner and logs client
+        """
+        return LogExporter(self.query_runner, self.logs_client, log_group_name,
+                           search=compile_search(search_term, search_terms, search_regex),
+                           max_workers=max_workers, query_timeout=max(self.query_timeout, 60))
+
+    def create_event_publisher(self, event_bus_name: str = 'default', rate: Optional[float] = None,
+                               max_workers: int = 8) -> EventPublisher:
+        """Create a publisher sending events to a bus in PutEvents batches.
+        
+        Args:
+            event_bus_name: Bus for events that do not name one
+            rate: Target events per second, None to send as fast as possible
+            max_workers: Maximum number of batches sent at once
+            
+        Returns:
+            EventPublisher using the shared EventBridge client
+        """
+        return EventPublisher(self.eventbridge_client, event_bus_name, rate=rate, max_workers=max_workers)
+
+    def fetch_stream_log_page(self, log_group_name: str, log_stream_name: str, limit: int = 100,
+                              token: Optional[str] = None, start_from_head: bool = False,
+                              max_empty_pages: int = 5) -> Dict[str, Any]:
+        """Fetch one page of a log stream, walking it with forward and backward tokens.
+        
+        Without a token the newest page is returned, or the oldest one with
+        start_from_head. Pass nextToken to get the page after it (newer events) or
+        prevToken to get the page before it (older events). get_log_events can return
+        empty pages in the middle of a sparse stream; those are skipped, up to
+        max_empty_pages extra requests.
+        
+        Args:
+            log_group_name: The name of the log group
+            log_stream_name: The name of the log stream
+            limit: Maximum number of log events per page
+            token: nextToken or prevToken of a previous page
+            start_from_head: Start at the oldest events when no token is given
+            max_empty_pages: Extra requests made to step over empty pages
+            
+        Returns:
+            Dictionary with 'events' (oldest first), 'nextToken' and 'prevToken';
+            a token is None once the stream has no more events in that direction
+        """
+        # Forward tokens must be used with startFromHead=True, backward tokens with False
+        forward = token.startswith('f/') if token else start_from_head
+        params = {
+            'logGroupName': log_group_name,
+            'logStreamName': log_stream_name,
+            'limit': int(limit),
+            'startFromHead': forward
+        }
+        if token:
+            params['nextToken'] = token
+        
+        for _ in range(max_empty_pages + 1):
+            response = call_with_backoff(self.logs_client.get_log_events, **params)
+            events = response.get('events', [])
+            # The token in the reading direction comes back unchanged at the end of the stream
+            step_token = response.get('nextForwardToken' if forward else 'nextBackwardToken')
+            if events or not step_token or step_token == params.get('nextToken'):
+                break
+            params['nextToken'] = step_token
+        
+        next_token = response.get('nextForwardToken')
+        prev_token = response.get('nextBackwardToken')
+        if not events:
+            if forward:
+                next_token = None
+            else:
+                prev_token = None
+        elif forward and next_token == params.get('nextToken'):
+            next_token = None
+        elif not forward and prev_token == params.get('nextToken'):
+            prev_token = None
+        
+        for event in events:
+            event.setdefault('logStreamName', log_stream_name)
+        return {
+            'events': [format_log_event(event, log_group_name) for event in events],
+            'nextToken': next_token,
+            'prevToken': prev_token
+        }
+    
     def fetch_stream_logs(self, log_group_name: str, log_stream_name: str, limit: int = 100) -> str:
-        """Fetch logs from a specific log stream with improved handling.
+        """Fetch the newest logs of a specific log stream as HTML.
         
         Args:
             log_group_name: The name of the log group
@@ -728,221 +1314,94 @@ class EventBridgeExplorer:
             String containing the log entries
         """
         try:
-            # Create CloudWatch Logs client
-            logs_client = boto3.client('logs')
-            
             print(f"Fetching logs from stream: {log_stream_name} in group: {log_group_name}")
-            
-            # First, get information about the log stream to find its time range
-            try:
-                stream_info = logs_client.describe_log_streams(
-                    logGroupName=log_group_name,
-                    logStreamNamePrefix=log_stream_name,
-                    limit=1
-                )
-                
-                if not stream_info.get('logStreams'):
-                    return f"<div class='log-container log-empty'>Log stream '{log_stream_name}' not found in log group '{log_group_name}'.</div>"
-                    
-                stream = stream_info['logStreams'][0]
-                first_event_time = stream.get('firstEventTimestamp')
-                last_event_time = stream.get('lastEventTimestamp')
-                
-                if not first_event_time or not last_event_time:
-                    return f"<div class='log-container log-empty'>No events found in stream '{log_stream_name}'.</div>"
-                    
-                print(f"Stream time range: {first_event_time} to {last_event_time}")
-                
-            except Exception as e:
-                print(f"Error getting stream info: {str(e)}")
-                return f"<div class='log-container log-error'>Error getting stream info: {str(e)}</div>"
-            
-            # Get events from the stream using the stream's time range
-            try:
-                response = logs_client.get_log_events(
-                    logGroupName=log_group_name,
-                    logStreamName=log_stream_name,
-                    startTime=first_event_time,
-                    endTime=last_event_time,
-                    limit=limit,
-                    startFromHead=False  # Start from the end (most recent)
-                )
-                
-                print(f"Log events response: {response}")
-                
-                # Process the events
-                log_entries = []
-                for event in response.get('events', []):
-                    message = event.get('message')
-                    timestamp = event.get('timestamp')
-                    
-                    if message and timestamp:
-                        # Convert timestamp to readable format
-                        dt = datetime.datetime.fromtimestamp(timestamp/1000)
-                        formatted_time = dt.strftime('%Y-%m-%d %H:%M:%S')
-                        
-                        # Create a preview (first 150 characters)
-                        preview = message[:150] + ('...' if len(message) > 150 else '')
-                        
-                        # Display full log entries without collapsible feature
-                        log_entries.append(f"""<div class='log-entry'>
-                            <span class='log-timestamp'>{formatted_time}</span>
-                            <span class='log-message'>{message}</span>
-                        </div>""")
-                
-                if log_entries:
-                    return "<div class='log-container'>" + "".join(log_entries) + "</div>"
-                else:
-                    # If no events in the first request, try using the token for pagination
-                    next_token = response.get('nextForwardToken')
-                    if next_token:
-                        print(f"No events in first request, trying with token: {next_token}")
-                        token_response = logs_client.get_log_events(
-                            logGroupName=log_group_name,
-                            logStreamName=log_stream_name,
-                            nextToken=next_token,
-                            limit=limit
-                        )
-                        
-                        token_events = token_response.get('events', [])
-                        if token_events:
-                            token_entries = []
-                            for event in token_events:
-                                message = event.get('message')
-                                timestamp = event.get('timestamp')
-                                
-                                if message and timestamp:
-                                    dt = datetime.datetime.fromtimestamp(timestamp/1000)
-                                    formatted_time = dt.strftime('%Y-%m-%d %H:%M:%S')
-                                    
-                                    # Create a preview (first 150 characters)
-                                    preview = message[:150] + ('...' if len(message) > 150 else '')
-                                    
-                                # Display full log entries without collapsible feature
-                                token_entries.append(f"""<div class='log-entry'>
-                                    <span class='log-timestamp'>{formatted_time}</span>
-                                    <span class='log-message'>{message}</span>
-                                </div>""")
-                            
-                            if token_entries:
-                                return "<div class='log-container'>" + "".join(token_entries) + "</div>"
-                    
-                    # Try one more approach - get events without specifying time range
-                    print("Trying to fetch logs without time range...")
-                    fallback_response = logs_client.get_log_events(
-                        logGroupName=log_group_name,
-                        logStreamName=log_stream_name,
-                        limit=limit
-                    )
-                    
-                    fallback_events = fallback_response.get('events', [])
-                    if fallback_events:
-                        fallback_entries = []
-                        for event in fallback_events:
-                            message = event.get('message')
-                            timestamp = event.get('timestamp')
-                            
-                            if message and timestamp:
-                                dt = datetime.datetime.fromtimestamp(timestamp/1000)
-                                formatted_time = dt.strftime('%Y-%m-%d %H:%M:%S')
-                                
-                                # Create a preview (first 150 characters)
-                                preview = message[:150] + ('...' if len(message) > 150 else '')
-                                
-                                # Display full log entries without collapsible feature
-                                fallback_entries.append(f"""<div class='log-entry'>
-                                    <span class='log-timestamp'>{formatted_time}</span>
-                                    <span class='log-message'>{message}</span>
-                                </div>""")
-                        
-                        if fallback_entries:
-                            return "<div class='log-container'>" + "".join(fallback_entries) + "</div>"
-                    
-                    return f"<div class='log-container log-empty'>No log events found in stream '{log_stream_name}'.</div>"
-                    
-            except Exception as e:
-                print(f"Error getting log events: {str(e)}")
-                return f"<div class='log-container log-error'>Error getting log events: {str(e)}</div>"
-                    
+            page = self.fetch_stream_log_page(log_group_name, log_stream_name, limit=limit)
         except Exception as e:
             error_message = str(e)
             print(f"Error fetching stream logs: {error_message}")
             return f"<div class='log-container log-error'>Error fetching logs: {error_message}</div>"
-    def build_graph_with_logs(self, event_bus_name: str, rule_names: List[str] = None) -> nx.DiGraph:
-        """Build a graph representation of the event bus, rules, targets, and a summary of their log streams.
+        
+        log_entries = []
+        for event in page['events']:
+            if event['message'] and event['timestamp']:
+                # Display full log entries without collapsible feature
+                log_entries.append(f"""<div class='log-entry'>
+                    <span class='log-timestamp'>{event['formatted_time']}</span>
+                    <span class='log-message'>{event['message']}</span>
+                </div>""")
+        
+        if log_entries:
+            return "<div class='log-container'>" + "".join(log_entries) + "</div>"
+        return f"<div class='log-container log-empty'>No log events found in stream '{log_stream_name}'.</div>"
+    
+    def build_graph_with_logs(self, event_bus_name: str, rule_names: List[str] = None,
+                              snapshot: Optional[TopologySnapshot] = None,
+                              include_overlaps: bool = True) -> nx.DiGraph:
+        """Build a graph representation of the event bus, rules and targets.
+        
+        The graph is derived from a topology snapshot, so no AWS calls are made.
         
         Args:
             event_bus_name: Name of the event bus
             rule_names: Optional list of rule names to filter by
+            snapshot: Optional snapshot to build from. Defaults to the rules fetched for the
+                selected bus, or else the cached topology of the bus.
+            include_overlaps: Whether to connect rules that match the same events with
+                'overlap' edges (from the narrower rule for subsumed ones) and to mark rules
+                that can never match
             
         Returns:
-            NetworkX DiGraph object representing the event bus, rules, targets, and log stream summaries.
+            NetworkX DiGraph object representing the event bus, rules and targets.
         """
-        G = nx.DiGraph()
-        
-        # Add event bus node
-        G.add_node(event_bus_name, type='event_bus', name=event_bus_name, label=event_bus_name)
+        if snapshot is None:
+            if self.snapshot is not None and self.snapshot.event_bus_name == event_bus_name:
+                snapshot = self.snapshot
+            elif self.rules and self.selected_bus == event_bus_name:
+                snapshot = TopologySnapshot(event_bus_name, self.rules)
+            else:
+                snapshot = self.get_topology_snapshot(event_bus_name)
         
-        # Process each rule
-        for rule_data in self.rules: # Assuming self.rules contains the rule objects
-            rule_name = rule_data['Name']
-            
-            # Skip if we're filtering rules and this one isn't in the list
-            if rule_names and rule_name not in rule_names:
-                continue
-                
-            # Add rule node
-            G.add_node(rule_name, type='rule', name=rule_name, label=rule_name)
-            
-            # Connect event bus to rule
-            G.add_edge(event_bus_name, rule_name)
-            
-            # Get rule details (which should include targets after previous fixes)
-            rule_details = self.get_rule_details(rule_name)
-            
-            if not rule_details:
-                print(f"Warning: Could not get details for rule {rule_name}. Skipping targets for this rule.")
-                continue
-
-            # Include the event pattern in the rule node data
-            event_pattern = rule_details.get('EventPattern')
-            if event_pattern:
-                G.nodes[rule_name]['eventPattern'] = event_pattern
-
-            # Process targets
-            for target in rule_details.get('Targets', []):
-                target_id_from_aws = target.get('Id', 'unknown_target')
-                target_arn = target.get('Arn', 'unknown_arn')
-                # Create a unique node ID for the target, prefixed by its rule, as targets can be reused.
-                target_node_id = f"target:{rule_name}:{target_id_from_aws}" 
-                
-                # Extract service name and function name from ARN if available
-                display_name = target_id_from_aws  # Default to AWS target ID
-                if ':lambda:' in target_arn and ':function:' in target_arn:
-                    # Extract the function name from the ARN
-                    display_name = target_arn.split(':function:')[-1]
-                
-                # Add target node
-                G.add_node(target_node_id, 
-                          type='target', 
-                          name=target_id_from_aws, # Original ID in rule
-                          label=display_name, # Cytoscape label - using function name for Lambda
-                          arn=target_arn, 
-                          rule_name=rule_name) # Store original rule name for context
-                
-                # Connect rule to target
-                G.add_edge(rule_name, target_node_id)
-                
-                # Note: Log stream nodes are no longer added to the graph
-                # Instead, log streams will be fetched and displayed in the target details panel
+        # Log streams are not graph nodes; they are fetched for the target details panel
+        graph = snapshot.build_graph(rule_names)
+        if include_overlaps:
+            self._add_overlap_edges(graph, self.analyze_overlaps(event_bus_name, snapshot))
+        return graph
+    
+    @staticmethod
+    def _add_overlap_edges(graph: nx.DiGraph, report: Dict[str, Any]) -> None:
+        """Add the findings of an overlap report between rules shown in a graph."""
+        def is_rule(name):
+            return name in graph and graph.nodes[name].get('type') == 'rule'
         
-        return G
+        for finding in report['findings']:
+            if finding['relation'] == SUBSUMED:
+                source, target = finding['narrower'], finding['broader']
+            else:
+                source, target = finding['rules']
+            if is_rule(source) and is_rule(target):
+                graph.add_edge(source, target, type='overlap', relation=finding['relation'],
+                               fields=finding['fields'], sharedTargets=finding['shared_targets'])
+        for contradiction in report['contradictions']:
+            if is_rule(contradiction['rule']):
+                graph.nodes[contradiction['rule']]['contradiction'] = contradiction['reason']
+    
+    def build_graph(self, event_bus_name: str, rule_names: List[str] = None) -> nx.DiGraph:
+        """Build the basic event bus graph for the selected rules from the topology snapshot."""
+        snapshot = self.get_topology_snapshot(event_bus_name)
+        graph, _ = self._build_basic_graph(event_bus_name, snapshot.to_list(rule_names))
+        return graph
+    
     def get_rule_details(self, rule_name):
         """Get details for a specific rule, attempting to augment with list_targets_by_rule if needed."""
         if not self.selected_bus:
             print(f"Error in get_rule_details: No event bus selected when trying to describe rule '{rule_name}'.")
             return None 
         
+        # Serve from the cached topology snapshot when it already holds the rule
+        snapshot = self.topology_cache.get(self.topology_cache_key(self.selected_bus))
+        if snapshot is not None and snapshot.get_rule(rule_name) is not None:
+            return snapshot.to_list([rule_name])[0]
+        
         print(f"Getting details for rule: {rule_name} on event bus: {self.selected_bus}")
         rule_details_response = None
         try:
@@ -0,0 +1,208 @@
+"""
+Account crawler for AWS EventBridge Explorer.
+This module contains the paginated, parallel crawl of event buses, rules and targets.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Optional
+
+from eventbridge.retry import call_with_backoff
+from eventbridge.topology import TopologySnapshot
+
+
+class AccountInventory:
+    """Combined result of crawling every event bus of an account and region."""
+
+    def __init__(self, buses: List[Dict[str, Any]], account: Optional[str] = None,
+                 region: Optional[str] = None):
+        """Initialize an empty inventory.
+
+        Args:
+            buses: Event buses as returned by list_event_buses
+            account: AWS account ID the buses belong to
+            region: AWS region the buses belong to
+        """
+        self.account = account
+        self.region = region
+        self.buses = buses
+        self.snapshots: Dict[str, TopologySnapshot] = {}
+        self.errors: Dict[str, str] = {}
+        self.timings: Dict[str, float] = {}
+        self.elapsed = 0.0
+
+    @property
+    def rule_count(self) -> int:
+        """Total number of rules across all crawled buses."""
+        return sum(len(snapshot) for snapshot in self.snapshots.values())
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return a JSON-serializable view of the inventory."""
+        return {
+            'account': self.account,
+            'region': self.region,
+            'buses': self.buses,
+            'rules': {bus: snapshot.to_list() for bus, snapshot in self.snapshots.items()},
+            'errors': self.errors,
+            'timings': self.timings,
+            'elapsed': self.elapsed,
+            'total_rules': self.rule_count,
+        }
+
+
+class AccountCrawler:
+    """Crawl event buses, rules and targets under one shared concurrency limit.
+
+    Every AWS call made by the crawler, whichever bus it belongs to, waits for a
+    slot in the same semaphore, so max_in_flight bounds the load on the account
+    no matter how many buses are crawled at once.
+    """
+
+    def __init__(self, events_client, max_in_flight: int = 8,
+                 progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None):
+        """Initialize the crawler.
+
+        Args:
+            events_client: boto3 EventBridge client
+            max_in_flight: Maximum number of concurrent AWS calls
+            progress_callback: Optional callable receiving a progress dict per bus event
+        """
+        self.events_client = events_client
+        self.max_in_flight = max(1, max_in_flight)
+        self.progress_callback = progress_callback
+        self._slots = threading.BoundedSemaphore(self.max_in_flight)
+
+    def _call(self, func: Callable[..., Any], **kwargs) -> Any:
+        """Call an AWS API under the shared concurrency limit, retrying throttled calls."""
+        with self._slots:
+            return call_with_backoff(func, **kwargs)
+
+    def list_event_buses(self) -> List[Dict[str, Any]]:
+        """List all event buses of the account, following NextToken pagination."""
+        buses = []
+        kwargs = {}
+        while True:
+            response = self._call(self.events_client.list_event_buses, **kwargs)
+            buses.extend(response.get('EventBuses', []))
+            next_token = response.get('NextToken')
+            if not next_token:
+                return buses
+            kwargs['NextToken'] = next_token
+
+    def crawl_rules(self, event_bus_name: str,
+                    executor: Optional[ThreadPoolExecutor] = None) -> List[Dict[str, Any]]:
+        """List all rules of an event bus with their targets.
+
+        Args:
+            event_bus_name: Name of the event bus
+            executor: Optional shared executor for target calls
+
+        Returns:
+            List of rules, each with a 'Targets' list. Target errors are isolated
+            to their rule, which then gets an empty target list.
+        """
+        # Use pagination to get all rules, taking a slot for every page request
+        rules = []
+        paginator = self.events_client.get_paginator('list_rules')
+        pages = iter(paginator.paginate(EventBusName=event_bus_name))
+        while True:
+            with self._slots:
+                page = next(pages, None)
+            if page is None:
+                break
+            rules.extend(page.get('Rules', []))
+
+        if executor is not None:
+            list(executor.map(lambda rule: self._fetch_rule_targets(rule, event_bus_name), rules))
+        elif self.max_in_flight > 1 and len(rules) > 1:
+            with ThreadPoolExecutor(max_workers=min(self.max_in_flight, len(rules))) as own_executor:
+                # Each worker writes only to its own rule, so no locking is needed
+                list(own_executor.map(lambda rule: self._fetch_rule_targets(rule, event_bus_name), rules))
+        else:
+            for rule in rules:
+                self._fetch_rule_targets(rule, event_bus_name)
+        return rules
+
+    def _fetch_rule_targets(self, rule: Dict[str, Any], event_bus_name: str) -> None:
+        """Fetch the targets of a single rule, isolating errors to the rule."""
+        try:
+            targets_response = self._call(
+                self.events_client.list_targets_by_rule,
+                Rule=rule['Name'],
+                EventBusName=event_bus_name
+            )
+            rule['Targets'] = targets_response.get('Targets', [])
+        except Exception as e:
+            print(f"Error fetching targets for rule {rule['Name']}: {e}")
+            rule['Targets'] = []
+
+    def crawl(self, buses: Optional[List[Dict[str, Any]]] = None,
+              known_snapshots: Optional[Dict[str, TopologySnapshot]] = None,
+              account: Optional[str] = None, region: Optional[str] = None) -> AccountInventory:
+        """Crawl the rules and targets of every event bus in parallel.
+
+        Args:
+            buses: Event buses to crawl, defaults to all buses of the account
+            known_snapshots: Fresh snapshots by bus name that do not need a re-crawl
+            account: AWS account ID to tag the inventory with
+            region: AWS region to tag the inventory with
+
+        Returns:
+            AccountInventory with a snapshot, an error or both per bus, and per-bus timings
+        """
+        started = time.monotonic()
+        if buses is None:
+            buses = self.list_event_buses()
+        known_snapshots = known_snapshots or {}
+        inventory = AccountInventory(buses, account=account, region=region)
+        total = len(buses)
+        completed = 0
+
+        for name, snapshot in known_snapshots.items():
+            if any(bus['Name'] == name for bus in buses):
+                inventory.snapshots[name] = snapshot
+                inventory.timings[name] = 0.0
+                completed += 1
+                self._report(name, 'cached', completed, total, rules=len(snapshot), elapsed=0.0)
+
+        to_crawl = [bus['Name'] for bus in buses if bus['Name'] not in known_snapshots]
+        if to_crawl:
+            # Bus crawls wait on target calls, so they get their own pool to avoid deadlock
+            with ThreadPoolExecutor(max_workers=self.max_in_flight) as target_executor, \
+                    ThreadPoolExecutor(max_workers=min(self.max_in_flight, len(to_crawl))) as bus_executor:
+                futures = {
+                    bus_executor.submit(self._crawl_bus, name, target_executor): name
+                    for name in to_crawl
+                }
+                for future in as_completed(futures):
+                    name = futures[future]
+                    completed += 1
+                    try:
+                        snapshot, elapsed = future.result()
+                        inventory.snapshots[name] = snapshot
+                        inventory.timings[name] = elapsed
+                        self._report(name, 'done', completed, total, rules=len(snapshot), elapsed=elapsed)
+                    except Exception as e:
+                        inventory.errors[name] = str(e)
+                        self._report(name, 'failed', completed, total, error=str(e))
+
+        inventory.elapsed = time.monotonic() - started
+        print(f"Crawled {total} event buses with {inventory.rule_count} rules in {inventory.elapsed:.2f}s")
+        return inventory
+
+    def _crawl_bus(self, event_bus_name: str, executor: ThreadPoolExecutor):
+        """Crawl one bus and return its snapshot with the time it took."""
+        started = time.monotonic()
+        snapshot = TopologySnapshot(event_bus_name, self.crawl_rules(event_bus_name, executor))
+        return snapshot, time.monotonic() - started
+
+    def _report(self, bus: str, status: str, completed: int, total: int, **details) -> None:
+        """Send a progress update to the callback, if one is set."""
+        if self.progress_callback is None:
+            return
+        try:
+            self.progress_callback({'bus': bus, 'status': status, 'completed': completed,
+                                    'total': total, **details})
+        except Exception as e:
+            print(f"Error in crawl progress callback: {str(e)}")
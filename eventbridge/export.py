@@ -0,0 +1,239 @@
+"""
+Bulk log export for AWS EventBridge Explorer.
+This module contains the exporter that streams every log row of a long time range
+as gzip-compressed NDJSON, splitting the range until each slice fits in one Logs
+Insights query.
+"""
+
+import json
+import os
+import threading
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+from eventbridge.insights import InsightsQueryRunner, row_timestamp
+from eventbridge.search import CompiledSearch
+
+# Logs Insights returns at most this many rows per query
+MAX_ROWS_PER_QUERY = 10000
+
+
+def export_query(search: Optional[CompiledSearch] = None, row_cap: int = MAX_ROWS_PER_QUERY) -> str:
+    """Build the Logs Insights query for one export slice, oldest row first."""
+    query = "fields @timestamp, @message, @logStream"
+    if search is not None and not search.empty:
+        query += f" | {search.insights_filter()}"
+    return query + f" | sort @timestamp asc | limit {row_cap}"
+
+
+def row_to_record(row: List[Dict[str, str]]) -> Dict[str, Any]:
+    """Convert an Insights result row to the object written as one NDJSON line."""
+    record = {field['field'].lstrip('@'): field.get('value') for field in row
+              if field.get('field') and field['field'] != '@ptr'}
+    timestamp = row_timestamp(row)
+    if timestamp is not None:
+        record['epochMillis'] = int(round(timestamp * 1000))
+    return record
+
+
+class LogExporter:
+    """Export all rows of a log group and time range as a stream of gzip members.
+
+    The range is cut into slices that run concurrently under the shared query
+    limit. A slice whose query hits the Insights row cap, or times out, is split
+    in half and queried again, so dense periods end up in short slices and
+    sparse ones in long slices. Slices are emitted strictly in time order, each
+    as one complete gzip member; concatenated members form one valid gzip file
+    of NDJSON lines, oldest first. At most max_workers slices are held in
+    memory at a time, however long the range is.
+
+    After each member the exporter reports a checkpoint with the time cursor
+    reached and the bytes written so far. Passing it back to export resumes
+    right after the last member, so an interrupted download can be continued
+    by truncating the output to the checkpointed byte offset.
+    """
+
+    def __init__(self, runner: InsightsQueryRunner, logs_client, log_group_name: str,
+                 search: Optional[CompiledSearch] = None, max_workers: int = 4,
+                 row_cap: int = MAX_ROWS_PER_QUERY, query_timeout: float = 60,
+                 compress_level: int = 6):
+        """Initialize the exporter.
+
+        Args:
+            runner: Logs Insights query runner
+            logs_client: boto3 CloudWatch Logs client
+            log_group_name: Log group to export
+            search: Optional search the exported rows must match
+            max_workers: Maximum number of slices queried at once
+            row_cap: Row limit of each slice query; a slice reaching it is split
+            query_timeout: Seconds a slice query may run before the slice is split
+            compress_level: zlib compression level of the gzip output
+        """
+        self.runner = runner
+        self.logs_client = logs_client
+        self.log_group_name = log_group_name
+        self.search = search
+        self.max_workers = max(1, max_workers)
+        self.row_cap = row_cap
+        self.query_timeout = query_timeout
+        self.compress_level = compress_level
+        self.query = export_query(search, row_cap)
+        self.stats = {'queries': 0, 'splits': 0, 'slices': 0, 'rows': 0, 'bytes': 0, 'truncated_slices': 0}
+
+    def export(self, start_time: int, end_time: int, checkpoint: Optional[Dict[str, Any]] = None,
+               on_checkpoint: Optional[Callable[[Dict[str, Any]], None]] = None,
+               cancel_event: Optional[threading.Event] = None) -> Iterator[bytes]:
+        """Stream the export of [start_time, end_time) as gzip-compressed NDJSON.
+
+        Args:
+            start_time: Start of the time range (Unix timestamp in seconds, inclusive)
+            end_time: End of the time range (Unix timestamp in seconds, exclusive)
+            checkpoint: Checkpoint of an interrupted export of the same range to resume
+            on_checkpoint: Called with a new checkpoint after each gzip member has been consumed
+            cancel_event: Optional event that stops the export when set
+
+        Yields:
+            Chunks of gzip data
+        """
+        start_time, end_time = int(start_time), int(end_time)
+        state = {'log_group': self.log_group_name, 'query': self.query, 'start_time': start_time,
+                 'end_time': end_time, 'cursor': start_time, 'rows': 0, 'bytes': 0}
+        if checkpoint:
+            if any(checkpoint.get(key) != state[key] for key in ('log_group', 'query', 'start_time', 'end_time')):
+                raise ValueError("Checkpoint belongs to a different export")
+            state.update(cursor=checkpoint['cursor'], rows=checkpoint['rows'], bytes=checkpoint['bytes'])
+
+        stop = threading.Event()
+        pending: Deque[Tuple[int, int]] = deque(self._initial_slices(state['cursor'], end_time))
+        running: Dict[Tuple[int, int], Any] = {}
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            while pending:
+                # Keep the next slices in time order running; the head is always among them
+                for time_range in list(pending)[:self.max_workers]:
+                    if time_range not in running:
+                        running[time_range] = executor.submit(self._query_slice, time_range, stop)
+                        self.stats['queries'] += 1
+
+                time_range = pending[0]
+                future = running.pop(time_range)
+                while not wait([future], timeout=0.1).done:
+                    if cancel_event is not None and cancel_event.is_set():
+                        stop.set()
+                if stop.is_set():
+                    return
+                response = future.result()
+                slice_start, slice_end = time_range
+                results = response['results']
+                # Rows come oldest first, so the slice is cut off only if the last row is still inside it
+                too_many = (response['status'] == 'Complete' and len(results) >= self.row_cap
+                            and (row_timestamp(results[-1]) or slice_start) < slice_end)
+                if (too_many or response['status'] == 'Timeout') and slice_end - slice_start > 1:
+                    # Too dense or too slow for one query: query both halves instead
+                    middle = (slice_start + slice_end) // 2
+                    pending.popleft()
+                    pending.extendleft([(middle, slice_end), (slice_start, middle)])
+                    self.stats['splits'] += 1
+                    continue
+                if response['status'] != 'Complete':
+                    raise RuntimeError(f"Export query for {self.log_group_name} failed between {slice_start} "
+                                       f"and {slice_end}: {response.get('error', response['status'])}")
+                if too_many:
+                    # A single second with more rows than one query returns; keep what we got
+                    self.stats['truncated_slices'] += 1
+                    print(f"Export of {self.log_group_name} truncated at {slice_start}: "
+                          f"more than {self.row_cap} rows in one second")
+
+                pending.popleft()
+                # Both ends of a query range are inclusive; a row on the boundary belongs to the next slice
+                rows = [row for row in results
+                        if slice_start <= (row_timestamp(row) or slice_start) < slice_end]
+                written = 0
+                for chunk in self._compress(rows):
+                    written += len(chunk)
+                    yield chunk
+                self.stats['slices'] += 1
+                self.stats['rows'] += len(rows)
+                self.stats['bytes'] += written
+                state.update(cursor=slice_end, rows=state['rows'] + len(rows), bytes=state['bytes'] + written)
+                if on_checkpoint is not None:
+                    on_checkpoint(dict(state))
+        finally:
+            # Stop queries still running, e.g. when the client disconnected
+            stop.set()
+            executor.shutdown(wait=True)
+
+    def _initial_slices(self, start_time: int, end_time: int) -> List[Tuple[int, int]]:
+        """Cut the range into one slice per worker, oldest first."""
+        span = max(0, end_time - start_time)
+        count = max(1, min(self.max_workers, span))
+        bounds = [start_time + span * i // count for i in range(count)] + [end_time]
+        return [(bounds[i], bounds[i + 1]) for i in range(count) if bounds[i + 1] > bounds[i]]
+
+    def _query_slice(self, time_range: Tuple[int, int], stop: threading.Event) -> Dict[str, Any]:
+        """Run the export query for one slice."""
+        return self.runner.run(self.logs_client, self.query, time_range[0], time_range[1],
+                               log_group_name=self.log_group_name, limit=self.row_cap,
+                               timeout=self.query_timeout, cancel_event=stop)
+
+    def _compress(self, rows: List[Any]) -> Iterator[bytes]:
+        """Compress rows as NDJSON into one complete gzip member."""
+        compressor = zlib.compressobj(self.compress_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        for row in rows:
+            chunk = compressor.compress((json.dumps(row_to_record(row)) + '\n').encode('utf-8'))
+            if chunk:
+                yield chunk
+        yield compressor.flush()
+
+
+def export_to_file(exporter: LogExporter, start_time: int, end_time: int, path: str,
+                   resume: bool = True) -> Dict[str, Any]:
+    """Export to a file, checkpointing next to it so an interrupted export can resume.
+
+    Args:
+        exporter: Configured exporter
+        start_time: Start of the time range (Unix timestamp in seconds)
+        end_time: End of the time range (Unix timestamp in seconds)
+        path: Output file, e.g. logs.ndjson.gz
+        resume: Continue from the checkpoint of an earlier run of the same export, if any
+
+    Returns:
+        Dictionary with 'success', 'message', 'rows', 'bytes' and 'resumed'
+    """
+    checkpoint_path = path + '.checkpoint'
+    checkpoint = None
+    if resume and os.path.exists(checkpoint_path) and os.path.exists(path):
+        with open(checkpoint_path) as f:
+            checkpoint = json.load(f)
+
+    def save_checkpoint(state):
+        temporary = checkpoint_path + '.tmp'
+        with open(temporary, 'w') as f:
+            json.dump(state, f)
+        os.replace(temporary, checkpoint_path)
+
+    try:
+        with open(path, 'r+b' if checkpoint else 'wb') as output:
+            if checkpoint:
+                # Drop whatever was written after the last complete gzip member
+                output.truncate(checkpoint['bytes'])
+                output.seek(checkpoint['bytes'])
+                print(f"Resuming export at {checkpoint['cursor']} after {checkpoint['rows']} rows")
+
+            def write_checkpoint(state):
+                output.flush()
+                save_checkpoint(state)
+
+            for chunk in exporter.export(start_time, end_time, checkpoint=checkpoint, on_checkpoint=write_checkpoint):
+                output.write(chunk)
+    except ValueError as e:
+        return {'success': False, 'message': f"{e}; remove {checkpoint_path} to start over",
+                'rows': 0, 'bytes': 0, 'resumed': bool(checkpoint)}
+
+    rows = exporter.stats['rows'] + (checkpoint['rows'] if checkpoint else 0)
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    return {'success': True, 'message': f"Exported {rows} rows to {path}", 'rows': rows,
+            'bytes': os.path.getsize(path), 'resumed': bool(checkpoint)}
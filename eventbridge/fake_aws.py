@@ -0,0 +1,884 @@
+"""
+Local AWS stand-in for AWS EventBridge Explorer.
+This module contains an in-process fake of the EventBridge, CloudWatch Logs and
+STS calls the explorer makes, with configurable latency, throttling and page
+sizes, and a generator of synthetic accounts, so the crawl and log query paths
+can be benchmarked and regression-tested without network access.
+"""
+
+import bisect
+import datetime
+import heapq
+import itertools
+import json
+import math
+import random
+import re
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple, Union
+
+from botocore.exceptions import ClientError
+
+from eventbridge.patterns import normalize_event
+from eventbridge.publisher import MAX_BATCH_BYTES, MAX_BATCH_ENTRIES, entry_size
+from eventbridge.routing import RuleRoutingIndex
+
+# Largest page each paginated operation returns, as in AWS
+DEFAULT_PAGE_SIZES = {
+    'list_event_buses': 100,
+    'list_rules': 100,
+    'list_targets_by_rule': 100,
+    'describe_log_groups': 50,
+    'describe_log_streams': 50,
+    'get_log_events': 10000,
+    'filter_log_events': 10000,
+}
+
+# Logs Insights returns at most this many rows per query
+MAX_QUERY_RESULTS = 10000
+
+# Per-entry PutEvents errors
+_ENTRY_THROTTLED = 'ThrottlingException'
+
+# One (timestamp in ms, message) log event
+LogEvent = Tuple[int, str]
+
+
+def client_error(code: str, message: str, operation: str) -> ClientError:
+    """Build the ClientError boto3 raises for a failed call."""
+    return ClientError({'Error': {'Code': code, 'Message': message}}, operation)
+
+
+def format_timestamp(timestamp_ms: int) -> str:
+    """Format an epoch timestamp in milliseconds like Logs Insights, in UTC."""
+    moment = datetime.datetime.fromtimestamp(timestamp_ms / 1000, datetime.timezone.utc)
+    return moment.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
+
+
+def synthetic_message(seed: int, index: int) -> str:
+    """Generate the log line of a synthetic stream; about 2% are errors and 8% warnings."""
+    value = (index * 2654435761 + seed * 40503) & 0xFFFFFFFF
+    request_id = f"{value:08x}-{index & 0xFFFF:04x}-{seed & 0xFFFF:04x}"
+    bucket = value % 100
+    if bucket < 2:
+        return f"ERROR RequestId: {request_id} Failed to process order-{value % 100000}: Task timed out"
+    if bucket < 10:
+        return f"WARN RequestId: {request_id} Retrying downstream call attempt={value % 3 + 1}"
+    if bucket < 55:
+        return f"INFO RequestId: {request_id} Processed order-{value % 100000} in {value % 900 + 10} ms"
+    return f"INFO RequestId: {request_id} Received event from app.{value % 50}"
+
+
+def compile_filter_pattern(pattern: Optional[str]) -> Callable[[str], bool]:
+    """Compile a CloudWatch Logs filter pattern of plain and quoted terms, all of which must occur.
+
+    Raises:
+        ValueError: For JSON and space-delimited patterns, which the fake does not support
+    """
+    if not pattern or not pattern.strip():
+        return lambda message: True
+    if pattern.strip()[0] in '{[':
+        raise ValueError("Only term filter patterns are supported")
+    terms = [quoted or plain for quoted, plain in re.findall(r'"([^"]*)"|(\S+)', pattern)]
+    return lambda message: all(term in message for term in terms)
+
+
+class StoredLogStream:
+    """A log stream holding explicitly added events, oldest first."""
+
+    def __init__(self, name: str, creation_time: int):
+        self.name = name
+        self.creation_time = creation_time
+        self._timestamps: List[int] = []
+        self._messages: List[str] = []
+        self._bytes = 0
+
+    def add(self, timestamp: int, message: str) -> None:
+        """Add an event, keeping the stream ordered by timestamp."""
+        position = bisect.bisect_right(self._timestamps, timestamp)
+        self._timestamps.insert(position, timestamp)
+        self._messages.insert(position, message)
+        self._bytes += len(message.encode('utf-8'))
+
+    def count(self, now: int) -> int:
+        """Number of events in the stream."""
+        return len(self._timestamps)
+
+    def index_range(self, start_ms: int, end_ms: int, now: int) -> Tuple[int, int]:
+        """Get the positions [lo, hi) of the events with start_ms <= timestamp < end_ms."""
+        return (bisect.bisect_left(self._timestamps, start_ms), bisect.bisect_left(self._timestamps, end_ms))
+
+    def event(self, index: int) -> LogEvent:
+        """Get the event at a position."""
+        return self._timestamps[index], self._messages[index]
+
+    def stored_bytes(self, now: int) -> int:
+        """Bytes of the messages in the stream."""
+        return self._bytes
+
+
+class SyntheticLogStream:
+    """A log stream with one generated event every interval, computed on demand.
+
+    Events are never materialized, so streams of millions of events cost no
+    memory. Without an end time the stream keeps growing with the clock, like
+    a live function writing logs.
+    """
+
+    # Average length of a generated line, for storedBytes
+    AVERAGE_MESSAGE_BYTES = 90
+
+    def __init__(self, name: str, start_ms: int, interval_ms: int, seed: int = 0, end_ms: Optional[int] = None):
+        self.name = name
+        self.creation_time = start_ms
+        self.start_ms = start_ms
+        self.interval_ms = max(1, interval_ms)
+        self.seed = seed
+        self.end_ms = end_ms
+
+    def count(self, now: int) -> int:
+        """Number of events written up to now."""
+        last = now if self.end_ms is None else min(now, self.end_ms)
+        return max(0, (last - self.start_ms) // self.interval_ms + 1)
+
+    def index_range(self, start_ms: int, end_ms: int, now: int) -> Tuple[int, int]:
+        """Get the positions [lo, hi) of the events with start_ms <= timestamp < end_ms."""
+        count = self.count(now)
+        lo = min(count, max(0, math.ceil((start_ms - self.start_ms) / self.interval_ms)))
+        hi = min(count, max(0, math.ceil((end_ms - self.start_ms) / self.interval_ms)))
+        return lo, max(lo, hi)
+
+    def event(self, index: int) -> LogEvent:
+        """Get the event at a position."""
+        return self.start_ms + index * self.interval_ms, synthetic_message(self.seed, index)
+
+    def stored_bytes(self, now: int) -> int:
+        """Estimated bytes of the messages in the stream."""
+        return self.count(now) * self.AVERAGE_MESSAGE_BYTES
+
+
+LogStream = Union[StoredLogStream, SyntheticLogStream]
+
+
+class FakeLogGroup:
+    """A log group of stored and synthetic streams."""
+
+    def __init__(self, name: str, creation_time: int, retention_days: Optional[int] = None):
+        self.name = name
+        self.creation_time = creation_time
+        self.retention_days = retention_days
+        self.streams: Dict[str, LogStream] = {}
+
+
+class FakePaginator:
+    """Paginator following the NextToken of a fake list operation, like boto3's."""
+
+    def __init__(self, method: Callable[..., Dict[str, Any]], token_key: str = 'NextToken'):
+        self.method = method
+        self.token_key = token_key
+
+    def paginate(self, **kwargs) -> Iterator[Dict[str, Any]]:
+        """Yield every page of the operation."""
+        while True:
+            page = self.method(**kwargs)
+            yield page
+            token = page.get(self.token_key)
+            if not token:
+                return
+            kwargs[self.token_key] = token
+
+
+class _FakeClient:
+    """Base of the fake clients, forwarding calls to the backend."""
+
+    service = ''
+
+    def __init__(self, backend: 'FakeAWSBackend', region: str):
+        self._backend = backend
+        self.meta = SimpleNamespace(region_name=region, service_model=SimpleNamespace(service_name=self.service))
+
+    def _invoke(self, operation: str, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        return self._backend.invoke(operation, kwargs)
+
+
+class FakeEventsClient(_FakeClient):
+    """Fake boto3 EventBridge client."""
+
+    service = 'events'
+
+    def list_event_buses(self, **kwargs):
+        return self._invoke('list_event_buses', kwargs)
+
+    def list_rules(self, **kwargs):
+        return self._invoke('list_rules', kwargs)
+
+    def list_targets_by_rule(self, **kwargs):
+        return self._invoke('list_targets_by_rule', kwargs)
+
+    def describe_rule(self, **kwargs):
+        return self._invoke('describe_rule', kwargs)
+
+    def put_events(self, **kwargs):
+        return self._invoke('put_events', kwargs)
+
+    def get_paginator(self, operation: str) -> FakePaginator:
+        if operation not in ('list_event_buses', 'list_rules', 'list_targets_by_rule'):
+            raise ValueError(f"Operation cannot be paginated: {operation}")
+        return FakePaginator(getattr(self, operation))
+
+
+class FakeLogsClient(_FakeClient):
+    """Fake boto3 CloudWatch Logs client."""
+
+    service = 'logs'
+
+    def describe_log_groups(self, **kwargs):
+        return self._invoke('describe_log_groups', kwargs)
+
+    def describe_log_streams(self, **kwargs):
+        return self._invoke('describe_log_streams', kwargs)
+
+    def get_log_events(self, **kwargs):
+        return self._invoke('get_log_events', kwargs)
+
+    def filter_log_events(self, **kwargs):
+        return self._invoke('filter_log_events', kwargs)
+
+    def start_query(self, **kwargs):
+        return self._invoke('start_query', kwargs)
+
+    def get_query_results(self, **kwargs):
+        return self._invoke('get_query_results', kwargs)
+
+    def stop_query(self, **kwargs):
+        return self._invoke('stop_query', kwargs)
+
+    def get_paginator(self, operation: str) -> FakePaginator:
+        if operation not in ('describe_log_groups', 'describe_log_streams', 'filter_log_events'):
+            raise ValueError(f"Operation cannot be paginated: {operation}")
+        return FakePaginator(getattr(self, operation), token_key='nextToken')
+
+
+class FakeSTSClient(_FakeClient):
+    """Fake boto3 STS client."""
+
+    service = 'sts'
+
+    def get_caller_identity(self, **kwargs):
+        return self._invoke('get_caller_identity', kwargs)
+
+
+_CLIENT_CLASSES = {'events': FakeEventsClient, 'logs': FakeLogsClient, 'sts': FakeSTSClient}
+
+# Logs Insights query commands the fake understands
+_QUERY_COMMANDS = [
+    ('fields', re.compile(r'fields\s+([^|]+)')),
+    ('filter', re.compile(r'filter\s+(@\w+)\s+like\s+/((?:\\.|[^/\\])*)/')),
+    ('sort', re.compile(r'sort\s+(@\w+)(?:\s+(asc|desc))?')),
+    ('limit', re.compile(r'limit\s+(\d+)')),
+]
+
+
+def parse_query(query_string: str) -> Dict[str, Any]:
+    """Parse the subset of Logs Insights used by the explorer: fields, filter like, sort and limit.
+
+    Raises:
+        ValueError: If the query uses anything else
+    """
+    query = {'fields': ['@timestamp', '@message'], 'filters': [], 'descending': True, 'limit': MAX_QUERY_RESULTS}
+    position = 0
+    while True:
+        while position < len(query_string) and query_string[position] in ' \t\n|':
+            position += 1
+        if position >= len(query_string):
+            return query
+        for command, pattern in _QUERY_COMMANDS:
+            match = pattern.match(query_string, position)
+            if match:
+                break
+        else:
+            raise ValueError(f"Unsupported query at: {query_string[position:position + 30]!r}")
+        if command == 'fields':
+            query['fields'] = [field.strip() for field in match.group(1).split(',') if field.strip()]
+        elif command == 'filter':
+            query['filters'].append((match.group(1), re.compile(match.group(2))))
+        elif command == 'sort':
+            query['descending'] = match.group(2) != 'asc'
+        else:
+            query['limit'] = min(int(match.group(1)), MAX_QUERY_RESULTS)
+        position = match.end()
+
+
+class FakeAWSBackend:
+    """In-process stand-in for the EventBridge, CloudWatch Logs and STS APIs.
+
+    Every call can be slowed down by a fixed latency and fail with a
+    ThrottlingException at a given probability, either for all operations or
+    per operation. Paginated operations return pages of at most page_sizes
+    items, so small pages exercise the pagination code paths. Logs Insights
+    queries stay Running for query_latency seconds and are limited to
+    max_concurrent_queries at a time. Events sent with put_events are matched
+    against the rules of their bus, and delivered to /aws/events/<rule> when
+    that log group exists.
+
+    Use client() as a drop-in for boto3.client, or install() to make the
+    shared client registry hand out fake clients.
+    """
+
+    def __init__(self, account_id: str = '123456789012', region: str = 'us-east-1',
+                 latency: Union[float, Mapping[str, float]] = 0.0,
+                 throttle_probability: Union[float, Mapping[str, float]] = 0.0,
+                 page_sizes: Optional[Mapping[str, int]] = None, query_latency: float = 0.0,
+                 max_concurrent_queries: int = 30, put_events_failure_probability: float = 0.0,
+                 seed: int = 0, clock: Callable[[], float] = time.time):
+        """Initialize an empty account with the default event bus.
+
+        Args:
+            account_id: Account ID used in ARNs and returned by STS
+            region: Region used in ARNs and reported by clients
+            latency: Seconds each call takes, overall or by operation name
+            throttle_probability: Chance a call fails with ThrottlingException, overall or by operation name
+            page_sizes: Page size overrides by operation name, see DEFAULT_PAGE_SIZES
+            query_latency: Seconds a Logs Insights query stays Running
+            max_concurrent_queries: Logs Insights queries running at once before start_query fails
+            put_events_failure_probability: Chance a PutEvents entry fails with ThrottlingException
+            seed: Seed of the throttling, failure and event ID generator
+            clock: Wall clock in seconds
+        """
+        self.account_id = account_id
+        self.region = region
+        self.latency = latency
+        self.throttle_probability = throttle_probability
+        self.page_sizes = dict(DEFAULT_PAGE_SIZES, **(page_sizes or {}))
+        self.query_latency = query_latency
+        self.max_concurrent_queries = max_concurrent_queries
+        self.put_events_failure_probability = put_events_failure_probability
+        self.clock = clock
+        self._random = random.Random(seed)
+        self._lock = threading.RLock()
+
+        self.buses: Dict[str, Dict[str, Any]] = {}
+        self.rules: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self.targets: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        self.log_groups: Dict[str, FakeLogGroup] = {}
+        self.queries: Dict[str, Dict[str, Any]] = {}
+        self.published: deque = deque(maxlen=10000)
+        self._routing: Dict[str, Tuple[int, RuleRoutingIndex]] = {}
+        self._rule_versions: Counter = Counter()
+        self.stats = {'calls': Counter(), 'throttled': Counter(), 'published_events': 0, 'failed_entries': 0,
+                      'deliveries': 0}
+        self.add_event_bus('default')
+
+    # Setup
+
+    def now_ms(self) -> int:
+        """Current time of the backend in epoch milliseconds."""
+        return int(self.clock() * 1000)
+
+    def add_event_bus(self, name: str) -> Dict[str, Any]:
+        """Create an event bus."""
+        with self._lock:
+            bus = {'Name': name, 'Arn': f"arn:aws:events:{self.region}:{self.account_id}:event-bus/{name}"}
+            self.buses[name] = bus
+            self.rules.setdefault(name, {})
+            return bus
+
+    def add_rule(self, event_bus_name: str, name: str, event_pattern: Union[None, str, Mapping[str, Any]] = None,
+                 targets: Iterable[Union[str, Mapping[str, Any]]] = (), state: str = 'ENABLED',
+                 schedule_expression: Optional[str] = None, description: Optional[str] = None) -> Dict[str, Any]:
+        """Create a rule with targets given as ARNs or target objects."""
+        with self._lock:
+            if event_bus_name not in self.buses:
+                self.add_event_bus(event_bus_name)
+            arn_name = name if event_bus_name == 'default' else f"{event_bus_name}/{name}"
+            rule = {'Name': name, 'Arn': f"arn:aws:events:{self.region}:{self.account_id}:rule/{arn_name}",
+                    'State': state, 'EventBusName': event_bus_name}
+            if event_pattern is not None:
+                rule['EventPattern'] = event_pattern if isinstance(event_pattern, str) else json.dumps(event_pattern)
+            if schedule_expression:
+                rule['ScheduleExpression'] = schedule_expression
+            if description:
+                rule['Description'] = description
+            self.rules[event_bus_name][name] = rule
+            self.targets[event_bus_name, name] = [
+                {'Id': target.rsplit(':', 1)[-1][:64], 'Arn': target} if isinstance(target, str) else dict(target)
+                for target in targets
+            ]
+            self._rule_versions[event_bus_name] += 1
+            return rule
+
+    def add_log_group(self, name: str, retention_days: Optional[int] = None) -> FakeLogGroup:
+        """Create a log group, or return the existing one."""
+        with self._lock:
+            if name not in self.log_groups:
+                self.log_groups[name] = FakeLogGroup(name, self.now_ms(), retention_days)
+            return self.log_groups[name]
+
+    def add_log_events(self, log_group_name: str, log_stream_name: str,
+                       events: Iterable[Union[LogEvent, Mapping[str, Any]]]) -> None:
+        """Write events, given as (timestamp in ms, message) or {'timestamp', 'message'}, to a stream."""
+        with self._lock:
+            group = self.add_log_group(log_group_name)
+            stream = group.streams.get(log_stream_name)
+            if stream is None:
+                stream = group.streams[log_stream_name] = StoredLogStream(log_stream_name, self.now_ms())
+            if not isinstance(stream, StoredLogStream):
+                raise ValueError(f"Log stream {log_stream_name} is synthetic")
+            for event in events:
+                if isinstance(event, Mapping):
+                    stream.add(int(event['timestamp']), event['message'])
+                else:
+                    stream.add(int(event[0]), event[1])
+
+    def add_synthetic_stream(self, log_group_name: str, log_stream_name: str, start_ms: int, interval_ms: int,
+                             end_ms: Optional[int] = None, seed: Optional[int] = None) -> SyntheticLogStream:
+        """Add a stream generating one event every interval_ms from start_ms (until end_ms, or the clock)."""
+        with self._lock:
+            group = self.add_log_group(log_group_name)
+            if seed is None:
+                seed = len(self.log_groups) * 1000 + len(group.streams)
+            stream = SyntheticLogStream(log_stream_name, start_ms, interval_ms, seed=seed, end_ms=end_ms)
+            group.streams[log_stream_name] = stream
+            return stream
+
+    @classmethod
+    def synthetic(cls, rules: int = 10000, buses: int = 4, functions: int = 200, hours: float = 24,
+                  events_per_minute: float = 60, rule_log_every: int = 10, seed: int = 0,
+                  **options) -> 'FakeAWSBackend':
+        """Build an account with many rules and a large volume of generated logs.
+
+        Rules are spread over the buses and key on a mix of source and
+        detail-type values, content filters and patterns without either. Each
+        rule targets a Lambda function, and every fifth rule an SQS queue too.
+        Every function has a log group of three streams writing
+        events_per_minute events in total, so 200 functions over 24 hours hold
+        about 17 million log lines; nothing is materialized until it is read.
+        Every rule_log_every-th rule also has an /aws/events/<rule> log group.
+
+        Args:
+            rules: Number of rules
+            buses: Number of event buses, including the default bus
+            functions: Number of Lambda functions targeted by the rules
+            hours: Hours of logs before now in every log group
+            events_per_minute: Log events per minute in each function log group
+            rule_log_every: Give every n-th rule a rule log group (0 for none)
+            seed: Seed of the generated data
+            **options: Further FakeAWSBackend arguments, e.g. latency
+        """
+        backend = cls(seed=seed, **options)
+        bus_names = ['default'] + [f"bus-{number}" for number in range(1, buses)]
+        for name in bus_names[1:]:
+            backend.add_event_bus(name)
+
+        start_ms = backend.now_ms() - int(hours * 3600 * 1000)
+        streams_per_group = 3
+        interval_ms = max(1, int(60000 * streams_per_group / events_per_minute))
+        for number in range(functions):
+            group = f"/aws/lambda/fn-{number}"
+            backend.add_log_group(group, retention_days=14)
+            for stream in range(streams_per_group):
+                # Offset the streams so their events interleave
+                backend.add_synthetic_stream(group, f"2024/01/01/[$LATEST]{number:04x}{stream:04x}",
+                                             start_ms + stream * interval_ms // streams_per_group, interval_ms,
+                                             seed=seed * 100003 + number * streams_per_group + stream)
+
+        queue_arn = f"arn:aws:sqs:{backend.region}:{backend.account_id}:queue-{{}}"
+        function_arn = f"arn:aws:lambda:{backend.region}:{backend.account_id}:function:fn-{{}}"
+        for number in range(rules):
+            kind = number % 10
+            if kind == 0:
+                pattern = {'detail': {'amount': [{'numeric': ['>', number % 1000]}]}}
+            elif kind == 1:
+                pattern = {'detail-type': [f"Type {number % 7}"]}
+            elif kind < 6:
+                pattern = {'source': [f"app.{number % 50}"], 'detail-type': [f"Type {number % 7}"]}
+            else:
+                pattern = {'source': [f"app.{number % 50}", f"app.{(number + 1) % 50}"],
+                           'detail': {'state': ['ok', {'prefix': 'fail'}]}}
+            targets = [function_arn.format(number % functions)]
+            if number % 5 == 0:
+                targets.append(queue_arn.format(number % 20))
+            name = f"rule-{number}"
+            backend.add_rule(bus_names[number % len(bus_names)], name, pattern, targets,
+                             state='DISABLED' if number % 50 == 49 else 'ENABLED')
+            if rule_log_every and number % rule_log_every == 0:
+                backend.add_synthetic_stream(f"/aws/events/{name}", 'events', start_ms, interval_ms * 10,
+                                             seed=seed * 100003 + functions * streams_per_group + number)
+        return backend
+
+    # Clients
+
+    def client(self, service: str, region_name: Optional[str] = None, **kwargs) -> _FakeClient:
+        """Create a fake client; accepts the arguments of boto3.client."""
+        if service not in _CLIENT_CLASSES:
+            raise ValueError(f"Service not supported by the fake backend: {service}")
+        return _CLIENT_CLASSES[service](self, region_name or self.region)
+
+    def install(self, registry=None) -> None:
+        """Make a client registry, by default the process-wide one, hand out clients of this backend."""
+        from eventbridge import clients
+        registry = registry or clients.registry
+        registry.clear()
+        registry.client_factory = lambda service, region=None, profile=None: self.client(service, region)
+
+    def invoke(self, operation: str, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Run an operation after its latency, failing it if it is throttled."""
+        with self._lock:
+            self.stats['calls'][operation] += 1
+            throttled = self._random.random() < self._setting(self.throttle_probability, operation)
+            if throttled:
+                self.stats['throttled'][operation] += 1
+        delay = self._setting(self.latency, operation)
+        if delay:
+            time.sleep(delay)
+        if throttled:
+            raise client_error('ThrottlingException', 'Rate exceeded', operation)
+        return getattr(self, f"_{operation}")(**kwargs)
+
+    @staticmethod
+    def _setting(value: Union[float, Mapping[str, float]], operation: str) -> float:
+        """Get a setting given overall or by operation name."""
+        if isinstance(value, Mapping):
+            return value.get(operation, 0.0)
+        return value
+
+    def _page(self, items: List[Any], operation: str, token: Optional[str], limit: Optional[int]) -> Tuple[
+            List[Any], Optional[str]]:
+        """Cut one page out of a listing; tokens are offsets."""
+        start = int(token) if token else 0
+        size = min(int(limit), self.page_sizes[operation]) if limit else self.page_sizes[operation]
+        end = start + size
+        return items[start:end], (str(end) if end < len(items) else None)
+
+    @staticmethod
+    def _with_token(response: Dict[str, Any], key: str, token: Optional[str]) -> Dict[str, Any]:
+        if token:
+            response[key] = token
+        return response
+
+    # EventBridge
+
+    def _bus_name(self, name_or_arn: Optional[str], operation: str) -> str:
+        """Resolve an event bus name or ARN, failing if the bus does not exist."""
+        name = (name_or_arn or 'default').rsplit('event-bus/', 1)[-1]
+        if name not in self.buses:
+            raise client_error('ResourceNotFoundException', f"Event bus {name} does not exist.", operation)
+        return name
+
+    def _list_event_buses(self, NamePrefix: Optional[str] = None, NextToken: Optional[str] = None,
+                          Limit: Optional[int] = None) -> Dict[str, Any]:
+        with self._lock:
+            buses = [dict(bus) for name, bus in sorted(self.buses.items()) if name.startswith(NamePrefix or '')]
+        page, token = self._page(buses, 'list_event_buses', NextToken, Limit)
+        return self._with_token({'EventBuses': page}, 'NextToken', token)
+
+    def _list_rules(self, EventBusName: Optional[str] = None, NamePrefix: Optional[str] = None,
+                    NextToken: Optional[str] = None, Limit: Optional[int] = None) -> Dict[str, Any]:
+        with self._lock:
+            bus = self._bus_name(EventBusName, 'ListRules')
+            rules = [dict(rule) for name, rule in self.rules[bus].items() if name.startswith(NamePrefix or '')]
+        page, token = self._page(rules, 'list_rules', NextToken, Limit)
+        return self._with_token({'Rules': page}, 'NextToken', token)
+
+    def _rule(self, bus: str, name: str, operation: str) -> Dict[str, Any]:
+        rule = self.rules[bus].get(name)
+        if rule is None:
+            raise client_error('ResourceNotFoundException', f"Rule {name} does not exist on EventBus {bus}.",
+                               operation)
+        return rule
+
+    def _list_targets_by_rule(self, Rule: str, EventBusName: Optional[str] = None,
+                              NextToken: Optional[str] = None, Limit: Optional[int] = None) -> Dict[str, Any]:
+        with self._lock:
+            bus = self._bus_name(EventBusName, 'ListTargetsByRule')
+            self._rule(bus, Rule, 'ListTargetsByRule')
+            targets = [dict(target) for target in self.targets[bus, Rule]]
+        page, token = self._page(targets, 'list_targets_by_rule', NextToken, Limit)
+        return self._with_token({'Targets': page}, 'NextToken', token)
+
+    def _describe_rule(self, Name: str, EventBusName: Optional[str] = None) -> Dict[str, Any]:
+        with self._lock:
+            bus = self._bus_name(EventBusName, 'DescribeRule')
+            return dict(self._rule(bus, Name, 'DescribeRule'), CreatedBy=self.account_id)
+
+    def _routing_index(self, bus: str) -> RuleRoutingIndex:
+        """Get the routing index of a bus's enabled rules, rebuilt when its rules change."""
+        version = self._rule_versions[bus]
+        cached = self._routing.get(bus)
+        if cached is None or cached[0] != version:
+            patterns = {name: rule['EventPattern'] for name, rule in self.rules[bus].items()
+                        if rule.get('EventPattern') and rule['State'] == 'ENABLED'}
+            cached = self._routing[bus] = (version, RuleRoutingIndex(patterns))
+        return cached[1]
+
+    def _put_events(self, Entries: List[Dict[str, Any]], EndpointId: Optional[str] = None) -> Dict[str, Any]:
+        if not Entries or len(Entries) > MAX_BATCH_ENTRIES:
+            raise client_error('ValidationException',
+                               f"PutEvents takes between 1 and {MAX_BATCH_ENTRIES} entries", 'PutEvents')
+        if sum(entry_size(entry) for entry in Entries) > MAX_BATCH_BYTES:
+            raise client_error('ValidationException', 'Total size of the entries in the request is over the limit.',
+                               'PutEvents')
+        results = []
+        with self._lock:
+            for entry in Entries:
+                result = self._put_entry(entry)
+                results.append(result)
+                if 'ErrorCode' in result:
+                    self.stats['failed_entries'] += 1
+                else:
+                    self.stats['published_events'] += 1
+        return {'FailedEntryCount': sum(1 for result in results if 'ErrorCode' in result), 'Entries': results}
+
+    def _put_entry(self, entry: Dict[str, Any]) -> Dict[str, str]:
+        """Accept one PutEvents entry and deliver it to the matching rules."""
+        if not entry.get('Source') or not entry.get('DetailType') or not entry.get('Detail'):
+            return {'ErrorCode': 'InvalidArgument', 'ErrorMessage': 'Source, DetailType and Detail are required.'}
+        try:
+            detail = json.loads(entry['Detail'])
+        except (TypeError, ValueError):
+            detail = None
+        if not isinstance(detail, dict):
+            return {'ErrorCode': 'MalformedDetail', 'ErrorMessage': 'Detail is malformed.'}
+        name = (entry.get('EventBusName') or 'default').rsplit('event-bus/', 1)[-1]
+        if name not in self.buses:
+            return {'ErrorCode': 'ResourceNotFoundException', 'ErrorMessage': f"Event bus {name} does not exist."}
+        if self._random.random() < self.put_events_failure_probability:
+            return {'ErrorCode': _ENTRY_THROTTLED, 'ErrorMessage': 'Rate exceeded'}
+
+        event_id = str(uuid.UUID(int=self._random.getrandbits(128), version=4))
+        now = self.now_ms()
+        event = normalize_event(dict(entry, Detail=detail))
+        event.update({'version': '0', 'id': event_id, 'account': self.account_id, 'region': self.region})
+        event.setdefault('time', format_timestamp(now)[:19].replace(' ', 'T') + 'Z')
+        event.pop('EventBusName', None)
+        self.published.append(event)
+        for rule_name in self._routing_index(name).match(event):
+            self.stats['deliveries'] += 1
+            if f"/aws/events/{rule_name}" in self.log_groups:
+                self.add_log_events(f"/aws/events/{rule_name}", 'deliveries', [(now, json.dumps(event))])
+        return {'EventId': event_id}
+
+    # CloudWatch Logs
+
+    def _group(self, name: str, operation: str) -> FakeLogGroup:
+        group = self.log_groups.get(name)
+        if group is None:
+            raise client_error('ResourceNotFoundException', 'The specified log group does not exist.', operation)
+        return group
+
+    def _describe_log_groups(self, logGroupNamePrefix: Optional[str] = None, nextToken: Optional[str] = None,
+                             limit: Optional[int] = None) -> Dict[str, Any]:
+        now = self.now_ms()
+        with self._lock:
+            groups = []
+            for name in sorted(self.log_groups):
+                if not name.startswith(logGroupNamePrefix or ''):
+                    continue
+                group = self.log_groups[name]
+                description = {
+                    'logGroupName': name, 'creationTime': group.creation_time, 'metricFilterCount': 0,
+                    'arn': f"arn:aws:logs:{self.region}:{self.account_id}:log-group:{name}:*",
+                    'storedBytes': sum(stream.stored_bytes(now) for stream in group.streams.values())
+                }
+                if group.retention_days:
+                    description['retentionInDays'] = group.retention_days
+                groups.append(description)
+        page, token = self._page(groups, 'describe_log_groups', nextToken, limit)
+        return self._with_token({'logGroups': page}, 'nextToken', token)
+
+    def _describe_log_streams(self, logGroupName: str, logStreamNamePrefix: Optional[str] = None,
+                              orderBy: str = 'LogStreamName', descending: bool = False,
+                              nextToken: Optional[str] = None, limit: Optional[int] = None) -> Dict[str, Any]:
+        now = self.now_ms()
+        with self._lock:
+            group = self._group(logGroupName, 'DescribeLogStreams')
+            streams = []
+            for name, stream in group.streams.items():
+                if not name.startswith(logStreamNamePrefix or ''):
+                    continue
+                description = {
+                    'logStreamName': name, 'creationTime': stream.creation_time, 'storedBytes': 0,
+                    'arn': f"arn:aws:logs:{self.region}:{self.account_id}:log-group:{logGroupName}:log-stream:{name}"
+                }
+                count = stream.count(now)
+                if count:
+                    description['firstEventTimestamp'] = stream.event(0)[0]
+                    description['lastEventTimestamp'] = description['lastIngestionTime'] = stream.event(count - 1)[0]
+                streams.append(description)
+        if orderBy == 'LastEventTime':
+            streams.sort(key=lambda stream: stream.get('lastEventTimestamp', 0), reverse=descending)
+        else:
+            streams.sort(key=lambda stream: stream['logStreamName'], reverse=descending)
+        page, token = self._page(streams, 'describe_log_streams', nextToken, limit)
+        return self._with_token({'logStreams': page}, 'nextToken', token)
+
+    def _get_log_events(self, logGroupName: str, logStreamName: str, startTime: Optional[int] = None,
+                        endTime: Optional[int] = None, nextToken: Optional[str] = None, limit: Optional[int] = None,
+                        startFromHead: bool = False, unmask: bool = False) -> Dict[str, Any]:
+        now = self.now_ms()
+        with self._lock:
+            group = self._group(logGroupName, 'GetLogEvents')
+            stream = group.streams.get(logStreamName)
+            if stream is None:
+                raise client_error('ResourceNotFoundException', 'The specified log stream does not exist.',
+                                   'GetLogEvents')
+            # Tokens are positions: f/<n> reads from n onwards, b/<n> reads the events before n
+            lo, hi = stream.index_range(startTime or 0, endTime if endTime is not None else now + 1, now)
+            size = min(int(limit), self.page_sizes['get_log_events']) if limit else self.page_sizes['get_log_events']
+            if nextToken:
+                direction, position = nextToken.split('/', 1)
+                position = min(max(int(position), lo), hi)
+                forward = direction == 'f'
+            else:
+                forward = startFromHead
+                position = lo if forward else hi
+            first, last = (position, min(hi, position + size)) if forward else (max(lo, position - size), position)
+            events = []
+            for index in range(first, last):
+                timestamp, message = stream.event(index)
+                events.append({'timestamp': timestamp, 'message': message, 'ingestionTime': timestamp})
+        return {'events': events, 'nextForwardToken': f"f/{last}", 'nextBackwardToken': f"b/{first}"}
+
+    def _events_after(self, group: FakeLogGroup, stream_names: Iterable[str], start_ms: int, end_ms: int,
+                      now: int, descending: bool = False) -> Iterator[Tuple[int, str, int]]:
+        """Merge the (timestamp, stream, position) keys of a window of several streams in time order."""
+        def keys(name: str, stream: LogStream) -> Iterator[Tuple[int, str, int]]:
+            lo, hi = stream.index_range(start_ms, end_ms, now)
+            positions = range(hi - 1, lo - 1, -1) if descending else range(lo, hi)
+            for position in positions:
+                yield stream.event(position)[0], name, position
+
+        return heapq.merge(*(keys(name, group.streams[name]) for name in stream_names if name in group.streams),
+                           reverse=descending)
+
+    def _filter_log_events(self, logGroupName: str, logStreamNames: Optional[List[str]] = None,
+                           logStreamNamePrefix: Optional[str] = None, startTime: Optional[int] = None,
+                           endTime: Optional[int] = None, filterPattern: Optional[str] = None,
+                           nextToken: Optional[str] = None, limit: Optional[int] = None,
+                           interleaved: Optional[bool] = None, unmask: bool = False) -> Dict[str, Any]:
+        now = self.now_ms()
+        try:
+            matches = compile_filter_pattern(filterPattern)
+        except ValueError as e:
+            raise client_error('InvalidParameterException', str(e), 'FilterLogEvents')
+        with self._lock:
+            group = self._group(logGroupName, 'FilterLogEvents')
+            names = logStreamNames or [name for name in group.streams if name.startswith(logStreamNamePrefix or '')]
+            after = tuple(json.loads(nextToken)) if nextToken else None
+            start_ms = max(startTime or 0, after[0] if after else 0)
+            size = min(int(limit), self.page_sizes['filter_log_events']) if limit \
+                else self.page_sizes['filter_log_events']
+            keys = self._events_after(group, names, start_ms, endTime if endTime is not None else now + 1, now)
+            if after:
+                keys = itertools.dropwhile(lambda key: key <= after, keys)
+
+            events = []
+            last_key = None
+            for key in keys:
+                if len(events) >= size:
+                    break
+                last_key = key
+                timestamp, stream_name, position = key
+                message = group.streams[stream_name].event(position)[1]
+                if matches(message):
+                    events.append({'logStreamName': stream_name, 'timestamp': timestamp, 'message': message,
+                                   'ingestionTime': timestamp, 'eventId': f"{timestamp}-{stream_name}-{position}"})
+            else:
+                last_key = None
+        return self._with_token({'events': events, 'searchedLogStreams': []}, 'nextToken',
+                                json.dumps(last_key) if last_key is not None else None)
+
+    def _running_queries(self, now: float) -> int:
+        return sum(1 for query in self.queries.values() if query['status'] == 'Running' and query['ready_at'] > now)
+
+    def _start_query(self, queryString: str, startTime: int, endTime: int, logGroupName: Optional[str] = None,
+                     logGroupNames: Optional[List[str]] = None, logGroupIdentifiers: Optional[List[str]] = None,
+                     limit: Optional[int] = None) -> Dict[str, Any]:
+        try:
+            query = parse_query(queryString)
+        except (ValueError, re.error) as e:
+            raise client_error('MalformedQueryException', str(e), 'StartQuery')
+        names = logGroupNames or logGroupIdentifiers or ([logGroupName] if logGroupName else [])
+        if not names:
+            raise client_error('InvalidParameterException', 'A log group is required.', 'StartQuery')
+        now = time.monotonic()
+        with self._lock:
+            for name in names:
+                self._group(name, 'StartQuery')
+            if self._running_queries(now) >= self.max_concurrent_queries:
+                raise client_error('LimitExceededException', 'Account maximum query concurrency limit reached.',
+                                   'StartQuery')
+            if limit:
+                query['limit'] = min(query['limit'], int(limit))
+            query_id = str(uuid.UUID(int=self._random.getrandbits(128), version=4))
+            self.queries[query_id] = dict(query, groups=names, start_ms=int(startTime) * 1000,
+                                          end_ms=int(endTime) * 1000 + 1000, status='Running',
+                                          ready_at=now + self.query_latency, results=None)
+        return {'queryId': query_id}
+
+    def _query(self, query_id: str, operation: str) -> Dict[str, Any]:
+        query = self.queries.get(query_id)
+        if query is None:
+            raise client_error('ResourceNotFoundException', 'The query does not exist.', operation)
+        return query
+
+    def _get_query_results(self, queryId: str) -> Dict[str, Any]:
+        with self._lock:
+            query = self._query(queryId, 'GetQueryResults')
+            if query['status'] == 'Running' and time.monotonic() >= query['ready_at']:
+                query['results'], query['statistics'] = self._run_query(query)
+                query['status'] = 'Complete'
+            return {'status': query['status'], 'results': query['results'] or [],
+                    'statistics': query.get('statistics', {'recordsMatched': 0.0, 'recordsScanned': 0.0,
+                                                           'bytesScanned': 0.0})}
+
+    def _stop_query(self, queryId: str) -> Dict[str, Any]:
+        with self._lock:
+            query = self._query(queryId, 'StopQuery')
+            if query['status'] != 'Running':
+                raise client_error('InvalidParameterException', f"Query is {query['status']}.", 'StopQuery')
+            query['status'] = 'Cancelled'
+        return {'success': True}
+
+    def _run_query(self, query: Dict[str, Any]) -> Tuple[List[List[Dict[str, str]]], Dict[str, float]]:
+        """Evaluate a parsed Logs Insights query over its log groups."""
+        now = self.now_ms()
+        descending = query['descending']
+        merged = heapq.merge(*(
+            ((key, name) for key in self._events_after(self.log_groups[name], list(self.log_groups[name].streams),
+                                                      query['start_ms'], query['end_ms'], now, descending))
+            for name in query['groups']), reverse=descending)
+        rows = []
+        scanned = scanned_bytes = 0
+        for (timestamp, stream_name, position), group_name in merged:
+            message = self.log_groups[group_name].streams[stream_name].event(position)[1]
+            scanned += 1
+            scanned_bytes += len(message)
+            if not all(regex.search(message) for _, regex in query['filters']):
+                continue
+            values = {'@timestamp': format_timestamp(timestamp), '@message': message, '@logStream': stream_name,
+                      '@log': f"{self.account_id}:{group_name}", '@ingestionTime': format_timestamp(timestamp)}
+            row = [{'field': field, 'value': values[field]} for field in query['fields'] if field in values]
+            row.append({'field': '@ptr', 'value': f"{group_name}/{stream_name}/{position}"})
+            rows.append(row)
+            if len(rows) >= query['limit']:
+                break
+        statistics = {'recordsMatched': float(len(rows)), 'recordsScanned': float(scanned),
+                      'bytesScanned': float(scanned_bytes)}
+        return rows, statistics
+
+    # STS
+
+    def _get_caller_identity(self) -> Dict[str, Any]:
+        return {'Account': self.account_id, 'UserId': 'AIDAFAKEUSER', 'Arn': f"arn:aws:iam::{self.account_id}:user/fake"}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return the calls and throttles by operation and the PutEvents counters."""
+        with self._lock:
+            return {'calls': dict(self.stats['calls']), 'throttled': dict(self.stats['throttled']),
+                    'published_events': self.stats['published_events'],
+                    'failed_entries': self.stats['failed_entries'], 'deliveries': self.stats['deliveries']}
@@ -0,0 +1,168 @@
+"""
+Multi-region and multi-profile fan-out for AWS EventBridge Explorer.
+This module contains the engine that crawls several (profile, region) pairs at once
+and merges them into one inventory.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from eventbridge import clients
+from eventbridge.crawler import AccountCrawler, AccountInventory
+
+# A crawl target is an AWS profile and region; None means the environment default
+CrawlTarget = Tuple[Optional[str], Optional[str]]
+
+
+def parse_crawl_targets(value: str) -> List[CrawlTarget]:
+    """Parse a comma-separated list of profile:region pairs.
+
+    Either side may be empty to use the default, e.g. "prod:eu-west-1,:us-east-1,dev:".
+    A value without a colon is taken as a region.
+    """
+    targets = []
+    for item in value.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        if ':' in item:
+            profile, region = item.split(':', 1)
+        else:
+            profile, region = '', item
+        targets.append((profile.strip() or None, region.strip() or None))
+    return targets
+
+
+class MultiRegionInventory:
+    """Inventories of several accounts and regions merged into one view."""
+
+    def __init__(self):
+        """Initialize an empty merged inventory."""
+        self.inventories: Dict[Tuple[str, str], AccountInventory] = {}
+        self.profiles: Dict[Tuple[str, str], Optional[str]] = {}
+        self.errors: List[Dict[str, Any]] = []
+        self.timings: Dict[str, float] = {}
+        self.elapsed = 0.0
+
+    def add(self, profile: Optional[str], inventory: AccountInventory) -> bool:
+        """Add the inventory of one target, ignoring duplicates of an account and region.
+
+        Returns:
+            True if the inventory was added, False if that account and region was already present
+        """
+        key = (inventory.account, inventory.region)
+        if key in self.inventories:
+            return False
+        self.inventories[key] = inventory
+        self.profiles[key] = profile
+        return True
+
+    def rules(self) -> List[Dict[str, Any]]:
+        """Return every rule of every inventory, tagged with account, region and event bus."""
+        merged = []
+        for (account, region), inventory in sorted(self.inventories.items(), key=lambda item: str(item[0])):
+            for bus_name, snapshot in inventory.snapshots.items():
+                for rule in snapshot.to_list():
+                    rule.update({'Account': account, 'Region': region, 'EventBusName': bus_name})
+                    merged.append(rule)
+        return merged
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return a JSON-serializable view of the merged inventory."""
+        return {
+            'inventories': [
+                dict(inventory.to_dict(), profile=self.profiles[key])
+                for key, inventory in sorted(self.inventories.items(), key=lambda item: str(item[0]))
+            ],
+            'rules': self.rules(),
+            'errors': self.errors,
+            'timings': self.timings,
+            'elapsed': self.elapsed,
+        }
+
+
+class FanoutEngine:
+    """Crawl several (profile, region) pairs, each in its own worker, session and client pool.
+
+    Clients come from the client registry, which keeps one session per profile
+    and one client (with its own connection pool) per service, region and
+    profile, so nothing is shared between targets.
+    """
+
+    def __init__(self, targets: List[CrawlTarget], max_workers: Optional[int] = None,
+                 max_in_flight: int = 8, registry: Optional[clients.ClientRegistry] = None):
+        """Initialize the engine.
+
+        Args:
+            targets: (profile, region) pairs to crawl
+            max_workers: Number of targets crawled at once, defaults to all of them
+            max_in_flight: Maximum concurrent AWS calls within each target
+            registry: Client registry, defaults to the process-wide one
+        """
+        self.targets = list(dict.fromkeys(targets))
+        self.max_workers = max_workers or max(1, len(self.targets))
+        self.max_in_flight = max_in_flight
+        self.registry = registry or clients.registry
+
+    def crawl(self, progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None) -> MultiRegionInventory:
+        """Crawl every target and merge the results.
+
+        Args:
+            progress_callback: Optional callable receiving per-bus progress dicts,
+                tagged with the profile and region of the target
+
+        Returns:
+            MultiRegionInventory tagged by account and region. Failed targets are
+            listed in its errors and do not affect the others.
+        """
+        started = time.monotonic()
+        merged = MultiRegionInventory()
+        if not self.targets:
+            return merged
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                executor.submit(self._crawl_target, profile, region, progress_callback): (profile, region)
+                for profile, region in self.targets
+            }
+            for future in as_completed(futures):
+                profile, region = futures[future]
+                label = f"{profile or 'default'}:{region or 'default'}"
+                try:
+                    inventory, elapsed = future.result()
+                    merged.timings[label] = elapsed
+                    if not merged.add(profile, inventory):
+                        print(f"Skipping {label}: account {inventory.account} in {inventory.region} "
+                              f"was already crawled through another profile")
+                except Exception as e:
+                    print(f"Error crawling {label}: {str(e)}")
+                    merged.errors.append({'profile': profile, 'region': region, 'message': str(e)})
+
+        merged.elapsed = time.monotonic() - started
+        return merged
+
+    def _crawl_target(self, profile: Optional[str], region: Optional[str],
+                      progress_callback: Optional[Callable[[Dict[str, Any]], None]]):
+        """Crawl one (profile, region) pair with its own session and clients."""
+        started = time.monotonic()
+        events_client = self.registry.get_client('events', region=region, profile=profile)
+
+        def report(progress):
+            if progress_callback is not None:
+                progress_callback(dict(progress, profile=profile, region=events_client.meta.region_name))
+
+        crawler = AccountCrawler(events_client, max_in_flight=self.max_in_flight, progress_callback=report)
+        buses = crawler.list_event_buses()
+        account = self._account_id(profile, region, buses)
+        inventory = crawler.crawl(buses, account=account, region=events_client.meta.region_name)
+        return inventory, time.monotonic() - started
+
+    def _account_id(self, profile: Optional[str], region: Optional[str], buses: List[Dict[str, Any]]) -> str:
+        """Get the account of a target from its event bus ARNs, or STS as a fallback."""
+        for bus in buses:
+            parts = bus.get('Arn', '').split(':')
+            if len(parts) > 4 and parts[4]:
+                return parts[4]
+        sts_client = self.registry.get_client('sts', region=region, profile=profile)
+        return sts_client.get_caller_identity()['Account']
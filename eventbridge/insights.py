@@ -0,0 +1,319 @@
+"""
+Logs Insights query runner for AWS EventBridge Explorer.
+This module contains the shared component that starts, polls and stops CloudWatch
+Logs Insights queries under a process-wide concurrency limit.
+"""
+
+import datetime
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional, Tuple
+
+from eventbridge.retry import call_with_backoff
+
+# Query states in which get_query_results may still change
+ACTIVE_STATUSES = ('Scheduled', 'Running')
+
+# Shards shorter than this are not worth the per-query overhead
+MIN_SHARD_SECONDS = 3600
+
+
+def row_timestamp(row: List[Dict[str, str]]) -> Optional[float]:
+    """Get the @timestamp of an Insights result row as epoch seconds, or None if it has none."""
+    value = next((field['value'] for field in row if field.get('field') == '@timestamp'), None)
+    if not value:
+        return None
+    for fmt in ('%Y-%m-%d %H:%M:%S.%f', '%Y-%m-%d %H:%M:%S'):
+        try:
+            parsed = datetime.datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+        # Insights returns timestamps in UTC
+        return parsed.replace(tzinfo=datetime.timezone.utc).timestamp()
+    return None
+
+
+def split_time_range(start_time: int, end_time: int, shards: int,
+                     min_shard_seconds: int = MIN_SHARD_SECONDS) -> List[Tuple[int, int]]:
+    """Split a time range into equal slices, newest first.
+
+    Args:
+        start_time: Start of the time range (Unix timestamp in seconds)
+        end_time: End of the time range (Unix timestamp in seconds)
+        shards: Maximum number of slices
+        min_shard_seconds: Minimum length of a slice
+
+    Returns:
+        List of (start, end) tuples covering the range; neighbouring slices share their boundary
+    """
+    span = max(0, end_time - start_time)
+    count = max(1, min(shards, span // max(1, min_shard_seconds)))
+    bounds = [start_time + span * i // count for i in range(count)] + [end_time]
+    return [(bounds[i], bounds[i + 1]) for i in reversed(range(count))]
+
+
+class InsightsQueryRunner:
+    """Run Logs Insights queries with adaptive polling, deadlines and cancellation.
+
+    Polling starts quickly and backs off exponentially, so short queries return
+    fast without hammering get_query_results on long ones. Every query has a
+    hard deadline; on timeout or cancellation the query is stopped on AWS so it
+    no longer counts against the account's concurrent-query quota, and whatever
+    rows it produced so far are returned. Callers beyond max_concurrent wait
+    in line for a slot instead of failing with LimitExceededException.
+    """
+
+    def __init__(self, max_concurrent: int = 10, default_timeout: float = 30.0,
+                 initial_poll_interval: float = 0.1, max_poll_interval: float = 2.0,
+                 poll_backoff: float = 2.0):
+        """Initialize the runner.
+
+        Args:
+            max_concurrent: Maximum number of queries running at once across the process
+            default_timeout: Seconds a query may take, including time spent waiting for a slot
+            initial_poll_interval: Seconds before the first get_query_results call
+            max_poll_interval: Upper bound for the delay between polls
+            poll_backoff: Factor the poll delay grows by after each poll
+        """
+        self.max_concurrent = max_concurrent
+        self.default_timeout = default_timeout
+        self.initial_poll_interval = initial_poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.poll_backoff = poll_backoff
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._lock = threading.Lock()
+        self._running: Dict[str, Any] = {}
+        self.stats = {'started': 0, 'completed': 0, 'timed_out': 0, 'cancelled': 0, 'failed': 0}
+
+    def poll_schedule(self):
+        """Yield the delays between polls: exponential from the initial to the maximum interval."""
+        delay = self.initial_poll_interval
+        while True:
+            yield delay
+            delay = min(self.max_poll_interval, delay * self.poll_backoff)
+
+    def run(self, logs_client, query_string: str, start_time: int, end_time: int,
+            log_group_names: Optional[List[str]] = None, log_group_name: Optional[str] = None,
+            limit: Optional[int] = None, timeout: Optional[float] = None,
+            cancel_event: Optional[threading.Event] = None) -> Dict[str, Any]:
+        """Run a query and wait for it to finish, time out or be cancelled.
+
+        Args:
+            logs_client: boto3 CloudWatch Logs client
+            query_string: Logs Insights query
+            start_time: Start of the time range (Unix timestamp in seconds)
+            end_time: End of the time range (Unix timestamp in seconds)
+            log_group_names: Log groups to query
+            log_group_name: Single log group to query, if log_group_names is not given
+            limit: Optional maximum number of rows
+            timeout: Seconds before the query is stopped, defaults to the runner setting
+            cancel_event: Optional event that stops the query when set, e.g. on client disconnect
+
+        Returns:
+            Dictionary with 'status' (Complete, Failed, Cancelled, Timeout or Unknown),
+            'results', 'partial' (True if the rows are incomplete), 'statistics',
+            'query_id', 'elapsed' and, on failure, 'error'
+        """
+        started = time.monotonic()
+        deadline = started + (timeout if timeout is not None else self.default_timeout)
+        result = {'status': 'Unknown', 'results': [], 'partial': False, 'statistics': {},
+                  'query_id': None, 'elapsed': 0.0}
+
+        # Wait in line for a slot, but never past the deadline
+        if not self._slots.acquire(timeout=max(0.0, deadline - time.monotonic())):
+            return self._finish(result, 'Timeout', started, error='Timed out waiting for a free query slot')
+
+        try:
+            if cancel_event is not None and cancel_event.is_set():
+                return self._finish(result, 'Cancelled', started)
+
+            params = {'queryString': query_string, 'startTime': int(start_time), 'endTime': int(end_time)}
+            if log_group_names:
+                params['logGroupNames'] = log_group_names
+            else:
+                params['logGroupName'] = log_group_name
+            if limit:
+                params['limit'] = int(limit)
+
+            try:
+                query_id = call_with_backoff(logs_client.start_query, **params)['queryId']
+            except Exception as e:
+                return self._finish(result, 'Failed', started, error=str(e))
+
+            result['query_id'] = query_id
+            with self._lock:
+                self._running[query_id] = logs_client
+                self.stats['started'] += 1
+
+            try:
+                return self._wait(logs_client, query_id, result, started, deadline, cancel_event)
+            finally:
+                with self._lock:
+                    self._running.pop(query_id, None)
+        finally:
+            self._slots.release()
+
+    def run_sharded(self, logs_client, query_string: str, start_time: int, end_time: int, limit: int,
+                    shards: int = 8, cancel_event: Optional[threading.Event] = None,
+                    **run_kwargs) -> Dict[str, Any]:
+        """Run a newest-first query as concurrent queries over slices of its time range.
+
+        The query must sort by @timestamp descending and end with a limit. Slices
+        run under the shared concurrency limit, newest first. Their rows are merged
+        in slice order, so the result stays newest-first, and as soon as the newer
+        slices have produced limit rows the older ones are cancelled.
+
+        Args:
+            logs_client: boto3 CloudWatch Logs client
+            query_string: Logs Insights query sorted by @timestamp descending and ending in a limit
+            start_time: Start of the time range (Unix timestamp in seconds)
+            end_time: End of the time range (Unix timestamp in seconds)
+            limit: The limit of the query
+            shards: Maximum number of slices
+            cancel_event: Optional event that stops every slice when set
+            **run_kwargs: Passed on to run for every slice, e.g. log_group_name and timeout
+
+        Returns:
+            Result dictionary like run, with a 'shards' list giving the range, status,
+            row count and elapsed time of each slice
+        """
+        started = time.monotonic()
+        slices = split_time_range(int(start_time), int(end_time), shards)
+        if len(slices) == 1:
+            result = self.run(logs_client, query_string, start_time, end_time,
+                              cancel_event=cancel_event, **run_kwargs)
+            result['shards'] = [self._shard_info(slices[0], result)]
+            return result
+
+        shard_events = [threading.Event() for _ in slices]
+        result = {'status': 'Complete', 'results': [], 'partial': False, 'statistics': {},
+                  'query_id': None, 'elapsed': 0.0, 'shards': []}
+
+        with ThreadPoolExecutor(max_workers=min(len(slices), self.max_concurrent)) as executor:
+            # Submitted newest first, so the newest slices get the first free query slots
+            futures = [
+                executor.submit(self.run, logs_client, query_string, slice_start, slice_end,
+                                cancel_event=shard_event, **run_kwargs)
+                for (slice_start, slice_end), shard_event in zip(slices, shard_events)
+            ]
+            try:
+                for index, future in enumerate(futures):
+                    while not wait([future], timeout=0.1).done:
+                        if cancel_event is not None and cancel_event.is_set():
+                            for shard_event in shard_events:
+                                shard_event.set()
+                    response = future.result()
+                    result['shards'].append(self._shard_info(slices[index], response))
+                    rows = response['results']
+                    if index > 0:
+                        # Both ends of a range are inclusive; a row on the boundary belongs to the newer slice
+                        slice_end = slices[index][1]
+                        rows = [row for row in rows if (row_timestamp(row) or 0) < slice_end]
+                    result['results'].extend(rows)
+                    result['query_id'] = result['query_id'] or response.get('query_id')
+
+                    if response['status'] != 'Complete':
+                        # Rows of older slices would leave a gap in the newest-first order
+                        result['status'] = response['status']
+                        result['partial'] = True
+                        if response.get('error'):
+                            result['error'] = response['error']
+                        break
+                    if len(result['results']) >= limit:
+                        break
+            finally:
+                # Older slices are no longer needed; stop them or keep them from starting
+                for shard_event in shard_events:
+                    shard_event.set()
+
+        result['results'] = result['results'][:limit]
+        result['elapsed'] = time.monotonic() - started
+        return result
+
+    @staticmethod
+    def _shard_info(time_range: Tuple[int, int], response: Dict[str, Any]) -> Dict[str, Any]:
+        """Summarize the outcome of one slice of a sharded query."""
+        return {'start_time': time_range[0], 'end_time': time_range[1], 'status': response['status'],
+                'rows': len(response['results']), 'elapsed': response.get('elapsed', 0.0)}
+
+    def _wait(self, logs_client, query_id: str, result: Dict[str, Any], started: float, deadline: float,
+              cancel_event: Optional[threading.Event]) -> Dict[str, Any]:
+        """Poll a started query until it finishes, stopping it on timeout or cancellation."""
+        response = None
+        for delay in self.poll_schedule():
+            delay = min(delay, max(0.0, deadline - time.monotonic()))
+            if cancel_event is not None:
+                cancelled = cancel_event.wait(delay)
+            else:
+                time.sleep(delay)
+                cancelled = False
+
+            if cancelled:
+                return self._stop(logs_client, query_id, response, result, 'Cancelled', started)
+
+            try:
+                response = call_with_backoff(logs_client.get_query_results, queryId=query_id)
+            except Exception as e:
+                self._stop(logs_client, query_id, response, result, 'Failed', started)
+                result['error'] = str(e)
+                return result
+
+            if response['status'] not in ACTIVE_STATUSES:
+                result['results'] = response.get('results', [])
+                result['statistics'] = response.get('statistics', {})
+                if response['status'] != 'Complete':
+                    result['partial'] = True
+                    return self._finish(result, response['status'], started,
+                                        error=f"Query ended with status {response['status']}")
+                return self._finish(result, 'Complete', started)
+
+            if time.monotonic() >= deadline:
+                return self._stop(logs_client, query_id, response, result, 'Timeout', started)
+
+    def _stop(self, logs_client, query_id: str, last_response: Optional[Dict[str, Any]],
+              result: Dict[str, Any], status: str, started: float) -> Dict[str, Any]:
+        """Stop a query on AWS and return the rows it had produced so far."""
+        try:
+            logs_client.stop_query(queryId=query_id)
+        except Exception as e:
+            # The query may have finished in the meantime
+            print(f"Could not stop Logs Insights query {query_id}: {str(e)}")
+
+        response = last_response
+        try:
+            response = logs_client.get_query_results(queryId=query_id)
+        except Exception:
+            pass
+
+        if response:
+            result['results'] = response.get('results', [])
+            result['statistics'] = response.get('statistics', {})
+        result['partial'] = True
+        return self._finish(result, status, started)
+
+    def _finish(self, result: Dict[str, Any], status: str, started: float,
+                error: Optional[str] = None) -> Dict[str, Any]:
+        """Record the outcome of a query and return its result."""
+        result['status'] = status
+        result['elapsed'] = time.monotonic() - started
+        if error:
+            result['error'] = error
+        key = {'Complete': 'completed', 'Timeout': 'timed_out', 'Cancelled': 'cancelled'}.get(status, 'failed')
+        with self._lock:
+            self.stats[key] += 1
+        return result
+
+    def cancel_all(self) -> None:
+        """Stop every query that is still running, e.g. on shutdown."""
+        with self._lock:
+            running = list(self._running.items())
+        for query_id, logs_client in running:
+            try:
+                logs_client.stop_query(queryId=query_id)
+            except Exception as e:
+                print(f"Could not stop Logs Insights query {query_id}: {str(e)}")
+
+
+# Process-wide runner, so the concurrent-query cap covers every caller
+runner = InsightsQueryRunner()
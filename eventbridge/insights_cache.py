@@ -0,0 +1,226 @@
+"""
+Logs Insights result cache for AWS EventBridge Explorer.
+This module contains the cache that keeps the results of closed time buckets so
+repeated log queries only scan the part of the time range that can still change.
+"""
+
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from eventbridge.insights import row_timestamp
+
+# Quoted strings are kept as-is when a query is normalized; any other whitespace is collapsed
+_QUERY_TOKEN = re.compile(r'("(?:[^"\\]|\\.)*"|\'(?:[^\'\\]|\\.)*\')|\s+')
+
+# Bytes charged per cache entry on top of its rows
+_ENTRY_OVERHEAD = 200
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a Logs Insights query so formatting differences share a cache entry."""
+    normalized = _QUERY_TOKEN.sub(lambda match: match.group(1) or ' ', query.strip())
+    return re.sub(r' ?\| ?', ' | ', normalized)
+
+
+class InsightsResultCache:
+    """Size-bounded LRU cache of Insights results per log group, query and time bucket.
+
+    A requested time range is split into buckets aligned to bucket_seconds. A
+    bucket whose end is more than settle_seconds in the past is closed: its logs
+    no longer change, so its rows are cached until evicted. The open bucket
+    containing "now" and the partial buckets at either end of the range are
+    always queried. Consecutive buckets that are not cached are fetched with one
+    query, newest first, and fetching stops as soon as the limit is reached.
+
+    The cache only applies to queries that sort by @timestamp descending and end
+    with a limit, which is the shape of every log query the explorer runs.
+    """
+
+    def __init__(self, bucket_seconds: int = 900, max_bytes: int = 32 * 1024 * 1024,
+                 settle_seconds: int = 120, clock: Callable[[], float] = time.time):
+        """Initialize the cache.
+
+        Args:
+            bucket_seconds: Length of a time bucket; bucket boundaries are multiples of it
+            max_bytes: Approximate memory budget; least recently used buckets are evicted beyond it
+            settle_seconds: Time after a bucket ends before it counts as closed, covering ingestion delay
+            clock: Callable returning the current epoch time in seconds
+        """
+        self.bucket_seconds = int(bucket_seconds)
+        self.max_bytes = max_bytes
+        self.settle_seconds = settle_seconds
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[str, str, int], Tuple[List[Any], int]]" = OrderedDict()
+        self._bytes = 0
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'queries': 0}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return the hit/miss counters with the current size of the cache."""
+        with self._lock:
+            return dict(self.stats, entries=len(self._entries), bytes=self._bytes, max_bytes=self.max_bytes)
+
+    def clear(self) -> None:
+        """Drop every cached bucket."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _get(self, key: Tuple[str, str, int]) -> Optional[List[Any]]:
+        """Look up a bucket, marking it as recently used."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return entry[0]
+
+    def _put(self, key: Tuple[str, str, int], rows: List[Any]) -> None:
+        """Store the rows of a closed bucket, evicting least recently used buckets if needed."""
+        size = _ENTRY_OVERHEAD + len(json.dumps(rows))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = (rows, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.stats['evictions'] += 1
+
+    def split(self, start_time: int, end_time: int) -> List[Tuple[int, int, bool]]:
+        """Split a time range into pieces at bucket boundaries, newest first.
+
+        Returns:
+            List of (start, end, cacheable) tuples, where cacheable is True for whole closed buckets
+        """
+        closed_before = self.clock() - self.settle_seconds
+        pieces = []
+        piece_start = start_time
+        while piece_start < end_time:
+            bucket_start = piece_start - piece_start % self.bucket_seconds
+            piece_end = min(end_time, bucket_start + self.bucket_seconds)
+            whole = piece_start == bucket_start and piece_end == bucket_start + self.bucket_seconds
+            pieces.append((piece_start, piece_end, whole and piece_end <= closed_before))
+            piece_start = piece_end
+        if not pieces:
+            pieces.append((start_time, end_time, False))
+        pieces.reverse()
+        return pieces
+
+    def run(self, runner, logs_client, log_group_name: str, query: str, start_time: int, end_time: int,
+            limit: int, shards: int = 1, **run_kwargs) -> Dict[str, Any]:
+        """Run a query through the query runner, serving closed buckets from the cache.
+
+        Args:
+            runner: InsightsQueryRunner that executes the queries
+            logs_client: boto3 CloudWatch Logs client
+            log_group_name: Log group to query
+            query: Logs Insights query sorted by @timestamp descending and ending in a limit
+            start_time: Start of the time range (Unix timestamp in seconds)
+            end_time: End of the time range (Unix timestamp in seconds)
+            limit: The limit of the query
+            shards: Split each query into up to this many concurrent time slices
+            **run_kwargs: Passed on to the runner, e.g. timeout and cancel_event
+
+        Returns:
+            The runner result for the whole range, with a 'cache' dict counting the
+            buckets served from the cache and the queries that were run
+        """
+        normalized = normalize_query(query)
+        pieces = self.split(int(start_time), int(end_time))
+        result = {'status': 'Complete', 'results': [], 'partial': False, 'statistics': {},
+                  'query_id': None, 'elapsed': 0.0}
+        cache_info = {'hits': 0, 'queries': 0}
+
+        index = 0
+        while index < len(pieces) and len(result['results']) < limit:
+            piece_start, piece_end, cacheable = pieces[index]
+            cached = self._get((log_group_name, normalized, piece_start)) if cacheable else None
+            if cached is not None:
+                result['results'].extend(cached)
+                cache_info['hits'] += 1
+                index += 1
+                continue
+
+            # Fetch this piece together with every following piece that is not cached either
+            run_end = index + 1
+            while run_end < len(pieces) and not (
+                    pieces[run_end][2] and self._peek((log_group_name, normalized, pieces[run_end][0]))):
+                run_end += 1
+            run = pieces[index:run_end]
+            if shards > 1:
+                response = runner.run_sharded(logs_client, query, run[-1][0], run[0][1], limit,
+                                              shards=shards, log_group_name=log_group_name, **run_kwargs)
+                result.setdefault('shards', []).extend(response['shards'])
+            else:
+                response = runner.run(logs_client, query, run[-1][0], run[0][1],
+                                      log_group_name=log_group_name, **run_kwargs)
+            cache_info['queries'] += 1
+            with self._lock:
+                self.stats['queries'] += 1
+            result['query_id'] = response.get('query_id')
+            result['elapsed'] += response.get('elapsed', 0.0)
+            result['statistics'] = response.get('statistics', {})
+
+            if response['status'] != 'Complete':
+                # Keep what the query produced but do not cache it or look any further
+                result['results'].extend(response.get('results', []))
+                result['status'] = response['status']
+                result['partial'] = True
+                if response.get('error'):
+                    result['error'] = response['error']
+                break
+
+            result['results'].extend(self._store(log_group_name, normalized, run, response['results'],
+                                                 limit, newest=index == 0))
+            if len(response['results']) >= limit:
+                # The query hit the limit, so older pieces cannot add anything newer
+                break
+            index = run_end
+
+        result['results'] = result['results'][:limit]
+        result['cache'] = cache_info
+        return result
+
+    def _peek(self, key: Tuple[str, str, int]) -> bool:
+        """Check whether a bucket is cached without counting a hit or miss."""
+        with self._lock:
+            return key in self._entries
+
+    def _store(self, log_group_name: str, normalized: str, run: List[Tuple[int, int, bool]],
+               rows: List[Any], limit: int, newest: bool) -> List[Any]:
+        """Assign the rows of one query to its pieces and cache the pieces that are complete.
+
+        The query covered the pieces of run, newest first. If it returned fewer rows
+        than the limit, every piece is complete. Otherwise only the pieces starting
+        after the oldest returned row are; older pieces may have lost rows to the limit.
+
+        Returns:
+            The rows that fall inside the pieces, newest first
+        """
+        timestamps = [row_timestamp(row) for row in rows]
+        if any(timestamp is None for timestamp in timestamps):
+            # Without timestamps the rows cannot be assigned to buckets
+            return rows
+
+        truncated = len(rows) >= limit
+        oldest = min(timestamps) if timestamps else None
+        kept = []
+        for position, (piece_start, piece_end, cacheable) in enumerate(run):
+            # The newest piece of the request also takes rows in its final second
+            upper = piece_end + 1 if newest and position == 0 else piece_end
+            piece_rows = [row for row, timestamp in zip(rows, timestamps) if piece_start <= timestamp < upper]
+            kept.extend(piece_rows)
+            if cacheable and (not truncated or piece_start > oldest):
+                self._put((log_group_name, normalized, piece_start), piece_rows)
+        return kept
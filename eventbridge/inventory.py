@@ -0,0 +1,220 @@
+"""
+Persistent inventory store for AWS EventBridge Explorer.
+This module contains the SQLite store that keeps the last-known buses, rules,
+targets and log groups so the UI can start warm.
+"""
+
+import datetime
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from eventbridge.topology import TopologySnapshot
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS buses (
+    account TEXT NOT NULL,
+    region TEXT NOT NULL,
+    name TEXT NOT NULL,
+    arn TEXT,
+    data TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (account, region, name)
+);
+CREATE TABLE IF NOT EXISTS rules (
+    account TEXT NOT NULL,
+    region TEXT NOT NULL,
+    bus TEXT NOT NULL,
+    name TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    event_pattern TEXT,
+    data TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (account, region, bus, name)
+);
+CREATE TABLE IF NOT EXISTS targets (
+    account TEXT NOT NULL,
+    region TEXT NOT NULL,
+    bus TEXT NOT NULL,
+    rule TEXT NOT NULL,
+    target_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    arn TEXT,
+    data TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (account, region, bus, rule, target_id)
+);
+CREATE TABLE IF NOT EXISTS log_groups (
+    account TEXT NOT NULL,
+    region TEXT NOT NULL,
+    name TEXT NOT NULL,
+    stored_bytes INTEGER,
+    retention_days INTEGER,
+    data TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (account, region, name)
+);
+"""
+
+
+def default_cache_dir() -> str:
+    """Get the per-user cache directory for the explorer."""
+    if sys.platform == 'darwin':
+        base = os.path.expanduser('~/Library/Caches')
+    elif os.name == 'nt':
+        base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~\\AppData\\Local')
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+    return os.path.join(base, 'eventbridge-explorer')
+
+
+class InventoryStore:
+    """SQLite-backed store of event buses, rules, targets and log groups.
+
+    Every row is keyed by account and region, so several AWS profiles can share
+    one database file. The database runs in WAL mode so that several explorer
+    processes can read and write it at the same time.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """Initialize the store, creating the database if needed.
+
+        Args:
+            path: Database file, defaults to inventory.db in the user cache directory
+        """
+        self.path = path or os.path.join(default_cache_dir(), 'inventory.db')
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            if self.path != ':memory:':
+                self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.executescript(SCHEMA)
+            self._conn.commit()
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def save_event_buses(self, account: str, region: str, buses: List[Dict[str, Any]]) -> None:
+        """Replace the stored event buses of an account and region."""
+        fetched_at = time.time()
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM buses WHERE account = ? AND region = ?', (account, region))
+            self._conn.executemany(
+                'INSERT INTO buses (account, region, name, arn, data, fetched_at) VALUES (?, ?, ?, ?, ?, ?)',
+                [(account, region, bus['Name'], bus.get('Arn'), json.dumps(bus, default=str), fetched_at)
+                 for bus in buses]
+            )
+
+    def load_event_buses(self, account: str, region: str) -> List[Dict[str, Any]]:
+        """Load the stored event buses of an account and region."""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT data FROM buses WHERE account = ? AND region = ? ORDER BY name',
+                (account, region)
+            ).fetchall()
+        return [json.loads(row['data']) for row in rows]
+
+    def save_snapshot(self, account: str, region: str, snapshot: TopologySnapshot) -> None:
+        """Replace the stored rules and targets of an event bus with a snapshot."""
+        bus = snapshot.event_bus_name
+        fetched_at = snapshot.fetched_at.timestamp()
+        rule_rows = []
+        target_rows = []
+        for position, rule in enumerate(snapshot.to_list()):
+            targets = rule.pop('Targets', [])
+            rule_rows.append((account, region, bus, rule['Name'], position, rule.get('EventPattern'),
+                              json.dumps(rule, default=str), fetched_at))
+            for target_position, target in enumerate(targets):
+                target_rows.append((account, region, bus, rule['Name'], target.get('Id', str(target_position)),
+                                    target_position, target.get('Arn'), json.dumps(target, default=str),
+                                    fetched_at))
+
+        with self._lock, self._conn:
+            key = (account, region, bus)
+            self._conn.execute('DELETE FROM rules WHERE account = ? AND region = ? AND bus = ?', key)
+            self._conn.execute('DELETE FROM targets WHERE account = ? AND region = ? AND bus = ?', key)
+            self._conn.executemany(
+                'INSERT INTO rules (account, region, bus, name, position, event_pattern, data, fetched_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)', rule_rows
+            )
+            self._conn.executemany(
+                'INSERT INTO targets (account, region, bus, rule, target_id, position, arn, data, fetched_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', target_rows
+            )
+
+    def load_snapshot(self, account: str, region: str, bus: str) -> Optional[TopologySnapshot]:
+        """Load the last-known topology of an event bus, or None if it was never stored."""
+        key = (account, region, bus)
+        with self._lock:
+            rule_rows = self._conn.execute(
+                'SELECT name, data, fetched_at FROM rules WHERE account = ? AND region = ? AND bus = ? '
+                'ORDER BY position', key
+            ).fetchall()
+            target_rows = self._conn.execute(
+                'SELECT rule, data FROM targets WHERE account = ? AND region = ? AND bus = ? '
+                'ORDER BY rule, position', key
+            ).fetchall()
+        if not rule_rows:
+            return None
+
+        targets_by_rule: Dict[str, List[Dict[str, Any]]] = {}
+        for row in target_rows:
+            targets_by_rule.setdefault(row['rule'], []).append(json.loads(row['data']))
+
+        rules = []
+        for row in rule_rows:
+            rule = json.loads(row['data'])
+            rule['Targets'] = targets_by_rule.get(row['name'], [])
+            rules.append(rule)
+
+        fetched_at = datetime.datetime.fromtimestamp(min(row['fetched_at'] for row in rule_rows))
+        return TopologySnapshot(bus, rules, fetched_at=fetched_at)
+
+    def save_log_groups(self, account: str, region: str, log_groups: List[Dict[str, Any]],
+                        replace: bool = True) -> None:
+        """Store log group catalog entries of an account and region.
+
+        Args:
+            account: AWS account ID
+            region: AWS region
+            log_groups: Log groups as returned by describe_log_groups
+            replace: Drop all previously stored log groups of the account and region first
+        """
+        fetched_at = time.time()
+        with self._lock, self._conn:
+            if replace:
+                self._conn.execute('DELETE FROM log_groups WHERE account = ? AND region = ?', (account, region))
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO log_groups '
+                '(account, region, name, stored_bytes, retention_days, data, fetched_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                [(account, region, group['logGroupName'], group.get('storedBytes'),
+                  group.get('retentionInDays'), json.dumps(group, default=str), fetched_at)
+                 for group in log_groups]
+            )
+
+    def load_log_groups(self, account: str, region: str) -> Tuple[List[Dict[str, Any]], Optional[float]]:
+        """Load the stored log groups of an account and region.
+
+        Returns:
+            Tuple of the log groups and the oldest fetch time (epoch seconds), or None if empty
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT data, fetched_at FROM log_groups WHERE account = ? AND region = ? ORDER BY name',
+                (account, region)
+            ).fetchall()
+        if not rows:
+            return [], None
+        return [json.loads(row['data']) for row in rows], min(row['fetched_at'] for row in rows)
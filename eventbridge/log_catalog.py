@@ -0,0 +1,192 @@
+"""
+Log group catalog for AWS EventBridge Explorer.
+This module contains the in-memory index of every CloudWatch log group of an
+account and region, so existence, size and retention checks need no AWS call.
+"""
+
+import bisect
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from eventbridge.inventory import InventoryStore
+from eventbridge.retry import call_with_backoff
+
+
+class LogGroupCatalog:
+    """Sorted index of the log groups of one account and region.
+
+    The catalog is built once by paging through describe_log_groups and kept
+    as a sorted list of names, so exact lookups are dictionary hits and prefix
+    lookups are a binary search. A stale catalog keeps answering while a
+    background refresh rebuilds it. A lookup that misses re-checks just that
+    name with AWS, at most once per miss_ttl, and merges the answer into the
+    index, so log groups created since the last refresh are found right away.
+    With an inventory store, the catalog starts from the last stored copy.
+    """
+
+    def __init__(self, logs_client, store: Optional[InventoryStore] = None,
+                 inventory_key: Optional[Tuple[str, str]] = None,
+                 refresh_interval: float = 900, miss_ttl: float = 60):
+        """Initialize the catalog.
+
+        Args:
+            logs_client: boto3 CloudWatch Logs client
+            store: Optional inventory store used to persist the catalog
+            inventory_key: (account, region) the catalog is stored under, required with a store
+            refresh_interval: Seconds after which the catalog is refreshed in the background
+            miss_ttl: Seconds before a missing log group is checked with AWS again
+        """
+        self.logs_client = logs_client
+        self.store = store if inventory_key else None
+        self.inventory_key = inventory_key
+        self.refresh_interval = refresh_interval
+        self.miss_ttl = miss_ttl
+        self._lock = threading.Lock()
+        self._groups: Dict[str, Dict[str, Any]] = {}
+        self._names: List[str] = []
+        self._misses: Dict[str, float] = {}
+        self._loaded_at: Optional[float] = None
+        self._refreshing = False
+
+        if self.store is not None:
+            groups, fetched_at = self.store.load_log_groups(*self.inventory_key)
+            if fetched_at is not None:
+                self._replace(groups, fetched_at)
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the catalog holds a full listing of the log groups."""
+        return self._loaded_at is not None
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def _describe(self, prefix: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Page through describe_log_groups, optionally limited to a name prefix."""
+        groups = []
+        kwargs = {'logGroupNamePrefix': prefix} if prefix else {}
+        while True:
+            response = call_with_backoff(self.logs_client.describe_log_groups, **kwargs)
+            groups.extend(response.get('logGroups', []))
+            next_token = response.get('nextToken')
+            if not next_token:
+                return groups
+            kwargs['nextToken'] = next_token
+
+    def _replace(self, groups: List[Dict[str, Any]], loaded_at: float) -> None:
+        """Swap in a full listing of log groups."""
+        index = {group['logGroupName']: group for group in groups}
+        names = sorted(index)
+        with self._lock:
+            self._groups = index
+            self._names = names
+            self._misses.clear()
+            self._loaded_at = loaded_at
+
+    def _merge_prefix(self, prefix: str, groups: List[Dict[str, Any]]) -> None:
+        """Replace the entries under a name prefix with a fresh listing of that prefix."""
+        with self._lock:
+            for name in self._prefixed(prefix):
+                del self._groups[name]
+            for group in groups:
+                self._groups[group['logGroupName']] = group
+            self._names = sorted(self._groups)
+
+    def _prefixed(self, prefix: str) -> List[str]:
+        """Get the indexed names starting with prefix. The caller holds the lock."""
+        start = bisect.bisect_left(self._names, prefix)
+        end = start
+        while end < len(self._names) and self._names[end].startswith(prefix):
+            end += 1
+        return self._names[start:end]
+
+    def refresh(self) -> int:
+        """Rebuild the catalog from a full listing and persist it.
+
+        Returns:
+            Number of log groups in the catalog
+        """
+        started = time.monotonic()
+        groups = self._describe()
+        self._replace(groups, time.time())
+        if self.store is not None:
+            self.store.save_log_groups(*self.inventory_key, groups)
+        print(f"Indexed {len(groups)} log groups in {time.monotonic() - started:.2f}s")
+        return len(groups)
+
+    def refresh_in_background(self) -> None:
+        """Rebuild the catalog in a background thread, unless a rebuild is already running."""
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def refresh():
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Error refreshing log group catalog: {str(e)}")
+            finally:
+                with self._lock:
+                    self._refreshing = False
+
+        threading.Thread(target=refresh, daemon=True).start()
+
+    def _ensure_fresh(self) -> None:
+        """Start a background rebuild if the catalog is missing or stale."""
+        if self._loaded_at is None or time.time() - self._loaded_at > self.refresh_interval:
+            self.refresh_in_background()
+
+    def get(self, log_group_name: str) -> Optional[Dict[str, Any]]:
+        """Get a log group by exact name, or None if it does not exist.
+
+        A miss is checked with AWS, paging through every group sharing the name
+        as prefix, unless the same name was checked within miss_ttl.
+        """
+        self._ensure_fresh()
+        group = self._groups.get(log_group_name)
+        if group is not None:
+            return group
+
+        with self._lock:
+            checked_at = self._misses.get(log_group_name)
+        if checked_at is not None and time.monotonic() - checked_at < self.miss_ttl:
+            return None
+
+        groups = self._describe(log_group_name)
+        self._merge_prefix(log_group_name, groups)
+        if self.store is not None and groups:
+            self.store.save_log_groups(*self.inventory_key, groups, replace=False)
+        group = self._groups.get(log_group_name)
+        if group is None:
+            with self._lock:
+                self._misses[log_group_name] = time.monotonic()
+        return group
+
+    def exists(self, log_group_name: str) -> bool:
+        """Check whether a log group exists."""
+        return self.get(log_group_name) is not None
+
+    def names_with_prefix(self, prefix: str) -> List[str]:
+        """Get the names of all indexed log groups starting with prefix, in sorted order.
+
+        Unlike get, this answers from the index only; a catalog that was never
+        loaded is built first.
+        """
+        if self._loaded_at is None:
+            self.refresh()
+        else:
+            self._ensure_fresh()
+        with self._lock:
+            return self._prefixed(prefix)
+
+    def stored_bytes(self, log_group_name: str) -> Optional[int]:
+        """Get the stored bytes of a log group, or None if it does not exist."""
+        group = self.get(log_group_name)
+        return group.get('storedBytes') if group else None
+
+    def retention_days(self, log_group_name: str) -> Optional[int]:
+        """Get the retention of a log group in days, or None if it never expires or does not exist."""
+        group = self.get(log_group_name)
+        return group.get('retentionInDays') if group else None
@@ -0,0 +1,178 @@
+"""
+Local log search index for AWS EventBridge Explorer.
+This module contains the trigram index over already fetched log windows, which
+answers repeated searches over the same time range without a new Insights query.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from eventbridge.insights import row_timestamp
+from eventbridge.search import CompiledSearch
+
+# Bytes charged per indexed row and per trigram posting, on top of the message itself
+_ROW_OVERHEAD = 200
+_POSTING_BYTES = 8
+
+
+def row_message(row: List[Dict[str, str]]) -> str:
+    """Get the @message of an Insights result row."""
+    return next((field['value'] for field in row if field.get('field') == '@message'), '') or ''
+
+
+def trigrams(text: str) -> set:
+    """Get the set of three-character substrings of a text."""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class _IndexedWindow:
+    """Rows of one complete log window with a trigram index over their lowercased messages."""
+
+    def __init__(self, rows: List[Any], start_ms: int, end_ms: int, search: Optional[CompiledSearch]):
+        self.rows = rows
+        self.start_ms = start_ms
+        self.end_ms = end_ms
+        self.search = search if search is not None and not search.empty else None
+        self.raw_messages = [row_message(row) for row in rows]
+        self.messages = [message.lower() for message in self.raw_messages]
+        self.timestamps = [int((row_timestamp(row) or 0) * 1000) for row in rows]
+        self.postings: Dict[str, List[int]] = {}
+        for position, message in enumerate(self.messages):
+            for trigram in trigrams(message):
+                self.postings.setdefault(trigram, []).append(position)
+        self.size = (sum(len(message) for message in self.messages) + _ROW_OVERHEAD * len(rows)
+                     + _POSTING_BYTES * sum(len(positions) for positions in self.postings.values()))
+
+    def answers(self, start_ms: int, end_ms: int, search: Optional[CompiledSearch], tolerance_ms: int) -> bool:
+        """Whether every row matching search in the range is among this window's rows."""
+        if self.start_ms > start_ms + tolerance_ms or self.end_ms < end_ms - tolerance_ms:
+            return False
+        # A window fetched for a search only holds rows matching that search
+        if self.search is None:
+            return True
+        return search is not None and search.narrows(self.search)
+
+    def _candidates(self, search: Optional[CompiledSearch]) -> Iterable[int]:
+        """Get the rows that may match: those sharing every trigram of at least one term."""
+        if search is None or search.empty or search.regexes or search.case_sensitive:
+            return range(len(self.rows))
+        candidates = set()
+        for term in search.terms:
+            grams = trigrams(term.lower())
+            if not grams:
+                return range(len(self.rows))
+            postings = sorted((self.postings.get(gram, []) for gram in grams), key=len)
+            matching = set(postings[0])
+            for positions in postings[1:]:
+                matching.intersection_update(positions)
+                if not matching:
+                    break
+            candidates.update(matching)
+        return sorted(candidates)
+
+    def search_rows(self, start_ms: int, end_ms: int, search: Optional[CompiledSearch], limit: int) -> List[Any]:
+        """Return the rows in the range matching search, in stored order."""
+        results = []
+        for position in self._candidates(search):
+            if not start_ms <= self.timestamps[position] <= end_ms:
+                continue
+            if search is None or search.matches(self.raw_messages[position]):
+                results.append(self.rows[position])
+                if len(results) >= limit:
+                    break
+        return results
+
+
+class LogWindowIndex:
+    """Size-bounded LRU index of complete log windows, searchable without AWS calls.
+
+    A window is complete when its query returned fewer rows than its limit, so
+    every matching event of the time range is present. A later search over the
+    same log group and range can then be answered locally, provided the window
+    was fetched without a search, with the same search, or with terms that the
+    new terms contain (typing "err" and then "error" narrows the earlier
+    result). Ranges that end "now" move between requests, so windows match
+    within tolerance_ms.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, tolerance_ms: int = 60000,
+                 max_windows_per_group: int = 20):
+        """Initialize the index.
+
+        Args:
+            max_bytes: Approximate memory budget; least recently used windows are evicted beyond it
+            tolerance_ms: How far the range of a search may extend beyond an indexed window
+            max_windows_per_group: Windows kept per log group; older ones are evicted first
+        """
+        self.max_bytes = max_bytes
+        self.tolerance_ms = tolerance_ms
+        self.max_windows_per_group = max_windows_per_group
+        self._lock = threading.Lock()
+        self._windows: "OrderedDict[Tuple[str, int, int, Optional[str]], _IndexedWindow]" = OrderedDict()
+        self._bytes = 0
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    def add(self, log_group_name: str, start_ms: int, end_ms: int, rows: List[Any],
+            search: Optional[CompiledSearch] = None) -> None:
+        """Index the rows of a complete window, newest first as returned by Insights.
+
+        Args:
+            log_group_name: Log group the rows belong to
+            start_ms: Start of the window in milliseconds
+            end_ms: End of the window in milliseconds
+            rows: Every row of the window matching search
+            search: Search the window was fetched with, if any
+        """
+        window = _IndexedWindow(rows, start_ms, end_ms, search)
+        if window.size > self.max_bytes:
+            return
+        key = (log_group_name, start_ms, end_ms, window.search.key if window.search else None)
+        with self._lock:
+            previous = self._windows.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.size
+            self._windows[key] = window
+            self._bytes += window.size
+
+            group_keys = [other for other in self._windows if other[0] == log_group_name]
+            for other in group_keys[:-self.max_windows_per_group]:
+                self._evict(other)
+            while self._bytes > self.max_bytes:
+                self._evict(next(iter(self._windows)))
+
+    def _evict(self, key: Tuple[str, int, int, Optional[str]]) -> None:
+        """Remove a window. The caller holds the lock."""
+        window = self._windows.pop(key)
+        self._bytes -= window.size
+        self.stats['evictions'] += 1
+
+    def search(self, log_group_name: str, start_ms: int, end_ms: int, search: Optional[CompiledSearch],
+               limit: int) -> Optional[List[Any]]:
+        """Answer a search from an indexed window.
+
+        Returns:
+            The newest matching rows, up to limit, or None if no indexed window can answer it
+        """
+        with self._lock:
+            for key in reversed(self._windows):
+                window = self._windows[key]
+                if key[0] == log_group_name and window.answers(start_ms, end_ms, search, self.tolerance_ms):
+                    self._windows.move_to_end(key)
+                    self.stats['hits'] += 1
+                    break
+            else:
+                self.stats['misses'] += 1
+                return None
+        return window.search_rows(start_ms, end_ms, search, limit)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return the hit/miss counters with the current size of the index."""
+        with self._lock:
+            return dict(self.stats, windows=len(self._windows), bytes=self._bytes, max_bytes=self.max_bytes)
+
+    def clear(self) -> None:
+        """Drop every indexed window."""
+        with self._lock:
+            self._windows.clear()
+            self._bytes = 0
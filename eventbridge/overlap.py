@@ -0,0 +1,306 @@
+"""
+Rule overlap analysis for AWS EventBridge Explorer.
+This module contains the static analysis of the event patterns of a bus that
+finds rules matching the same events, which invoke their targets twice, and
+rules whose pattern can never match.
+"""
+
+import itertools
+import json
+import time
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+from eventbridge.patterns import CompiledPattern, LeafMatcher, literal_key
+from eventbridge.routing import DISCRIMINATING_FIELDS
+
+# Relations between two rules that can match the same event
+DUPLICATE = 'duplicate'
+SUBSUMED = 'subsumed'
+OVERLAP = 'overlap'
+
+# Content filters that only match strings, never numbers
+_STRING_FILTERS = {'prefix', 'suffix', 'equals-ignore-case', 'wildcard', 'cidr'}
+
+# (low, low inclusive, high, high inclusive)
+NumericRange = Tuple[float, bool, float, bool]
+
+
+def _split(leaf: LeafMatcher) -> Tuple[List[Any], List[Dict[str, Any]]]:
+    """Split the match values of a leaf into literals and content filters other than exists."""
+    literals = [value for value in leaf.values if not isinstance(value, dict)]
+    filters = [value for value in leaf.values if isinstance(value, dict) and 'exists' not in value]
+    return literals, filters
+
+
+def _matches_literal(leaf: LeafMatcher, value: Any) -> bool:
+    """Check whether a leaf matches a field holding a single value."""
+    return leaf.matches_values([value], [literal_key(value)])
+
+
+def _matches_present(leaf: LeafMatcher) -> bool:
+    """Check whether a leaf matches any field that is present."""
+    return leaf.exists is True or any(not (isinstance(value, dict) and 'exists' in value) for value in leaf.values)
+
+
+def numeric_range(spec: List[Any]) -> NumericRange:
+    """Get the range of numbers a numeric filter such as [">", 0, "<=", 5] matches."""
+    low, low_inclusive, high, high_inclusive = float('-inf'), False, float('inf'), False
+    for operator, bound in zip(spec[::2], spec[1::2]):
+        if operator in ('>', '>=', '=') and (bound > low or (bound == low and operator == '>')):
+            low, low_inclusive = bound, operator != '>'
+        if operator in ('<', '<=', '=') and (bound < high or (bound == high and operator == '<')):
+            high, high_inclusive = bound, operator != '<'
+    return low, low_inclusive, high, high_inclusive
+
+
+def _range_empty(low: float, low_inclusive: bool, high: float, high_inclusive: bool) -> bool:
+    """Check whether a numeric range contains no number."""
+    return low > high or (low == high and not (low_inclusive and high_inclusive))
+
+
+def _ranges_disjoint(first: NumericRange, second: NumericRange) -> bool:
+    """Check whether two numeric ranges have no number in common."""
+    low, low_inclusive = max((first[0], first[1]), (second[0], second[1]), key=lambda bound: (bound[0], not bound[1]))
+    high, high_inclusive = min((first[2], first[3]), (second[2], second[3]), key=lambda bound: (bound[0], bound[1]))
+    return _range_empty(low, low_inclusive, high, high_inclusive)
+
+
+def _range_within(narrow: NumericRange, broad: NumericRange) -> bool:
+    """Check whether every number of one range is in another."""
+    low, low_inclusive, high, high_inclusive = narrow
+    broad_low, broad_low_inclusive, broad_high, broad_high_inclusive = broad
+    return ((low > broad_low or (low == broad_low and (broad_low_inclusive or not low_inclusive)))
+            and (high < broad_high or (high == broad_high and (broad_high_inclusive or not high_inclusive))))
+
+
+def _filters_disjoint(first: Dict[str, Any], second: Dict[str, Any]) -> bool:
+    """Check whether two content filters provably match no common value.
+
+    Only numeric ranges, prefixes and suffixes are compared; any other pair of
+    filters is assumed to share values.
+    """
+    (kind, argument), (other_kind, other_argument) = next(iter(first.items())), next(iter(second.items()))
+    if kind == 'numeric' and other_kind == 'numeric':
+        return _ranges_disjoint(numeric_range(argument), numeric_range(other_argument))
+    if kind == 'numeric' or other_kind == 'numeric':
+        return (other_kind if kind == 'numeric' else kind) in _STRING_FILTERS
+    if kind == other_kind and kind in ('prefix', 'suffix') and isinstance(argument, str) \
+            and isinstance(other_argument, str):
+        method = str.startswith if kind == 'prefix' else str.endswith
+        return not (method(argument, other_argument) or method(other_argument, argument))
+    return False
+
+
+def _filter_within(narrow: Dict[str, Any], broad: Dict[str, Any]) -> bool:
+    """Check whether every value one content filter matches is matched by another."""
+    if narrow == broad:
+        return True
+    (kind, argument), (broad_kind, broad_argument) = next(iter(narrow.items())), next(iter(broad.items()))
+    if kind != broad_kind:
+        return False
+    if kind == 'numeric':
+        return _range_within(numeric_range(argument), numeric_range(broad_argument))
+    if kind in ('prefix', 'suffix') and isinstance(argument, str) and isinstance(broad_argument, str):
+        return (argument.startswith if kind == 'prefix' else argument.endswith)(broad_argument)
+    return False
+
+
+def leaves_disjoint(first: LeafMatcher, second: LeafMatcher) -> bool:
+    """Check whether two checks of the same field can never match the same event."""
+    if first.exists is False and second.exists is False:
+        return False
+    if (first.exists is True and _matches_present(second)) or (second.exists is True and _matches_present(first)):
+        return False
+    first_literals, first_filters = _split(first)
+    second_literals, second_filters = _split(second)
+    if any(_matches_literal(second, value) for value in first_literals) or \
+            any(_matches_literal(first, value) for value in second_literals):
+        return False
+    return all(_filters_disjoint(spec, other) for spec, other in itertools.product(first_filters, second_filters))
+
+
+def leaf_within(narrow: LeafMatcher, broad: LeafMatcher) -> bool:
+    """Check whether every event matching one check of a field also matches another."""
+    if narrow.exists is not None and narrow.exists is not broad.exists:
+        return False
+    literals, filters = _split(narrow)
+    if not all(_matches_literal(broad, value) for value in literals):
+        return False
+    if broad.exists is True:
+        return True
+    _, broad_filters = _split(broad)
+    return all(any(_filter_within(spec, broad_spec) for broad_spec in broad_filters) for spec in filters)
+
+
+def contradiction(pattern: CompiledPattern) -> Optional[str]:
+    """Explain why a pattern can never match, or return None if it may match."""
+    for leaf in pattern.leaves:
+        literals, filters = _split(leaf)
+        if leaf.exists is None and not literals and \
+                all('numeric' in spec and _range_empty(*numeric_range(spec['numeric'])) for spec in filters):
+            return f"numeric range of {leaf.field} is empty"
+    for alternatives in pattern.alternatives:
+        reasons = [contradiction(alternative) for alternative in alternatives]
+        if all(reasons):
+            return f"no $or alternative can match ({'; '.join(reasons)})"
+    return None
+
+
+def patterns_disjoint(first: CompiledPattern, second: CompiledPattern) -> bool:
+    """Check whether two patterns provably match no common event.
+
+    Patterns are disjoint if a field both check can never match both checks,
+    or if every alternative of one $or of either pattern is disjoint from the
+    other pattern.
+    """
+    first_leaves = {leaf.path: leaf for leaf in first.leaves}
+    if any(leaf.path in first_leaves and leaves_disjoint(first_leaves[leaf.path], leaf) for leaf in second.leaves):
+        return True
+    return any(all(patterns_disjoint(alternative, other) for alternative in alternatives)
+               for pattern, other in ((first, second), (second, first))
+               for alternatives in pattern.alternatives)
+
+
+def relation(first: CompiledPattern, second: CompiledPattern) -> Optional[Tuple[str, Optional[int], List[str]]]:
+    """Determine whether two patterns can match the same event.
+
+    Fields are assumed to hold a single value, so two patterns requiring
+    different values of an array field are not reported.
+
+    Returns:
+        None if no event matches both, else a tuple of the relation (DUPLICATE,
+        SUBSUMED or OVERLAP), the position (0 or 1) of the narrower pattern for
+        SUBSUMED, and the fields both patterns check
+    """
+    first_leaves = {leaf.path: leaf for leaf in first.leaves}
+    second_leaves = {leaf.path: leaf for leaf in second.leaves}
+    shared = sorted(first_leaves.keys() & second_leaves.keys())
+    if patterns_disjoint(first, second):
+        return None
+    fields = [first_leaves[path].field for path in shared]
+
+    if first.alternatives or second.alternatives:
+        # Patterns with $or are only compared as a whole
+        if json.dumps(first.pattern, sort_keys=True) == json.dumps(second.pattern, sort_keys=True):
+            return DUPLICATE, None, fields
+        return OVERLAP, None, fields
+
+    first_within = all(path in first_leaves and leaf_within(first_leaves[path], leaf)
+                       for path, leaf in second_leaves.items())
+    second_within = all(path in second_leaves and leaf_within(second_leaves[path], leaf)
+                        for path, leaf in first_leaves.items())
+    if first_within and second_within:
+        return DUPLICATE, None, fields
+    if first_within or second_within:
+        return SUBSUMED, 0 if first_within else 1, fields
+    return OVERLAP, None, fields
+
+
+def candidate_pairs(patterns: List[CompiledPattern], fields: Tuple[str, ...] = DISCRIMINATING_FIELDS,
+                    members: Optional[List[int]] = None) -> Set[Tuple[int, int]]:
+    """Get the pairs of patterns that may match the same event.
+
+    Patterns requiring different exact values of a field can never overlap, so
+    patterns are grouped by each value they require of the first field and
+    compared only within their groups, which are split again by the next
+    field. A pattern that does not limit the field to exact values is paired
+    with every pattern of its group.
+
+    Args:
+        patterns: Compiled patterns
+        fields: Top-level fields to group patterns by
+        members: Positions of the patterns to pair; defaults to all of them
+
+    Returns:
+        Pairs of positions, the lower one first
+    """
+    if members is None:
+        members = list(range(len(patterns)))
+    if not fields:
+        return set(itertools.combinations(members, 2))
+    groups: Dict[Any, List[int]] = {}
+    unlimited = []
+    for position in members:
+        values = patterns[position].exact_values(fields[0])
+        if values:
+            for key in values:
+                groups.setdefault(key, []).append(position)
+        else:
+            unlimited.append(position)
+
+    pairs: Set[Tuple[int, int]] = set()
+    for group in groups.values():
+        if len(group) > 1:
+            pairs |= candidate_pairs(patterns, fields[1:], group)
+    for position in unlimited:
+        pairs.update((min(position, other), max(position, other)) for other in members if other != position)
+    return pairs
+
+
+def analyze_rule_overlaps(rules: Iterable[Mapping[str, Any]]) -> Dict[str, Any]:
+    """Find duplicate, subsumed and overlapping rules and rules that can never match.
+
+    Disabled rules and rules without an event pattern are skipped.
+
+    Args:
+        rules: Rules of one bus with 'Name', 'EventPattern', 'State' and 'Targets'
+
+    Returns:
+        Report with the pairs of rules that can match the same event ('findings',
+        each with its relation, the fields both rules check and the target ARNs
+        both would invoke), the rules that can never match ('contradictions'),
+        'invalid_patterns' and pruning statistics
+    """
+    started = time.monotonic()
+    names: List[str] = []
+    patterns: List[CompiledPattern] = []
+    targets: List[Set[str]] = []
+    contradictions = []
+    invalid_patterns = {}
+    for rule in rules:
+        if not rule.get('EventPattern') or rule.get('State') == 'DISABLED':
+            continue
+        try:
+            compiled = CompiledPattern(rule['EventPattern'])
+        except ValueError as e:
+            invalid_patterns[rule['Name']] = str(e)
+            continue
+        reason = contradiction(compiled)
+        if reason:
+            contradictions.append({'rule': rule['Name'], 'reason': reason})
+            continue
+        names.append(rule['Name'])
+        patterns.append(compiled)
+        targets.append({target['Arn'] for target in rule.get('Targets', ()) if target.get('Arn')})
+
+    pairs = candidate_pairs(patterns)
+    findings = []
+    for first, second in sorted(pairs):
+        found = relation(patterns[first], patterns[second])
+        if found is None:
+            continue
+        kind, narrower, fields = found
+        finding = {
+            'relation': kind,
+            'rules': [names[first], names[second]],
+            'fields': fields,
+            'shared_targets': sorted(targets[first] & targets[second])
+        }
+        if narrower is not None:
+            finding['narrower'] = names[(first, second)[narrower]]
+            finding['broader'] = names[(second, first)[narrower]]
+        findings.append(finding)
+
+    return {
+        'rules': len(patterns),
+        'findings': findings,
+        'contradictions': contradictions,
+        'invalid_patterns': invalid_patterns,
+        'stats': {
+            'total_pairs': len(patterns) * (len(patterns) - 1) // 2,
+            'candidate_pairs': len(pairs),
+            'findings_by_relation': {kind: sum(1 for finding in findings if finding['relation'] == kind)
+                                     for kind in (DUPLICATE, SUBSUMED, OVERLAP)},
+            'elapsed_ms': round((time.monotonic() - started) * 1000, 3)
+        }
+    }
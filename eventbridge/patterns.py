@@ -0,0 +1,354 @@
+"""
+Event pattern matching for AWS EventBridge Explorer.
+This module contains a local implementation of EventBridge event patterns. Each
+pattern is compiled once into a tree of field checks, so events can be matched
+against many rules offline instead of calling TestEventPattern per rule.
+"""
+
+import ipaddress
+import json
+import re
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple, Union
+
+# Operators allowed in numeric matching
+_NUMERIC_OPERATORS = {
+    '=': lambda value, bound: value == bound,
+    '<': lambda value, bound: value < bound,
+    '<=': lambda value, bound: value <= bound,
+    '>': lambda value, bound: value > bound,
+    '>=': lambda value, bound: value >= bound,
+}
+
+# Envelope fields of a PutEvents entry and their names in the delivered event
+_ENTRY_FIELDS = {'Source': 'source', 'DetailType': 'detail-type', 'Resources': 'resources', 'Time': 'time'}
+
+
+def literal_key(value: Any) -> Optional[Tuple[str, Any]]:
+    """Get the typed key a leaf value is compared by, so 5 equals 5.0 but not "5" or True."""
+    if value is None:
+        return ('null', None)
+    if isinstance(value, bool):
+        return ('bool', value)
+    if isinstance(value, (int, float)):
+        return ('number', float(value))
+    if isinstance(value, str):
+        return ('string', value)
+    return None
+
+
+def is_number(value: Any) -> bool:
+    """Check whether a value is a JSON number."""
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def wildcard_regex(pattern: str) -> 're.Pattern':
+    """Compile an EventBridge wildcard, where * matches any characters and \\* a literal star."""
+    parts = re.split(r'(\\\*|\*)', pattern)
+    regex = ''.join('.*' if part == '*' else re.escape('*') if part == '\\*' else re.escape(part)
+                    for part in parts)
+    return re.compile(regex, re.DOTALL)
+
+
+def normalize_event(event: Mapping[str, Any]) -> Dict[str, Any]:
+    """Convert a PutEvents entry (Source, DetailType, Detail as JSON) to the event rules see.
+
+    Events already in delivered form (source, detail-type, detail) are returned unchanged.
+    """
+    if 'Source' not in event and 'DetailType' not in event and 'Detail' not in event:
+        return dict(event)
+    normalized = {name: event[field] for field, name in _ENTRY_FIELDS.items() if field in event}
+    detail = event.get('Detail', '{}')
+    normalized['detail'] = json.loads(detail) if isinstance(detail, str) else detail
+    normalized.setdefault('resources', [])
+    return normalized
+
+
+class LeafMatcher:
+    """The array of match values of one field; the field matches if any of them does."""
+
+    def __init__(self, path: Tuple[str, ...], values: List[Any]):
+        """Compile the match values of a field.
+
+        Args:
+            path: Keys leading to the field
+            values: The array given for the field in the pattern
+        """
+        self.path = path
+        self.values = values
+        self.literals = set()
+        self.predicates: List[Callable[[Any], bool]] = []
+        self.exists: Optional[bool] = None
+        if not isinstance(values, list) or not values:
+            raise ValueError(f"Pattern field {'.'.join(path)} must be a non-empty array")
+        for value in values:
+            if isinstance(value, dict):
+                self._compile_filter(value)
+            elif isinstance(value, list):
+                raise ValueError(f"Pattern field {'.'.join(path)} contains a nested array")
+            else:
+                self.literals.add(literal_key(value))
+        # Most fields only list values; check those with a single set operation
+        if not self.predicates and self.exists is None:
+            literals = self.literals
+            self.matches_values = lambda values, keys: not literals.isdisjoint(keys)
+
+    @property
+    def field(self) -> str:
+        """Dotted name of the field."""
+        return '.'.join(self.path)
+
+    def _compile_filter(self, spec: Dict[str, Any]) -> None:
+        """Compile one content filter such as {"prefix": "x"}."""
+        if len(spec) != 1:
+            raise ValueError(f"Content filter of {self.field} must have exactly one key: {spec}")
+        kind, argument = next(iter(spec.items()))
+        if kind == 'exists':
+            if not isinstance(argument, bool):
+                raise ValueError(f"exists of {self.field} must be true or false")
+            self.exists = argument
+        elif kind in ('prefix', 'suffix'):
+            self.predicates.append(self._affix(kind, argument))
+        elif kind == 'equals-ignore-case':
+            expected = self._string(kind, argument).lower()
+            self.predicates.append(lambda value: isinstance(value, str) and value.lower() == expected)
+        elif kind == 'wildcard':
+            regex = wildcard_regex(self._string(kind, argument))
+            self.predicates.append(lambda value: isinstance(value, str) and regex.fullmatch(value) is not None)
+        elif kind == 'numeric':
+            self.predicates.append(self._numeric(argument))
+        elif kind == 'cidr':
+            try:
+                network = ipaddress.ip_network(self._string(kind, argument), strict=False)
+            except ValueError as e:
+                raise ValueError(f"Invalid cidr of {self.field}: {e}")
+            self.predicates.append(lambda value: self._in_network(value, network))
+        elif kind == 'anything-but':
+            self.predicates.append(self._anything_but(argument))
+        else:
+            raise ValueError(f"Unsupported content filter {kind!r} for {self.field}")
+
+    def _string(self, kind: str, argument: Any) -> str:
+        """Check that the argument of a filter is a string."""
+        if not isinstance(argument, str):
+            raise ValueError(f"{kind} of {self.field} must be a string")
+        return argument
+
+    def _affix(self, kind: str, argument: Any) -> Callable[[Any], bool]:
+        """Compile prefix or suffix matching, optionally ignoring case."""
+        ignore_case = isinstance(argument, dict)
+        if ignore_case:
+            if list(argument) != ['equals-ignore-case']:
+                raise ValueError(f"{kind} of {self.field} only supports equals-ignore-case")
+            argument = argument['equals-ignore-case']
+        affix = self._string(kind, argument)
+        if ignore_case:
+            affix = affix.lower()
+        method = str.startswith if kind == 'prefix' else str.endswith
+        if ignore_case:
+            return lambda value: isinstance(value, str) and method(value.lower(), affix)
+        return lambda value: isinstance(value, str) and method(value, affix)
+
+    def _numeric(self, argument: Any) -> Callable[[Any], bool]:
+        """Compile numeric matching such as [">", 0, "<=", 5]."""
+        if not isinstance(argument, list) or not argument or len(argument) % 2 or len(argument) > 4:
+            raise ValueError(f"numeric of {self.field} must list one or two operator/value pairs")
+        checks = []
+        for operator, bound in zip(argument[::2], argument[1::2]):
+            if operator not in _NUMERIC_OPERATORS or not is_number(bound):
+                raise ValueError(f"Invalid numeric comparison {operator!r} {bound!r} for {self.field}")
+            checks.append((_NUMERIC_OPERATORS[operator], bound))
+        return lambda value: is_number(value) and all(check(value, bound) for check, bound in checks)
+
+    def _anything_but(self, argument: Any) -> Callable[[Any], bool]:
+        """Compile anything-but matching of values, a prefix, a suffix, a wildcard or ignoring case."""
+        if isinstance(argument, dict):
+            if len(argument) != 1:
+                raise ValueError(f"anything-but of {self.field} must have exactly one key: {argument}")
+            kind, inner = next(iter(argument.items()))
+            if kind not in ('prefix', 'suffix', 'equals-ignore-case', 'wildcard'):
+                raise ValueError(f"Unsupported anything-but filter {kind!r} for {self.field}")
+            items = inner if isinstance(inner, list) and kind in ('equals-ignore-case', 'wildcard') else [inner]
+            checks = LeafMatcher(self.path, [{kind: item} for item in items]).predicates
+            return lambda value: isinstance(value, str) and not any(check(value) for check in checks)
+        excluded = {literal_key(item) for item in (argument if isinstance(argument, list) else [argument])}
+        if None in excluded or ('null', None) in excluded or not excluded:
+            raise ValueError(f"anything-but of {self.field} must list strings or numbers")
+        return lambda value: literal_key(value) not in excluded
+
+    @staticmethod
+    def _in_network(value: Any, network) -> bool:
+        """Check whether a value is an IP address inside a network."""
+        if not isinstance(value, str):
+            return False
+        try:
+            return ipaddress.ip_address(value) in network
+        except ValueError:
+            return False
+
+    def matches_values(self, values: List[Any], keys: List[Any]) -> bool:
+        """Check the leaf values found at the path and their literal keys.
+
+        An empty list means the field is missing; objects have no key and never match a value.
+        """
+        if self.exists is not None:
+            present = any(key is not None for key in keys)
+            if present == self.exists:
+                return True
+        if self.literals and not self.literals.isdisjoint(keys):
+            return True
+        if self.predicates:
+            for value, key in zip(values, keys):
+                if key is not None and any(predicate(value) for predicate in self.predicates):
+                    return True
+        return False
+
+
+def resolve(event: Any, path: Tuple[str, ...]) -> List[Any]:
+    """Get the values at a path, looking through arrays at every level."""
+    current = [event]
+    for key in path:
+        found = []
+        for node in current:
+            if isinstance(node, dict):
+                if key in node:
+                    found.append(node[key])
+            elif isinstance(node, list):
+                found.extend(item[key] for item in node if isinstance(item, dict) and key in item)
+        current = found
+        if not current:
+            return []
+    values = []
+    for value in current:
+        if isinstance(value, list):
+            values.extend(value)
+        else:
+            values.append(value)
+    return values
+
+
+class CompiledPattern:
+    """An event pattern compiled into field checks and $or alternatives.
+
+    A pattern matches an event if every field check matches and, for each $or,
+    at least one of its alternatives does. Checks on exact values run first,
+    since they reject most events.
+    """
+
+    def __init__(self, pattern: Union[str, Mapping[str, Any]]):
+        """Compile a pattern.
+
+        Args:
+            pattern: The pattern as a JSON string or a parsed object
+
+        Raises:
+            ValueError: If the pattern is not a valid event pattern
+        """
+        if isinstance(pattern, str):
+            try:
+                pattern = json.loads(pattern)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Event pattern is not valid JSON: {e}")
+        if not isinstance(pattern, dict) or not pattern:
+            raise ValueError("Event pattern must be a non-empty JSON object")
+        self.pattern = pattern
+        self.leaves: List[LeafMatcher] = []
+        self.alternatives: List[List['CompiledPattern']] = []
+        self._compile(pattern, ())
+        # Exact-value checks first: they are cheapest and reject the most events
+        self.leaves.sort(key=lambda leaf: (bool(leaf.predicates) or leaf.exists is not None, len(leaf.path)))
+
+    def _compile(self, node: Dict[str, Any], path: Tuple[str, ...]) -> None:
+        """Collect the checks of a pattern object."""
+        for key, value in node.items():
+            if key == '$or':
+                if not isinstance(value, list) or len(value) < 2:
+                    raise ValueError("$or must list at least two patterns")
+                self.alternatives.append([CompiledPattern._nested(alternative, path) for alternative in value])
+            elif isinstance(value, dict):
+                if not value:
+                    raise ValueError(f"Pattern field {'.'.join(path + (key,))} must not be empty")
+                self._compile(value, path + (key,))
+            else:
+                self.leaves.append(LeafMatcher(path + (key,), value))
+
+    @classmethod
+    def _nested(cls, node: Any, path: Tuple[str, ...]) -> 'CompiledPattern':
+        """Compile one $or alternative found under path."""
+        if not isinstance(node, dict) or not node:
+            raise ValueError("Every $or alternative must be a non-empty object")
+        compiled = cls.__new__(cls)
+        compiled.pattern = node
+        compiled.leaves = []
+        compiled.alternatives = []
+        compiled._compile(node, path)
+        compiled.leaves.sort(key=lambda leaf: (bool(leaf.predicates) or leaf.exists is not None, len(leaf.path)))
+        return compiled
+
+    def exact_values(self, field: str) -> Optional[set]:
+        """Get the literal values a field must have, or None if the field is not limited to literals.
+
+        A field limited to literals in every alternative of an $or may have any of
+        their values.
+        """
+        for leaf in self.leaves:
+            if leaf.field == field and not leaf.predicates and leaf.exists is None:
+                return leaf.literals
+        for alternatives in self.alternatives:
+            values = [alternative.exact_values(field) for alternative in alternatives]
+            if all(values):
+                return set().union(*values)
+        return None
+
+    def matches(self, event: Mapping[str, Any], resolved: Optional[Dict[Tuple[str, ...], Any]] = None) -> bool:
+        """Check whether an event matches the pattern.
+
+        Args:
+            event: The event in delivered form
+            resolved: Optional cache of the values per path of this event, shared between patterns
+        """
+        if resolved is None:
+            resolved = {}
+        for leaf in self.leaves:
+            found = resolved.get(leaf.path)
+            if found is None:
+                values = resolve(event, leaf.path)
+                found = resolved[leaf.path] = (values, [literal_key(value) for value in values])
+            if not leaf.matches_values(found[0], found[1]):
+                return False
+        for alternatives in self.alternatives:
+            if not any(alternative.matches(event, resolved) for alternative in alternatives):
+                return False
+        return True
+
+
+def compile_pattern(pattern: Union[str, Mapping[str, Any]]) -> CompiledPattern:
+    """Compile an event pattern given as a JSON string or a parsed object."""
+    return CompiledPattern(pattern)
+
+
+class PatternSet:
+    """Compiled patterns of many rules, evaluated together against batches of events."""
+
+    def __init__(self, patterns: Mapping[str, Union[str, Mapping[str, Any]]]):
+        """Compile the patterns of a set of rules.
+
+        Args:
+            patterns: Event pattern by rule name; rules with invalid patterns are reported in errors
+        """
+        self.compiled: Dict[str, CompiledPattern] = {}
+        self.errors: Dict[str, str] = {}
+        for name, pattern in patterns.items():
+            try:
+                self.compiled[name] = compile_pattern(pattern)
+            except ValueError as e:
+                self.errors[name] = str(e)
+
+    def match(self, event: Mapping[str, Any]) -> List[str]:
+        """Get the names of the rules whose pattern matches an event."""
+        # Rules mostly test the same few fields, so each path is resolved once per event
+        resolved: Dict[Tuple[str, ...], Any] = {}
+        return [name for name, pattern in self.compiled.items() if pattern.matches(event, resolved)]
+
+    def match_batch(self, events: Iterable[Mapping[str, Any]]) -> List[List[str]]:
+        """Get the matching rule names for each event of a batch."""
+        return [self.match(event) for event in events]
@@ -0,0 +1,321 @@
+"""
+Bulk event publishing for AWS EventBridge Explorer.
+This module contains the publisher that replays or synthesizes traffic by
+packing events into PutEvents batches and sending them concurrently at a
+target rate.
+"""
+
+import json
+import math
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from eventbridge.retry import THROTTLING_ERROR_CODES, call_with_backoff
+
+# PutEvents accepts at most this many entries and bytes per call
+MAX_BATCH_ENTRIES = 10
+MAX_BATCH_BYTES = 256 * 1024
+
+# Entry error codes worth sending again; others, such as MalformedDetail, fail for good
+RETRYABLE_ERROR_CODES = THROTTLING_ERROR_CODES | {'InternalFailure', 'InternalException', 'ServiceUnavailable'}
+
+# Failed entries kept in a report as examples
+MAX_REPORTED_FAILURES = 20
+
+
+def to_entry(event: Any, event_bus_name: str) -> Dict[str, Any]:
+    """Convert an event to a PutEvents entry.
+
+    Args:
+        event: A PutEvents entry ('Source', 'DetailType', 'Detail'), an event in
+            delivered form ('source', 'detail-type', 'detail') or one NDJSON line of either
+        event_bus_name: Bus to send the event to unless the entry names one
+
+    Raises:
+        ValueError: If the event is not a JSON object
+    """
+    if isinstance(event, (str, bytes)):
+        event = json.loads(event)
+    if not isinstance(event, dict):
+        raise ValueError("Event must be a JSON object")
+    if 'Source' in event or 'DetailType' in event or 'Detail' in event:
+        entry = dict(event)
+    else:
+        entry = {
+            'Source': event.get('source', 'test.event'),
+            'DetailType': event.get('detail-type', 'Test Event'),
+            'Detail': event.get('detail', {})
+        }
+        if event.get('resources'):
+            entry['Resources'] = event['resources']
+        if event.get('time'):
+            entry['Time'] = event['time']
+    if not isinstance(entry.get('Detail', '{}'), str):
+        entry['Detail'] = json.dumps(entry['Detail'])
+    entry.setdefault('EventBusName', event_bus_name)
+    return entry
+
+
+def entry_size(entry: Mapping[str, Any]) -> int:
+    """Compute the size of an entry the way PutEvents counts it against its 256 KB limit."""
+    size = 14 if entry.get('Time') else 0
+    for field in ('Source', 'DetailType', 'Detail'):
+        if entry.get(field):
+            size += len(entry[field].encode('utf-8'))
+    for resource in entry.get('Resources') or ():
+        size += len(resource.encode('utf-8'))
+    return size
+
+
+def pack_batches(entries: Iterable[Tuple[int, Dict[str, Any]]], max_entries: int = MAX_BATCH_ENTRIES,
+                 max_bytes: int = MAX_BATCH_BYTES) -> Iterator[List[Tuple[int, Dict[str, Any]]]]:
+    """Group numbered entries into batches within the entry and size limits, keeping their order.
+
+    Every entry must fit into a batch on its own.
+    """
+    batch: List[Tuple[int, Dict[str, Any]]] = []
+    batch_bytes = 0
+    for position, entry in entries:
+        size = entry_size(entry)
+        if batch and (len(batch) >= max_entries or batch_bytes + size > max_bytes):
+            yield batch
+            batch, batch_bytes = [], 0
+        batch.append((position, entry))
+        batch_bytes += size
+    if batch:
+        yield batch
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Get the nearest-rank percentile of sorted values, 0.0 if there are none."""
+    if not sorted_values:
+        return 0.0
+    rank = min(len(sorted_values), max(1, math.ceil(fraction * len(sorted_values)))) - 1
+    return sorted_values[rank]
+
+
+class RateLimiter:
+    """Space out requests so that on average at most `rate` units are sent per second.
+
+    Each caller reserves the next free time slot for its units and sleeps until
+    the slot starts, so concurrent workers share one rate.
+    """
+
+    def __init__(self, rate: float, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        """Initialize the limiter.
+
+        Args:
+            rate: Units (events) per second
+            clock: Monotonic clock in seconds
+            sleep: Function sleeping for a number of seconds
+        """
+        if rate <= 0:
+            raise ValueError("Rate must be positive")
+        self.rate = rate
+        self.clock = clock
+        self.sleep = sleep
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, units: int = 1) -> float:
+        """Wait until units may be sent; returns the seconds waited."""
+        with self._lock:
+            now = self.clock()
+            start = max(self._next_slot, now)
+            self._next_slot = start + units / self.rate
+        delay = start - now
+        if delay > 0:
+            self.sleep(delay)
+        return max(delay, 0.0)
+
+
+class EventPublisher:
+    """Publish large numbers of events with PutEvents.
+
+    Events are read lazily from any iterable, such as the lines of an NDJSON
+    file, and packed into batches of up to 10 entries and 256 KB. Batches are
+    sent by a pool of workers; at most two batches per worker wait in memory,
+    so inputs of any length can be replayed. With a rate, batches are spaced
+    out to that many events per second overall. Entries PutEvents rejects with
+    a transient error, such as throttling, are sent again on their own with
+    jittered backoff; the rest of their batch is not repeated.
+    """
+
+    def __init__(self, events_client, event_bus_name: str = 'default', rate: Optional[float] = None,
+                 max_workers: int = 8, max_attempts: int = 5, base_delay: float = 0.1, max_delay: float = 5.0,
+                 max_entries: int = MAX_BATCH_ENTRIES, max_bytes: int = MAX_BATCH_BYTES):
+        """Initialize the publisher.
+
+        Args:
+            events_client: boto3 EventBridge client
+            event_bus_name: Bus for entries that do not name one
+            rate: Target events per second, None to send as fast as possible
+            max_workers: Batches sent at once
+            max_attempts: Attempts per entry, including the first
+            base_delay: Initial backoff before retrying failed entries, in seconds
+            max_delay: Upper bound for a single backoff delay in seconds
+            max_entries: Entries per PutEvents call
+            max_bytes: Bytes per PutEvents call
+        """
+        self.events_client = events_client
+        self.event_bus_name = event_bus_name
+        self.rate_limiter = RateLimiter(rate) if rate else None
+        self.max_workers = max(1, max_workers)
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        """Clear the counters of the previous run."""
+        self.stats = {'events': 0, 'published': 0, 'failed': 0, 'retried': 0, 'batches': 0, 'calls': 0}
+        self.errors: Dict[str, int] = {}
+        self.failures: List[Dict[str, Any]] = []
+        self.latencies_ms: List[float] = []
+
+    def publish(self, events: Iterable[Any], cancel_event: Optional[threading.Event] = None) -> Dict[str, Any]:
+        """Publish events and report how it went.
+
+        Args:
+            events: Events, PutEvents entries or NDJSON lines, see to_entry; blank lines are skipped
+            cancel_event: Optional event that stops reading further events when set
+
+        Returns:
+            Report with 'success', 'message', the counters, errors by code, example
+            'failures' with the position of the event in the input, 'throughput' in
+            events per second and 'latency_ms' percentiles of the PutEvents calls
+        """
+        self._reset()
+        started = time.monotonic()
+        in_flight = threading.BoundedSemaphore(self.max_workers * 2)
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            for batch in pack_batches(self._entries(events, cancel_event), self.max_entries, self.max_bytes):
+                if self.rate_limiter is not None:
+                    self.rate_limiter.acquire(len(batch))
+                in_flight.acquire()
+                future = executor.submit(self._run_batch, batch)
+                future.add_done_callback(lambda _: in_flight.release())
+        finally:
+            executor.shutdown(wait=True)
+        return self.report(time.monotonic() - started)
+
+    def _entries(self, events: Iterable[Any],
+                 cancel_event: Optional[threading.Event]) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """Number and convert the input, recording events that cannot be sent."""
+        for position, event in enumerate(events):
+            if cancel_event is not None and cancel_event.is_set():
+                break
+            if isinstance(event, (str, bytes)) and not event.strip():
+                continue
+            with self._lock:
+                self.stats['events'] += 1
+            try:
+                entry = to_entry(event, self.event_bus_name)
+            except (TypeError, ValueError) as e:
+                self._fail(position, 'InvalidEvent', str(e))
+                continue
+            if entry_size(entry) > self.max_bytes:
+                self._fail(position, 'EntryTooLarge', f"Entry is larger than {self.max_bytes} bytes")
+                continue
+            yield position, entry
+
+    def _run_batch(self, batch: List[Tuple[int, Dict[str, Any]]]) -> None:
+        """Send a batch in a worker, failing its unsettled entries if anything goes wrong."""
+        pending = dict(batch)
+        try:
+            self._send_batch(pending)
+        except Exception as e:
+            # Errors raised in a worker would otherwise vanish with its future
+            for position in sorted(pending):
+                self._fail(position, type(e).__name__, str(e))
+
+    def _send_batch(self, pending: Dict[int, Dict[str, Any]]) -> None:
+        """Send a batch, then resend its entries that failed transiently.
+
+        Entries are removed from pending, by position, once they are published or
+        have failed for good.
+        """
+        with self._lock:
+            self.stats['batches'] += 1
+        attempt = 1
+        while pending:
+            batch = list(pending.items())
+            call_started = time.monotonic()
+            try:
+                response = call_with_backoff(self.events_client.put_events, Entries=[entry for _, entry in batch],
+                                             base_delay=self.base_delay, max_delay=self.max_delay)
+            except Exception as e:
+                code = getattr(e, 'response', {}).get('Error', {}).get('Code') or type(e).__name__
+                for position, _ in batch:
+                    self._fail(position, code, str(e))
+                    del pending[position]
+                return
+            finally:
+                with self._lock:
+                    self.stats['calls'] += 1
+                    self.latencies_ms.append((time.monotonic() - call_started) * 1000)
+
+            results = response.get('Entries') or []
+            retried = 0
+            for number, (position, entry) in enumerate(batch):
+                if number >= len(results):
+                    # Entries without a result cannot be told apart from published ones
+                    self._fail(position, 'MissingResult', 'PutEvents returned no result for the entry')
+                    del pending[position]
+                    continue
+                code = results[number].get('ErrorCode')
+                if not code:
+                    with self._lock:
+                        self.stats['published'] += 1
+                    del pending[position]
+                elif code in RETRYABLE_ERROR_CODES and attempt < self.max_attempts:
+                    retried += 1
+                else:
+                    self._fail(position, code, results[number].get('ErrorMessage', ''))
+                    del pending[position]
+            with self._lock:
+                self.stats['retried'] += retried
+
+            if pending:
+                # Full jitter keeps workers retrying throttled entries from resending in lockstep
+                time.sleep(random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt))))
+                attempt += 1
+                if self.rate_limiter is not None:
+                    self.rate_limiter.acquire(len(pending))
+
+    def _fail(self, position: int, code: str, message: str) -> None:
+        """Record an event that could not be published."""
+        with self._lock:
+            self.stats['failed'] += 1
+            self.errors[code] = self.errors.get(code, 0) + 1
+            if len(self.failures) < MAX_REPORTED_FAILURES:
+                self.failures.append({'index': position, 'code': code, 'message': message})
+
+    def report(self, elapsed: float) -> Dict[str, Any]:
+        """Summarize the counters of the last run."""
+        with self._lock:
+            stats = dict(self.stats)
+            latencies = sorted(self.latencies_ms)
+            errors = dict(self.errors)
+            failures = sorted(self.failures, key=lambda failure: failure['index'])
+        throughput = stats['published'] / elapsed if elapsed > 0 else 0.0
+        return dict(
+            stats,
+            success=stats['failed'] == 0,
+            message=f"Published {stats['published']} of {stats['events']} events in {elapsed:.2f}s "
+                    f"({throughput:.0f} events/s), {stats['failed']} failed",
+            errors=errors,
+            failures=failures,
+            elapsed_s=round(elapsed, 3),
+            throughput=round(throughput, 1),
+            latency_ms={name: round(percentile(latencies, fraction), 1)
+                        for name, fraction in (('p50', 0.5), ('p90', 0.9), ('p99', 0.99), ('max', 1.0))}
+        )
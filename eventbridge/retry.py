@@ -0,0 +1,56 @@
+"""
+Retry helpers for AWS EventBridge Explorer.
+This module contains the throttle-aware backoff used when calling AWS APIs concurrently.
+"""
+
+import random
+import time
+from typing import Any, Callable
+
+from botocore.exceptions import ClientError
+
+# Error codes AWS uses to signal that a caller is being rate limited
+THROTTLING_ERROR_CODES = {
+    'ThrottlingException',
+    'Throttling',
+    'TooManyRequestsException',
+    'RequestLimitExceeded',
+    'LimitExceededException',
+}
+
+
+def is_throttling_error(error: Exception) -> bool:
+    """Return True if the exception is an AWS throttling error."""
+    if isinstance(error, ClientError):
+        code = error.response.get('Error', {}).get('Code', '')
+        return code in THROTTLING_ERROR_CODES
+    return False
+
+
+def call_with_backoff(func: Callable[..., Any], *args, max_attempts: int = 5,
+                      base_delay: float = 0.2, max_delay: float = 5.0, **kwargs) -> Any:
+    """Call an AWS API function, retrying throttled calls with jittered exponential backoff.
+
+    Args:
+        func: The client method to call
+        max_attempts: Maximum number of attempts before the error is re-raised
+        base_delay: Initial backoff delay in seconds
+        max_delay: Upper bound for a single backoff delay in seconds
+
+    Returns:
+        The response of the API call
+
+    Raises:
+        The last exception if the call is not throttled or all attempts are exhausted
+    """
+    attempt = 0
+    while True:
+        try:
+            return func(*args, **kwargs)
+        except Exception as e:
+            attempt += 1
+            if not is_throttling_error(e) or attempt >= max_attempts:
+                raise
+            # Full jitter keeps concurrent workers from retrying in lockstep
+            delay = random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+            time.sleep(delay)
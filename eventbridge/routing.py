@@ -0,0 +1,110 @@
+"""
+Rule routing index for AWS EventBridge Explorer.
+This module contains the index that narrows the rules of a bus to the few whose
+pattern can match an event, by the exact values most patterns require of the
+event's source and detail-type.
+"""
+
+import threading
+from typing import Any, Dict, Iterable, List, Mapping, Tuple, Union
+
+from eventbridge.patterns import PatternSet, literal_key, resolve
+
+# Fields most rules key on, in the order they are tried for indexing a rule
+DISCRIMINATING_FIELDS = ('source', 'detail-type')
+
+
+class RuleRoutingIndex:
+    """Find the rules matching an event without evaluating every pattern.
+
+    Each rule is indexed under the values its pattern requires of the first
+    discriminating field it restricts to exact values. An event then only has
+    to be matched against the rules indexed under its own source and
+    detail-type, plus the few rules that restrict neither. Rules stay in bus
+    order in the results. An index can be shared between threads.
+    """
+
+    def __init__(self, patterns: Mapping[str, Union[str, Mapping[str, Any]]],
+                 fields: Tuple[str, ...] = DISCRIMINATING_FIELDS):
+        """Compile the patterns and build the index.
+
+        Args:
+            patterns: Event pattern by rule name, in bus order
+            fields: Top-level fields to index rules by
+        """
+        self.pattern_set = PatternSet(patterns)
+        self.fields = fields
+        self._order = {name: position for position, name in enumerate(self.pattern_set.compiled)}
+        self._index: Dict[str, Dict[Any, List[str]]] = {field: {} for field in fields}
+        self._unindexed: List[str] = []
+        for name, pattern in self.pattern_set.compiled.items():
+            for field in fields:
+                values = pattern.exact_values(field)
+                if values:
+                    for key in values:
+                        self._index[field].setdefault(key, []).append(name)
+                    break
+            else:
+                self._unindexed.append(name)
+        self.stats = {'events': 0, 'candidates': 0, 'matches': 0}
+        self._stats_lock = threading.Lock()
+
+    @property
+    def errors(self) -> Dict[str, str]:
+        """Compile errors by rule name; those rules never match."""
+        return self.pattern_set.errors
+
+    @property
+    def rule_count(self) -> int:
+        """Number of rules with a valid pattern."""
+        return len(self._order)
+
+    @property
+    def indexed_count(self) -> int:
+        """Number of rules reachable through the index rather than always evaluated."""
+        return self.rule_count - len(self._unindexed)
+
+    def candidates(self, event: Mapping[str, Any]) -> List[str]:
+        """Get the rules whose pattern may match an event, in bus order."""
+        found = set(self._unindexed)
+        for field in self.fields:
+            rules_by_value = self._index[field]
+            if not rules_by_value:
+                continue
+            for value in resolve(event, (field,)):
+                found.update(rules_by_value.get(literal_key(value), ()))
+        return sorted(found, key=self._order.__getitem__)
+
+    def match(self, event: Mapping[str, Any]) -> List[str]:
+        """Get the names of the rules whose pattern matches an event, in bus order."""
+        return self.match_batch([event])[0]
+
+    def match_batch(self, events: Iterable[Mapping[str, Any]]) -> List[List[str]]:
+        """Get the matching rule names for each event of a batch."""
+        compiled = self.pattern_set.compiled
+        results = []
+        candidate_count = match_count = 0
+        try:
+            for event in events:
+                candidates = self.candidates(event)
+                resolved: Dict[Tuple[str, ...], Any] = {}
+                matched = [name for name in candidates if compiled[name].matches(event, resolved)]
+                candidate_count += len(candidates)
+                match_count += len(matched)
+                results.append(matched)
+        finally:
+            # Counted per call and merged once, so concurrent callers do not lose updates
+            with self._stats_lock:
+                self.stats['events'] += len(results)
+                self.stats['candidates'] += candidate_count
+                self.stats['matches'] += match_count
+        return results
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return the size of the index and how many candidates events needed on average."""
+        with self._stats_lock:
+            stats = dict(self.stats)
+        events = stats['events']
+        return dict(stats, rules=self.rule_count, indexed_rules=self.indexed_count,
+                    invalid_rules=len(self.errors),
+                    average_candidates=round(stats['candidates'] / events, 2) if events else 0.0)
@@ -0,0 +1,196 @@
+"""
+Log search compiler for AWS EventBridge Explorer.
+This module contains the compiler that turns search terms and regular expressions
+into a matcher finding every match in one pass, and into the equivalent Logs
+Insights filter clause.
+"""
+
+import re
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+def insights_regex_literal(text: str) -> str:
+    """Escape text for use as a literal inside a Logs Insights /regex/."""
+    return re.sub(r'([\\^$.|?*+()\[\]{}/-])', r'\\\1', text)
+
+
+def fold_case(text: str) -> str:
+    """Lowercase text without changing its length, so offsets stay valid."""
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    # A few characters, e.g. 'İ', lowercase to two; keep those as they are
+    return ''.join(char.lower() if len(char.lower()) == 1 else char for char in text)
+
+
+class AhoCorasick:
+    """Aho-Corasick automaton finding every occurrence of many terms in one pass.
+
+    Matching takes time linear in the text length plus the number of matches,
+    however many terms there are.
+    """
+
+    def __init__(self, terms: Iterable[str]):
+        """Build the automaton.
+
+        Args:
+            terms: Terms to find; empty terms are ignored
+        """
+        self.terms = [term for term in dict.fromkeys(terms) if term]
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # Lengths of the terms ending at each state, including those reached through fail links
+        self._output: List[List[int]] = [[]]
+
+        for term in self.terms:
+            state = 0
+            for char in term:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                state = next_state
+            self._output[state].append(len(term))
+
+        # Breadth-first, so fail links always point to states that are already complete
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def find_all(self, text: str) -> List[Tuple[int, int]]:
+        """Return the (start, end) span of every occurrence of every term, sorted by start."""
+        spans = []
+        state = 0
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for length in output[state]:
+                spans.append((position + 1 - length, position + 1))
+        spans.sort()
+        return spans
+
+
+def merge_spans(spans: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Merge overlapping or touching spans, sorted by start."""
+    merged: List[Tuple[int, int]] = []
+    for start, end in sorted(spans):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+class CompiledSearch:
+    """A set of search terms and regular expressions compiled for matching and pushdown.
+
+    A message matches if it contains any of the terms or matches any of the
+    regular expressions. Terms go into one Aho-Corasick automaton and regular
+    expressions into one precompiled alternation, so each message is scanned
+    once per kind. Regular expressions are pushed down to Insights as written,
+    so they should stick to the syntax both Python and Insights support.
+    """
+
+    def __init__(self, terms: Optional[Iterable[str]] = None, regexes: Optional[Iterable[str]] = None,
+                 case_sensitive: bool = False):
+        """Compile a search.
+
+        Args:
+            terms: Literal terms to find
+            regexes: Regular expressions to match
+            case_sensitive: Match terms and regular expressions case-sensitively
+        """
+        self.case_sensitive = case_sensitive
+        fold = (lambda text: text) if case_sensitive else fold_case
+        self.terms = [fold(term) for term in dict.fromkeys(terms or []) if term]
+        self.regexes = [regex for regex in dict.fromkeys(regexes or []) if regex]
+        self._automaton = AhoCorasick(self.terms) if self.terms else None
+        self._pattern = None
+        if self.regexes:
+            flags = 0 if case_sensitive else re.IGNORECASE
+            self._pattern = re.compile('|'.join(f'(?:{regex})' for regex in self.regexes), flags)
+
+    @property
+    def empty(self) -> bool:
+        """Whether the search has no terms and no regular expressions, i.e. matches everything."""
+        return not self.terms and not self.regexes
+
+    @property
+    def key(self) -> str:
+        """Canonical description of the search, equal for equivalent searches."""
+        return repr((sorted(self.terms), sorted(self.regexes), self.case_sensitive))
+
+    def spans(self, message: str) -> List[Tuple[int, int]]:
+        """Return the merged (start, end) spans of all matches in a message."""
+        spans = []
+        if self._automaton is not None:
+            spans.extend(self._automaton.find_all(message if self.case_sensitive else fold_case(message)))
+        if self._pattern is not None:
+            spans.extend(match.span() for match in self._pattern.finditer(message) if match.end() > match.start())
+        return merge_spans(spans)
+
+    def matches(self, message: str) -> bool:
+        """Check whether a message matches the search."""
+        if self.empty:
+            return True
+        if self._pattern is not None and self._pattern.search(message):
+            return True
+        return bool(self._automaton is not None and self._automaton.find_all(
+            message if self.case_sensitive else fold_case(message)))
+
+    def narrows(self, base: Optional['CompiledSearch']) -> bool:
+        """Check whether every message matching this search also matches base.
+
+        This holds for the same search, for any search if base matches everything,
+        and for term searches whose every term contains one of the terms of base.
+        """
+        if base is None or base.empty:
+            return True
+        if base.key == self.key:
+            return True
+        if self.regexes or base.regexes or self.empty or self.case_sensitive != base.case_sensitive:
+            return False
+        return all(any(base_term in term for base_term in base.terms) for term in self.terms)
+
+    def insights_filter(self, field: str = '@message') -> Optional[str]:
+        """Build the equivalent Logs Insights filter clause, or None for an empty search."""
+        if self.empty:
+            return None
+        alternatives = [insights_regex_literal(term) for term in self.terms]
+        alternatives += [f'(?:{regex.replace("/", chr(92) + "/")})' for regex in self.regexes]
+        flags = '' if self.case_sensitive else '(?i)'
+        return f"filter {field} like /{flags}({'|'.join(alternatives)})/"
+
+
+def compile_search(search_term: Optional[str] = None, search_terms: Optional[Iterable[str]] = None,
+                   search_regex: Optional[str] = None, case_sensitive: bool = False) -> CompiledSearch:
+    """Compile the search parameters of a log request.
+
+    Args:
+        search_term: A single literal term
+        search_terms: Further literal terms, e.g. a list of order or request IDs
+        search_regex: A regular expression
+        case_sensitive: Match case-sensitively
+
+    Returns:
+        CompiledSearch matching messages that contain any term or match the regular expression
+    """
+    terms = ([search_term] if search_term else []) + [term for term in (search_terms or []) if term]
+    return CompiledSearch(terms=terms, regexes=[search_regex] if search_regex else [],
+                          case_sensitive=case_sensitive)
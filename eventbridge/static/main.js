@@ -851,6 +851,45 @@ function initCytoscapeInstance() {
               "curve-style": "bezier" 
             },
           },
+          {
+            // Rules matching the same events; subsumed rules point at the broader rule
+            selector: 'edge[type="overlap"]',
+            style: {
+              width: 3,
+              "line-color": "#e8590c",
+              "line-style": "dashed",
+              "target-arrow-shape": "none",
+              label: "data(relation)",
+              "font-size": "9px",
+              color: "#e8590c",
+              "text-background-color": "#ffffff",
+              "text-background-opacity": 1,
+            },
+          },
+          {
+            selector: 'edge[type="overlap"][relation="subsumed"]',
+            style: {
+              "target-arrow-color": "#e8590c",
+              "target-arrow-shape": "triangle",
+            },
+          },
+          {
+            selector: 'edge[type="overlap"][relation="duplicate"]',
+            style: {
+              "line-color": "#c92a2a",
+              color: "#c92a2a",
+              "line-style": "solid",
+            },
+          },
+          {
+            // Rules whose event pattern can never match
+            selector: "node[contradiction]",
+            style: {
+              "border-width": 3,
+              "border-color": "#c92a2a",
+              "border-style": "dashed",
+            },
+          },
           {
             selector: 'node[type="target_log_streams_summary"]',
         style: {
@@ -1017,7 +1056,8 @@ function _applyPersistentCytoscapeEventHandlers() {
 function applyDagreLayout() {
   if (!cy) return;
 
-  const layout = cy.layout({
+  // Overlap edges connect rules of the same rank; keep them out of the hierarchy
+  const layout = cy.elements().not('edge[type="overlap"]').layout({
     name: "dagre",
     rankDir: "TB", // Top to bottom
     rankSep: 160, // Distance between ranks (increased for larger nodes)
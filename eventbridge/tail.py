@@ -0,0 +1,378 @@
+"""
+Live log tailing for AWS EventBridge Explorer.
+This module contains the cursor-based tailer that returns only the log events
+that arrived since its previous poll, and the hub that shares one tailer between
+every viewer of the same log group.
+"""
+
+import datetime
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from eventbridge.retry import call_with_backoff
+
+# Events can be ingested a little after their timestamp, so each poll looks back this far
+DEFAULT_LOOKBACK_MS = 10000
+
+
+def format_log_event(event: Dict[str, Any], log_group_name: str) -> Dict[str, Any]:
+    """Convert a CloudWatch log event to the JSON shape sent to the browser."""
+    timestamp = event.get('timestamp', 0)
+    return {
+        'eventId': event.get('eventId'),
+        'timestamp': timestamp,
+        'formatted_time': datetime.datetime.fromtimestamp(timestamp / 1000).strftime('%Y-%m-%d %H:%M:%S'),
+        'message': event.get('message', ''),
+        'logGroup': log_group_name,
+        'logStream': event.get('logStreamName'),
+    }
+
+
+class LogTailer:
+    """Follow a log group, or a single log stream, and return only new events.
+
+    A single stream is followed with the nextForwardToken of get_log_events,
+    which is an exact cursor. Log groups, or several streams of a group, are
+    followed with filter_log_events from the timestamp of the newest event seen,
+    minus a short lookback for late-ingested events; event IDs seen within the
+    lookback are remembered so no event is returned twice. When a poll reaches
+    max_pages, the next poll continues the same search from its nextToken, since
+    filter_log_events pages are not in time order across streams.
+    """
+
+    def __init__(self, logs_client, log_group_name: str, log_stream_names: Optional[List[str]] = None,
+                 filter_pattern: Optional[str] = None, start_time: Optional[int] = None,
+                 lookback_ms: int = DEFAULT_LOOKBACK_MS, page_limit: int = 1000, max_pages: int = 10):
+        """Initialize the tailer.
+
+        Args:
+            logs_client: boto3 CloudWatch Logs client
+            log_group_name: Log group to follow
+            log_stream_names: Optional streams of the group to follow
+            filter_pattern: Optional CloudWatch Logs filter pattern
+            start_time: First event time in milliseconds, defaults to now
+            lookback_ms: How far each poll looks back for late events
+            page_limit: Events requested per page
+            max_pages: Pages read per poll at most; the rest is read by the next poll
+        """
+        self.logs_client = logs_client
+        self.log_group_name = log_group_name
+        self.log_stream_names = list(log_stream_names or [])
+        self.filter_pattern = filter_pattern
+        self.cursor = int(start_time if start_time is not None else time.time() * 1000)
+        self.lookback_ms = lookback_ms
+        self.page_limit = page_limit
+        self.max_pages = max_pages
+        self._forward_token: Optional[str] = None
+        self._pending_params: Optional[Dict[str, Any]] = None
+        self._seen: Dict[str, int] = {}
+
+    @property
+    def follows_stream(self) -> bool:
+        """Whether the tailer follows a single stream with forward tokens."""
+        return len(self.log_stream_names) == 1 and not self.filter_pattern
+
+    def poll(self) -> List[Dict[str, Any]]:
+        """Return the events that arrived since the previous poll, oldest first."""
+        if self.follows_stream:
+            events = self._poll_stream()
+        else:
+            events = self._poll_filtered()
+        if events:
+            self.cursor = max(self.cursor, max(event.get('timestamp', 0) for event in events))
+        return [format_log_event(event, self.log_group_name) for event in events]
+
+    def _poll_stream(self) -> List[Dict[str, Any]]:
+        """Read a single stream forward from the last forward token."""
+        events = []
+        for _ in range(self.max_pages):
+            params = {'logGroupName': self.log_group_name, 'logStreamName': self.log_stream_names[0],
+                      'startFromHead': True, 'limit': self.page_limit}
+            if self._forward_token:
+                params['nextToken'] = self._forward_token
+            else:
+                params['startTime'] = self.cursor
+            response = call_with_backoff(self.logs_client.get_log_events, **params)
+            page = response.get('events', [])
+            for event in page:
+                event.setdefault('logStreamName', self.log_stream_names[0])
+            events.extend(page)
+
+            # The forward token stays the same once the end of the stream is reached
+            next_token = response.get('nextForwardToken')
+            reached_end = not page or next_token == self._forward_token
+            self._forward_token = next_token or self._forward_token
+            if reached_end:
+                break
+        return events
+
+    def _poll_filtered(self) -> List[Dict[str, Any]]:
+        """Read the log group with filter_log_events from the cursor, skipping events already returned."""
+        if self._pending_params is not None:
+            # Finish the search the previous poll ran out of pages for
+            params, self._pending_params = self._pending_params, None
+        else:
+            params = {'logGroupName': self.log_group_name, 'startTime': max(0, self.cursor - self.lookback_ms),
+                      'limit': self.page_limit}
+            if self.log_stream_names:
+                params['logStreamNames'] = self.log_stream_names
+            if self.filter_pattern:
+                params['filterPattern'] = self.filter_pattern
+
+        events = []
+        for _ in range(self.max_pages):
+            response = call_with_backoff(self.logs_client.filter_log_events, **params)
+            for event in response.get('events', []):
+                event_id = event.get('eventId')
+                if event_id in self._seen:
+                    continue
+                self._seen[event_id] = event.get('timestamp', 0)
+                events.append(event)
+            next_token = response.get('nextToken')
+            if not next_token:
+                break
+            params['nextToken'] = next_token
+        else:
+            # Unread pages may hold events older than the cursor, so they cannot be skipped
+            self._pending_params = params
+
+        events.sort(key=lambda event: event.get('timestamp', 0))
+        # Forget events that have fallen out of the lookback window
+        horizon = max(self.cursor, max((event.get('timestamp', 0) for event in events), default=0))
+        horizon -= self.lookback_ms
+        self._seen = {event_id: stamp for event_id, stamp in self._seen.items() if stamp >= horizon}
+        return events
+
+
+class TailSubscription:
+    """One viewer of a shared tail, with its own bounded buffer of undelivered events."""
+
+    def __init__(self, poller: '_TailPoller', buffer_size: int, wake_event: threading.Event):
+        """Initialize the subscription.
+
+        Args:
+            poller: Poller the subscription receives events from
+            buffer_size: Events kept for the viewer; older ones are dropped when it falls behind
+            wake_event: Event set whenever new events or errors arrive
+        """
+        self.poller = poller
+        self.wake_event = wake_event
+        self._lock = threading.Lock()
+        self._events: Deque[Dict[str, Any]] = deque(maxlen=buffer_size)
+        self._errors: Deque[str] = deque(maxlen=10)
+        self.delivered = 0
+        self.dropped = 0
+        self.closed = False
+
+    @property
+    def log_group_name(self) -> str:
+        """Log group the subscription follows."""
+        return self.poller.key[0]
+
+    def push(self, events: List[Dict[str, Any]]) -> None:
+        """Add events to the buffer, dropping the oldest ones if it is full."""
+        with self._lock:
+            overflow = len(self._events) + len(events) - self._events.maxlen
+            if overflow > 0:
+                self.dropped += overflow
+            self._events.extend(events)
+        self.wake_event.set()
+
+    def push_error(self, message: str) -> None:
+        """Report a polling error to the viewer."""
+        with self._lock:
+            self._errors.append(message)
+        self.wake_event.set()
+
+    def drain(self) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """Take every buffered event and error."""
+        with self._lock:
+            events = list(self._events)
+            errors = list(self._errors)
+            self._events.clear()
+            self._errors.clear()
+            self.delivered += len(events)
+        return events, errors
+
+
+class _TailPoller:
+    """Background thread polling one log group for every subscription to it."""
+
+    def __init__(self, hub: 'TailHub', key: Tuple[str, Tuple[str, ...], Optional[str]],
+                 tailer: LogTailer, history_size: int):
+        self.hub = hub
+        self.key = key
+        self.tailer = tailer
+        self.subscriptions: List[TailSubscription] = []
+        self.history: Deque[Dict[str, Any]] = deque(maxlen=history_size)
+        self.polls = 0
+        self.events = 0
+        self.errors = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        """Poll until the last subscription leaves, backing off while the logs are quiet."""
+        interval = self.hub.min_interval
+        while not self._stop.is_set():
+            with self.hub._lock:
+                if not self.subscriptions:
+                    self.hub._pollers.pop(self.key, None)
+                    return
+                subscriptions = list(self.subscriptions)
+
+            try:
+                events = self.tailer.poll()
+                error = None
+            except Exception as e:
+                events = []
+                error = str(e)
+            self.polls += 1
+
+            with self.hub._lock:
+                subscriptions = list(self.subscriptions)
+                if events:
+                    self.history.extend(events)
+            if error:
+                self.errors += 1
+                for subscription in subscriptions:
+                    subscription.push_error(error)
+            if events:
+                self.events += len(events)
+                for subscription in subscriptions:
+                    subscription.push(events)
+                interval = self.hub.min_interval
+            else:
+                interval = min(self.hub.max_interval, interval * 2)
+            self._stop.wait(interval)
+
+        with self.hub._lock:
+            if self.hub._pollers.get(self.key) is self:
+                self.hub._pollers.pop(self.key, None)
+
+
+class TailHub:
+    """Share one poller per (log group, streams, filter) between every viewer tailing it.
+
+    Each viewer gets a TailSubscription with a bounded ring buffer, so a slow
+    viewer loses its oldest undelivered events instead of slowing down the
+    poller or the other viewers. A poller keeps a short history, which new
+    viewers are backfilled from, and stops when its last viewer leaves.
+    """
+
+    def __init__(self, logs_client, buffer_size: int = 1000, history_size: int = 500,
+                 min_interval: float = 1.0, max_interval: float = 10.0,
+                 tailer_factory: Callable[..., LogTailer] = LogTailer):
+        """Initialize the hub.
+
+        Args:
+            logs_client: boto3 CloudWatch Logs client
+            buffer_size: Undelivered events kept per viewer
+            history_size: Recent events kept per poller to backfill new viewers
+            min_interval: Seconds between polls while events are arriving
+            max_interval: Seconds between polls once the logs are quiet
+            tailer_factory: Callable creating the tailer of a poller
+        """
+        self.logs_client = logs_client
+        self.buffer_size = buffer_size
+        self.history_size = history_size
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.tailer_factory = tailer_factory
+        self._lock = threading.Lock()
+        self._pollers: Dict[Tuple[str, Tuple[str, ...], Optional[str]], _TailPoller] = {}
+        self._closed_delivered = 0
+        self._closed_dropped = 0
+
+    def subscribe(self, log_group_name: str, log_stream_names: Optional[List[str]] = None,
+                  filter_pattern: Optional[str] = None, start_time: Optional[int] = None,
+                  wake_event: Optional[threading.Event] = None) -> TailSubscription:
+        """Start receiving the new events of a log group.
+
+        Args:
+            log_group_name: Log group to follow
+            log_stream_names: Optional streams of the group to follow
+            filter_pattern: Optional CloudWatch Logs filter pattern
+            start_time: Backfill events from this time in milliseconds, as far as the history
+                of an already running poller reaches; a new poller starts there
+            wake_event: Event to set when events arrive, e.g. shared by all subscriptions of a viewer
+
+        Returns:
+            The subscription; call unsubscribe when the viewer leaves
+        """
+        key = (log_group_name, tuple(sorted(log_stream_names or [])), filter_pattern or None)
+        with self._lock:
+            poller = self._pollers.get(key)
+            created = poller is None
+            if created:
+                tailer = self.tailer_factory(self.logs_client, log_group_name, log_stream_names=list(key[1]),
+                                             filter_pattern=key[2], start_time=start_time)
+                poller = _TailPoller(self, key, tailer, self.history_size)
+                self._pollers[key] = poller
+            subscription = TailSubscription(poller, self.buffer_size, wake_event or threading.Event())
+            poller.subscriptions.append(subscription)
+            backfill = [event for event in poller.history
+                        if start_time is not None and event['timestamp'] >= start_time]
+        if backfill:
+            subscription.push(backfill)
+        if created:
+            poller.start()
+        return subscription
+
+    def unsubscribe(self, subscription: TailSubscription) -> None:
+        """Stop a subscription; its poller stops when no subscriptions are left."""
+        with self._lock:
+            if subscription.closed:
+                return
+            subscription.closed = True
+            poller = subscription.poller
+            if subscription in poller.subscriptions:
+                poller.subscriptions.remove(subscription)
+            self._closed_delivered += subscription.delivered
+            self._closed_dropped += subscription.dropped
+            if not poller.subscriptions:
+                # Remove the poller right away so a new viewer starts a fresh one
+                if self._pollers.get(poller.key) is poller:
+                    del self._pollers[poller.key]
+                poller.stop()
+
+    def stop_all(self) -> None:
+        """Stop every poller, e.g. on shutdown."""
+        with self._lock:
+            pollers = list(self._pollers.values())
+            self._pollers.clear()
+        for poller in pollers:
+            poller.stop()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return subscriber, poll and dropped-event counters of the hub and each poller."""
+        with self._lock:
+            pollers = []
+            for (log_group_name, log_stream_names, filter_pattern), poller in self._pollers.items():
+                pollers.append({
+                    'logGroup': log_group_name,
+                    'logStreams': list(log_stream_names),
+                    'filterPattern': filter_pattern,
+                    'subscribers': len(poller.subscriptions),
+                    'polls': poller.polls,
+                    'events': poller.events,
+                    'errors': poller.errors,
+                    'dropped': sum(subscription.dropped for subscription in poller.subscriptions),
+                })
+            active_delivered = sum(subscription.delivered for poller in self._pollers.values()
+                                   for subscription in poller.subscriptions)
+            return {
+                'pollers': len(pollers),
+                'subscribers': sum(poller['subscribers'] for poller in pollers),
+                'delivered': self._closed_delivered + active_delivered,
+                'dropped': self._closed_dropped + sum(poller['dropped'] for poller in pollers),
+                'streams': pollers,
+            }
@@ -0,0 +1,181 @@
+"""
+Topology snapshots for AWS EventBridge Explorer.
+This module contains the immutable view of an event bus built once per crawl.
+"""
+
+import datetime
+import hashlib
+import json
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+import networkx as nx
+
+
+def _freeze(value: Any) -> Any:
+    """Return a deep, read-only copy of a JSON-like value."""
+    if isinstance(value, Mapping):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _thaw(value: Any) -> Any:
+    """Return a plain, mutable copy of a frozen value."""
+    if isinstance(value, Mapping):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(item) for item in value]
+    return value
+
+
+class TopologySnapshot:
+    """Immutable snapshot of the rules, event patterns and targets of one event bus.
+
+    A snapshot is built once per bus crawl from the output of
+    EventBridgeExplorer.fetch_rules. Everything derived from it (graphs, rule
+    lists for the web UI) is computed locally without further AWS calls.
+    """
+
+    __slots__ = ('_event_bus_name', '_rules', '_rules_by_name', '_fetched_at', '_etag')
+
+    def __init__(self, event_bus_name: str, rules: Iterable[Dict[str, Any]],
+                 fetched_at: Optional[datetime.datetime] = None):
+        """Initialize the snapshot.
+
+        Args:
+            event_bus_name: Name of the event bus the rules belong to
+            rules: Rules as returned by fetch_rules, each with a 'Targets' list
+            fetched_at: When the rules were crawled, defaults to now
+        """
+        frozen_rules = tuple(_freeze(rule) for rule in rules)
+        object.__setattr__(self, '_event_bus_name', event_bus_name)
+        object.__setattr__(self, '_rules', frozen_rules)
+        object.__setattr__(self, '_rules_by_name',
+                           MappingProxyType({rule['Name']: rule for rule in frozen_rules}))
+        object.__setattr__(self, '_fetched_at', fetched_at or datetime.datetime.now())
+        object.__setattr__(self, '_etag', self._content_hash())
+
+    def _content_hash(self) -> str:
+        """Hash the bus name and rules, independent of when they were crawled."""
+        content = json.dumps([self._event_bus_name, [_thaw(rule) for rule in self._rules]],
+                             sort_keys=True, separators=(',', ':'), default=str)
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+    def __setattr__(self, name, value):
+        raise AttributeError("TopologySnapshot is immutable")
+
+    def __len__(self) -> int:
+        return len(self._rules)
+
+    def __repr__(self) -> str:
+        return f"TopologySnapshot(event_bus_name={self._event_bus_name!r}, rules={len(self._rules)})"
+
+    @property
+    def event_bus_name(self) -> str:
+        """Name of the event bus."""
+        return self._event_bus_name
+
+    @property
+    def fetched_at(self) -> datetime.datetime:
+        """When the snapshot was crawled."""
+        return self._fetched_at
+
+    @property
+    def etag(self) -> str:
+        """Content hash of the snapshot, suitable as an HTTP ETag."""
+        return self._etag
+
+    @property
+    def rules(self) -> Tuple[Mapping[str, Any], ...]:
+        """Read-only rules in crawl order."""
+        return self._rules
+
+    @property
+    def rule_names(self) -> List[str]:
+        """Names of all rules in crawl order."""
+        return [rule['Name'] for rule in self._rules]
+
+    def get_rule(self, rule_name: str) -> Optional[Mapping[str, Any]]:
+        """Get a read-only rule by name, or None if the bus has no such rule."""
+        return self._rules_by_name.get(rule_name)
+
+    def get_event_pattern(self, rule_name: str) -> Optional[str]:
+        """Get the event pattern JSON string of a rule, if it has one."""
+        rule = self._rules_by_name.get(rule_name)
+        return rule.get('EventPattern') if rule else None
+
+    def get_targets(self, rule_name: str) -> Tuple[Mapping[str, Any], ...]:
+        """Get the read-only targets of a rule."""
+        rule = self._rules_by_name.get(rule_name)
+        return rule.get('Targets', ()) if rule else ()
+
+    def to_list(self, rule_names: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """Return plain, JSON-serializable copies of the rules.
+
+        Args:
+            rule_names: Optional rule names to filter by, crawl order is kept
+        """
+        wanted = set(rule_names) if rule_names else None
+        return [_thaw(rule) for rule in self._rules if wanted is None or rule['Name'] in wanted]
+
+    def build_graph(self, rule_names: Optional[Iterable[str]] = None) -> nx.DiGraph:
+        """Build a graph of the event bus, its rules and their targets.
+
+        Args:
+            rule_names: Optional list of rule names to filter by
+
+        Returns:
+            NetworkX DiGraph object representing the event bus, rules and targets.
+        """
+        event_bus_name = self._event_bus_name
+        wanted = set(rule_names) if rule_names else None
+
+        G = nx.DiGraph()
+
+        # Add event bus node
+        G.add_node(event_bus_name, type='event_bus', name=event_bus_name, label=event_bus_name)
+
+        for rule in self._rules:
+            rule_name = rule['Name']
+
+            # Skip if we're filtering rules and this one isn't in the list
+            if wanted is not None and rule_name not in wanted:
+                continue
+
+            # Add rule node
+            G.add_node(rule_name, type='rule', name=rule_name, label=rule_name)
+
+            # Connect event bus to rule
+            G.add_edge(event_bus_name, rule_name)
+
+            # Include the event pattern in the rule node data
+            event_pattern = rule.get('EventPattern')
+            if event_pattern:
+                G.nodes[rule_name]['eventPattern'] = event_pattern
+
+            # Process targets
+            for target in rule.get('Targets', ()):
+                target_id_from_aws = target.get('Id', 'unknown_target')
+                target_arn = target.get('Arn', 'unknown_arn')
+                # Create a unique node ID for the target, prefixed by its rule, as targets can be reused.
+                target_node_id = f"target:{rule_name}:{target_id_from_aws}"
+
+                # Use the function name as the label for Lambda targets
+                display_name = target_id_from_aws
+                if ':lambda:' in target_arn and ':function:' in target_arn:
+                    display_name = target_arn.split(':function:')[-1]
+
+                # Add target node
+                G.add_node(target_node_id,
+                           type='target',
+                           name=target_id_from_aws,  # Original ID in rule
+                           label=display_name,  # Cytoscape label - using function name for Lambda
+                           arn=target_arn,
+                           rule_name=rule_name)  # Store original rule name for context
+
+                # Connect rule to target
+                G.add_edge(rule_name, target_node_id)
+
+        return G
@@ -5,18 +5,33 @@ This module provides a web server to serve the Cytoscape.js visualization.
 
 import os
 import json
+import hashlib
+import re
+import select
+import socket
 import threading
 import webbrowser
 import time
 import networkx as nx
-from typing import Dict, List, Any, Optional, Callable
-import boto3
+from typing import Dict, Iterable, List, Any, Mapping, Optional, Callable
 import datetime
+from contextlib import contextmanager
 
-from flask import Flask, render_template, jsonify, request
+from botocore.exceptions import ClientError
+from flask import Flask, Response, render_template, jsonify, request
 from flask_cors import CORS
 
 from eventbridge.core import EventBridgeExplorer
+from eventbridge.fanout import parse_crawl_targets
+from eventbridge.log_engine import ENGINE_FILTER, ENGINE_INSIGHTS
+from eventbridge.tail import TailHub
+
+# Largest batch of events /api/match_events accepts in one request
+MAX_MATCH_EVENTS = 10000
+
+# Seconds between checks whether the client of a long request is still connected
+DISCONNECT_POLL_INTERVAL = 0.5
+
 
 class EventBridgeWebServer:
     """Web server for EventBridge Explorer."""
@@ -32,6 +47,10 @@ class EventBridgeWebServer:
         # Initialize the explorer
         self.explorer = explorer if explorer else EventBridgeExplorer()
         
+        # Live tails share one poller per log group; polls back off from 1s to 10s while idle
+        self.tail_hub = TailHub(self.explorer.logs_client, min_interval=1.0, max_interval=10.0)
+        self.tail_heartbeat_interval = 15.0
+        
         # Register routes
         self.register_routes()
         
@@ -80,28 +99,82 @@ class EventBridgeWebServer:
                         'message': 'Event bus name is required'
                     }), 400
                 
-                # Clean up the event bus name if it has a prefix
-                if "Event Bus:" in event_bus_name:
-                    event_bus_name = event_bus_name.replace("Event Bus:", "").strip()
+                event_bus_name = self.clean_event_bus_name(event_bus_name)
                 
+                # Work on a request-scoped snapshot instead of selecting the bus on the
+                # shared explorer, so concurrent requests for other buses are unaffected.
+                # The cached topology is reused unless it is stale or a refresh is forced.
+                refresh = self.is_truthy(request.args.get('refresh'))
                 try:
-                    # Select the event bus
-                    self.explorer.select_event_bus(event_bus_name)
-                except ValueError as e:
+                    snapshot = self.explorer.get_topology_snapshot(event_bus_name, force_refresh=refresh)
+                except ClientError as e:
                     # Handle the case where the event bus doesn't exist
+                    if e.response.get('Error', {}).get('Code') == 'ResourceNotFoundException':
+                        return jsonify({
+                            'success': False,
+                            'message': f"Event bus '{event_bus_name}' not found"
+                        }), 404
+                    raise
+                print(f"Serving {len(snapshot)} rules for event bus: {event_bus_name}")
+                
+                return self.conditional_json(snapshot.etag, lambda: {
+                    'success': True,
+                    'data': snapshot.to_list()
+                })
+                
+            except Exception as e:
+                return jsonify({
+                    'success': False,
+                    'message': str(e)
+                }), 500
+        
+        @self.app.route('/api/rules/overlaps', methods=['GET'])
+        def get_rule_overlaps():
+            """Report the rules of an event bus that match the same events or can never match."""
+            try:
+                event_bus_name = self.clean_event_bus_name(request.args.get('event_bus'))
+                
+                if not event_bus_name:
                     return jsonify({
                         'success': False,
-                        'message': str(e)
-                    }), 404
+                        'message': 'Event bus name is required'
+                    }), 400
+                
+                refresh = self.is_truthy(request.args.get('refresh'))
+                snapshot = self.explorer.get_topology_snapshot(event_bus_name, force_refresh=refresh)
                 
-                # Always fetch rules to ensure we have the latest
-                print(f"Fetching rules for event bus: {event_bus_name}")
-                rules = self.explorer.fetch_rules()
-                print(f"Fetched {len(rules)} rules")
+                # The report depends only on the topology
+                etag = hashlib.sha256(json.dumps([snapshot.etag, 'overlaps']).encode('utf-8')).hexdigest()
+                return self.conditional_json(etag, lambda: {
+                    'success': True,
+                    'data': self.explorer.analyze_overlaps(event_bus_name, snapshot)
+                })
                 
+            except Exception as e:
                 return jsonify({
+                    'success': False,
+                    'message': str(e)
+                }), 500
+        
+        @self.app.route('/api/account/inventory', methods=['GET'])
+        def get_account_inventory():
+            """Crawl every event bus of the account and return the combined inventory."""
+            try:
+                refresh = self.is_truthy(request.args.get('refresh'))
+                progress = []
+                inventory = self.explorer.crawl_account(force_refresh=refresh, progress_callback=progress.append)
+                
+                # The inventory changes only when a bus or one of its topologies does
+                etag = hashlib.sha256(json.dumps([
+                    inventory.buses,
+                    sorted((bus, snapshot.etag) for bus, snapshot in inventory.snapshots.items()),
+                    sorted(inventory.errors.items())
+                ], sort_keys=True, default=str).encode('utf-8')).hexdigest()
+                
+                return self.conditional_json(etag, lambda: {
                     'success': True,
-                    'data': self.explorer.rules
+                    'data': inventory.to_dict(),
+                    'progress': progress
                 })
                 
             except Exception as e:
@@ -110,13 +183,46 @@ class EventBridgeWebServer:
                     'message': str(e)
                 }), 500
         
+        @self.app.route('/api/fanout/inventory', methods=['POST'])
+        def get_fanout_inventory():
+            """Crawl several profiles and regions and return one merged inventory."""
+            try:
+                data = request.json or {}
+                targets = data.get('targets')
+                
+                # Accept "profile:region,..." strings or a list of {profile, region} objects
+                if isinstance(targets, str):
+                    targets = parse_crawl_targets(targets)
+                elif targets:
+                    targets = [(item.get('profile') or None, item.get('region') or None) for item in targets]
+                
+                progress = []
+                inventory = self.explorer.crawl_regions(targets, progress_callback=progress.append)
+                
+                return jsonify({
+                    'success': True,
+                    'data': inventory.to_dict(),
+                    'progress': progress
+                })
+                
+            except ValueError as e:
+                return jsonify({
+                    'success': False,
+                    'message': str(e)
+                }), 400
+            except Exception as e:
+                return jsonify({
+                    'success': False,
+                    'message': str(e)
+                }), 500
+        
         @self.app.route('/api/graph', methods=['POST'])
         def get_graph():
             """Get graph data for an event bus."""
             try:
                 data = request.json
-                event_bus_name = data.get('event_bus')
-                rule_names = data.get('rules', [])
+                event_bus_name = self.clean_event_bus_name(data.get('event_bus'))
+                rule_names = data.get('rules') or []
                 
                 if not event_bus_name:
                     return jsonify({
@@ -124,14 +230,7 @@ class EventBridgeWebServer:
                         'message': 'Event bus name is required'
                     }), 400
                 
-                # Select the event bus
-                self.explorer.select_event_bus(event_bus_name)
-                
-                # Fetch rules if not already fetched
-                if not self.explorer.rules:
-                    self.explorer.fetch_rules()
-                
-                # Build the graph
+                # Build the graph from the topology snapshot
                 graph = self.explorer.build_graph(event_bus_name, rule_names)
                 
                 # Convert to Cytoscape.js format
@@ -258,11 +357,13 @@ class EventBridgeWebServer:
                 
         @self.app.route('/api/search_logs', methods=['POST'])
         def search_target_logs():
-            """Search logs across a specific target for a search term."""
+            """Search logs across a specific target for a search term, several terms or a regex."""
             try:
                 data = request.json
                 target_arn = data.get('targetArn')
                 search_term = data.get('searchTerm')
+                search_terms = data.get('searchTerms') or []
+                search_regex = data.get('searchRegex')
                 limit = data.get('limit', 100)
                 
                 if not target_arn:
@@ -271,18 +372,49 @@ class EventBridgeWebServer:
                         'message': 'Target ARN is required'
                     }), 400
                 
-                if not search_term:
+                if not search_term and not search_terms and not search_regex:
                     return jsonify({
                         'success': False,
                         'message': 'Search term is required'
                     }), 400
                 
-                # Use the fetch_target_logs method with search_term parameter
-                logs_data = self.explorer.fetch_target_logs(
-                    target_arn=target_arn,
-                    limit=limit,
-                    search_term=search_term
-                )
+                if not isinstance(search_terms, list) or not all(isinstance(term, str) for term in search_terms):
+                    return jsonify({
+                        'success': False,
+                        'message': 'searchTerms must be a list of strings'
+                    }), 400
+                
+                if search_regex:
+                    try:
+                        re.compile(search_regex)
+                    except re.error as e:
+                        return jsonify({
+                            'success': False,
+                            'message': f'Invalid search regex: {e}'
+                        }), 400
+                
+                engine = data.get('engine') or None
+                if engine not in (None, 'auto', ENGINE_FILTER, ENGINE_INSIGHTS):
+                    return jsonify({
+                        'success': False,
+                        'message': f'engine must be auto, {ENGINE_FILTER} or {ENGINE_INSIGHTS}'
+                    }), 400
+                
+                # Use the fetch_target_logs method with the search parameters; queries
+                # still running when the browser goes away are stopped on AWS
+                with self.watch_disconnect() as cancel_event:
+                    logs_data = self.explorer.fetch_target_logs(
+                        target_arn=target_arn,
+                        limit=limit,
+                        start_time=data.get('startTime'),
+                        end_time=data.get('endTime'),
+                        search_term=search_term,
+                        sharded=self.is_truthy(data.get('sharded')),
+                        search_terms=search_terms,
+                        search_regex=search_regex,
+                        engine=engine,
+                        cancel_event=cancel_event
+                    )
                 
                 if not logs_data.get('success', False):
                     return jsonify({
@@ -334,13 +466,26 @@ class EventBridgeWebServer:
                     'message': str(e)
                 }), 500
                 
+        @self.app.route('/api/logs/stats', methods=['GET'])
+        def get_log_query_stats():
+            """Get the counters of the Logs Insights query runner, result cache, local search index and engines."""
+            return jsonify({
+                'success': True,
+                'data': {
+                    'queries': dict(self.explorer.query_runner.stats),
+                    'cache': self.explorer.insights_cache.get_stats(),
+                    'index': self.explorer.log_index.get_stats(),
+                    'engines': self.explorer.engine_selector.get_stats()
+                }
+            })
+        
         @self.app.route('/api/graph/with-logs', methods=['POST'])
         def get_graph_with_logs():
             """Get graph data with log nodes included."""
             try:
                 data = request.json
-                event_bus_name = data.get('event_bus')
-                rule_names = data.get('rules', [])
+                event_bus_name = self.clean_event_bus_name(data.get('event_bus'))
+                rule_names = data.get('rules') or []
                 
                 if not event_bus_name:
                     return jsonify({
@@ -348,26 +493,30 @@ class EventBridgeWebServer:
                         'message': 'Event bus name is required'
                     }), 400
                 
-                # Select the event bus
-                self.explorer.select_event_bus(event_bus_name)
+                # Crawl the bus only if the cached snapshot is stale; rebuilding the
+                # graph for a new rule selection is then local work
+                refresh = self.is_truthy(data.get('refresh'))
+                snapshot = self.explorer.get_topology_snapshot(event_bus_name, force_refresh=refresh)
                 
-                # Fetch rules if not already fetched
-                if not self.explorer.rules:
-                    self.explorer.fetch_rules(event_bus_name)
+                # The graph depends only on the topology and the rule selection
+                etag = hashlib.sha256(
+                    json.dumps([snapshot.etag, sorted(rule_names)]).encode('utf-8')
+                ).hexdigest()
                 
-                # Build the enhanced graph with log nodes
-                graph = self.explorer.build_graph_with_logs(event_bus_name, rule_names)
-                
-                # Convert to Cytoscape.js format
-                elements = self.convert_graph_to_elements(graph)
-                
-                return jsonify({
-                    'success': True,
-                    'data': {
-                        'elements': elements,
-                        'eventBusName': event_bus_name
+                def build_payload():
+                    # Build the enhanced graph with log nodes
+                    graph = self.explorer.build_graph_with_logs(event_bus_name, rule_names, snapshot=snapshot)
+                    
+                    # Convert to Cytoscape.js format
+                    return {
+                        'success': True,
+                        'data': {
+                            'elements': self.convert_graph_to_elements(graph),
+                            'eventBusName': event_bus_name
+                        }
                     }
-                })
+                
+                return self.conditional_json(etag, build_payload)
                 
             except Exception as e:
                 return jsonify({
@@ -392,8 +541,8 @@ class EventBridgeWebServer:
                         'message': 'Log group and stream name are required'
                     }), 400
                 
-                # Create CloudWatch Logs client
-                logs_client = boto3.client('logs')
+                # Use the shared CloudWatch Logs client
+                logs_client = self.explorer.logs_client
                 
                 # Prepare parameters for get_log_events
                 params = {
@@ -452,11 +601,287 @@ class EventBridgeWebServer:
                     'message': str(e)
                 }), 500
         
+        @self.app.route('/api/stream_logs/page', methods=['POST'])
+        def get_stream_log_page():
+            """Get one page of a log stream as JSON, with tokens for the newer and older pages."""
+            try:
+                data = request.json or {}
+                log_group = data.get('logGroup')
+                log_stream = data.get('logStream')
+                
+                if not log_group or not log_stream:
+                    return jsonify({
+                        'success': False,
+                        'message': 'Log group and stream name are required'
+                    }), 400
+                
+                page = self.explorer.fetch_stream_log_page(
+                    log_group,
+                    log_stream,
+                    limit=min(int(data.get('limit', 100)), 10000),
+                    token=data.get('token') or None,
+                    start_from_head=self.is_truthy(data.get('startFromHead'))
+                )
+                
+                return jsonify({
+                    'success': True,
+                    **page
+                })
+                
+            except ClientError as e:
+                status = 404 if e.response['Error']['Code'] == 'ResourceNotFoundException' else 500
+                return jsonify({
+                    'success': False,
+                    'message': str(e)
+                }), status
+            except Exception as e:
+                return jsonify({
+                    'success': False,
+                    'message': str(e)
+                }), 500
+        
+        @self.app.route('/api/export_logs', methods=['POST'])
+        def export_logs():
+            """Stream every log row of a time range as gzip-compressed NDJSON."""
+            data = request.json or {}
+            log_group = data.get('logGroup')
+            if not log_group and data.get('targetArn'):
+                log_group = self.explorer.target_log_group_name(data['targetArn'])
+            
+            if not log_group:
+                return jsonify({
+                    'success': False,
+                    'message': 'A log group or a Lambda or Step Functions target ARN is required'
+                }), 400
+            
+            try:
+                start_time = int(float(data['startTime']))
+                end_time = int(float(data['endTime']))
+            except (KeyError, TypeError, ValueError):
+                return jsonify({
+                    'success': False,
+                    'message': 'startTime and endTime (Unix timestamps in seconds) are required'
+                }), 400
+            
+            if start_time >= end_time:
+                return jsonify({
+                    'success': False,
+                    'message': 'startTime must be before endTime'
+                }), 400
+            
+            # An interrupted download resumes at the second of the last row the client received
+            resume_from = data.get('resumeFrom')
+            if resume_from is not None:
+                try:
+                    resume_from = int(float(resume_from))
+                except (TypeError, ValueError):
+                    resume_from = None
+                if resume_from is None or not start_time <= resume_from < end_time:
+                    return jsonify({
+                        'success': False,
+                        'message': 'resumeFrom must be a Unix timestamp in seconds between startTime and endTime'
+                    }), 400
+            
+            search_regex = data.get('searchRegex')
+            if search_regex:
+                try:
+                    re.compile(search_regex)
+                except re.error as e:
+                    return jsonify({
+                        'success': False,
+                        'message': f'Invalid search regex: {e}'
+                    }), 400
+            
+            if not self.explorer.get_log_catalog().exists(log_group):
+                return jsonify({
+                    'success': False,
+                    'message': f'Log group {log_group} does not exist'
+                }), 404
+            
+            exporter = self.explorer.create_log_exporter(
+                log_group,
+                search_term=data.get('searchTerm'),
+                search_terms=data.get('searchTerms') or [],
+                search_regex=search_regex,
+                max_workers=max(1, min(int(data.get('maxWorkers', 4)), 16))
+            )
+            
+            checkpoint = None
+            if resume_from is not None:
+                checkpoint = {'log_group': log_group, 'query': exporter.query, 'start_time': start_time,
+                              'end_time': end_time, 'cursor': resume_from, 'rows': 0, 'bytes': 0}
+            
+            def generate():
+                try:
+                    yield from exporter.export(start_time, end_time, checkpoint=checkpoint)
+                except Exception as e:
+                    # Headers are already sent; re-raising aborts the chunked response so the
+                    # client sees a failed download rather than a complete-looking gzip file
+                    print(f"Error exporting {log_group}: {str(e)}")
+                    raise
+                print(f"Exported {log_group}: {exporter.stats}")
+            
+            filename = f"{log_group.strip('/').replace('/', '_')}_{start_time}_{end_time}.ndjson.gz"
+            return Response(generate(), mimetype='application/gzip',
+                            headers={'Content-Disposition': f'attachment; filename="{filename}"'})
+        
+        @self.app.route('/api/tail', methods=['GET'])
+        def tail_logs():
+            """Stream new events of one or more log groups or streams as Server-Sent Events."""
+            log_groups = [group for group in request.args.getlist('logGroup') if group]
+            log_streams = [stream for stream in request.args.getlist('logStream') if stream]
+            filter_pattern = request.args.get('filterPattern') or None
+            
+            if not log_groups:
+                return jsonify({
+                    'success': False,
+                    'message': 'At least one log group is required'
+                }), 400
+            if log_streams and len(log_groups) > 1:
+                return jsonify({
+                    'success': False,
+                    'message': 'Log streams can only be given together with a single log group'
+                }), 400
+            
+            # Resume after the last event the browser received, or backfill a few seconds
+            start_time = None
+            last_event_id = request.headers.get('Last-Event-ID', '')
+            if last_event_id.isdigit():
+                start_time = int(last_event_id) + 1
+            elif request.args.get('since'):
+                try:
+                    since = float(request.args['since'])
+                except ValueError:
+                    since = -1.0
+                if not 0 <= since < float('inf'):
+                    return jsonify({
+                        'success': False,
+                        'message': 'since must be a non-negative number of seconds'
+                    }), 400
+                start_time = int((time.time() - since) * 1000)
+            
+            def generate():
+                wake_event = threading.Event()
+                subscriptions = []
+                try:
+                    for group in log_groups:
+                        subscriptions.append(self.tail_hub.subscribe(
+                            group, log_stream_names=log_streams, filter_pattern=filter_pattern,
+                            start_time=start_time, wake_event=wake_event))
+                    yield self.sse_message('ready', {'logGroups': log_groups, 'logStreams': log_streams},
+                                           retry=3000)
+                    while True:
+                        # Wake up on new events, or after the heartbeat interval to check the connection
+                        wake_event.wait(self.tail_heartbeat_interval)
+                        wake_event.clear()
+                        events = []
+                        errors = []
+                        for subscription in subscriptions:
+                            new_events, new_errors = subscription.drain()
+                            events.extend(new_events)
+                            errors.extend({'logGroup': subscription.log_group_name, 'message': message}
+                                          for message in new_errors)
+                        
+                        if errors:
+                            yield self.sse_message('error', {'errors': errors})
+                        if events:
+                            events.sort(key=lambda event: event['timestamp'])
+                            yield self.sse_message('logs', {
+                                'events': events,
+                                'dropped': sum(subscription.dropped for subscription in subscriptions)
+                            }, event_id=events[-1]['timestamp'])
+                        if not events and not errors:
+                            # Comments keep proxies from closing the idle connection and detect disconnects
+                            yield ': heartbeat\n\n'
+                finally:
+                    for subscription in subscriptions:
+                        self.tail_hub.unsubscribe(subscription)
+            
+            return Response(generate(), mimetype='text/event-stream', headers={
+                'Cache-Control': 'no-cache',
+                'X-Accel-Buffering': 'no'
+            })
+        
+        @self.app.route('/api/tail/stats', methods=['GET'])
+        def get_tail_stats():
+            """Get the subscriber, poller and dropped-event counters of the live tails."""
+            return jsonify({
+                'success': True,
+                'data': self.tail_hub.get_stats()
+            })
+        
+        @self.app.route('/api/match_events', methods=['POST'])
+        def match_events():
+            """Find the rules and targets an event, or an NDJSON batch of events, would be routed to."""
+            try:
+                parse_errors = {}
+                if request.mimetype in ('application/x-ndjson', 'application/jsonl', 'text/plain'):
+                    event_bus_name = self.clean_event_bus_name(request.args.get('event_bus'))
+                    events = []
+                    for line in request.get_data(as_text=True).splitlines():
+                        if not line.strip():
+                            continue
+                        try:
+                            events.append(json.loads(line))
+                        except ValueError as e:
+                            parse_errors[len(events)] = f"Invalid JSON: {e}"
+                            events.append(None)
+                else:
+                    data = request.json or {}
+                    event_bus_name = self.clean_event_bus_name(data.get('event_bus') or request.args.get('event_bus'))
+                    events = data['events'] if 'events' in data else [data['event']] if 'event' in data else []
+                
+                if not event_bus_name:
+                    return jsonify({
+                        'success': False,
+                        'message': 'Event bus name is required'
+                    }), 400
+                
+                if not isinstance(events, list) or not events:
+                    return jsonify({
+                        'success': False,
+                        'message': 'An event, a list of events or an NDJSON body is required'
+                    }), 400
+                
+                if len(events) > MAX_MATCH_EVENTS:
+                    return jsonify({
+                        'success': False,
+                        'message': f'At most {MAX_MATCH_EVENTS} events can be matched per request'
+                    }), 413
+                
+                routed = self.explorer.route_events(event_bus_name, events)
+                for position, message in parse_errors.items():
+                    routed['results'][position] = {'index': position, 'error': message, 'rules': []}
+                
+                return jsonify({
+                    'success': True,
+                    'data': dict(routed, eventBusName=event_bus_name)
+                })
+                
+            except Exception as e:
+                return jsonify({
+                    'success': False,
+                    'message': str(e)
+                }), 500
+        
         @self.app.route('/api/send_event', methods=['POST'])
         def send_event():
-            """Send a test event to the EventBridge event bus."""
+            """Send a test event to the EventBridge event bus, or a bulk batch of events."""
             try:
+                if request.mimetype in ('application/x-ndjson', 'application/jsonl'):
+                    # Stream the body into the publisher line by line instead of buffering it
+                    lines = (line.decode('utf-8') for line in request.stream)
+                    return self.publish_events(lines, request.args)
+                
                 data = request.json
+                if 'events' in data:
+                    if not isinstance(data['events'], list):
+                        return jsonify({
+                            'success': False,
+                            'message': 'events must be a list'
+                        }), 400
+                    return self.publish_events(data['events'], data)
+                
                 event_data = data.get('event_data')
                 event_bus_name = data.get('event_bus_name', 'default')
                 
@@ -466,8 +891,8 @@ class EventBridgeWebServer:
                         'message': 'Event data is required'
                     }), 400
                 
-                # Create EventBridge client
-                events_client = boto3.client('events')
+                # Use the shared EventBridge client
+                events_client = self.explorer.eventbridge_client
                 
                 # Send the event
                 response = events_client.put_events(
@@ -511,6 +936,108 @@ class EventBridgeWebServer:
                     'message': str(e)
                 }), 500
     
+    def publish_events(self, events: Iterable[Any], options: Mapping[str, Any]):
+        """Publish events in PutEvents batches and return the throughput report.
+        
+        Args:
+            events: Events, PutEvents entries or NDJSON lines
+            options: Request parameters 'event_bus_name', 'rate' (events per second) and 'workers'
+        """
+        try:
+            rate = float(options['rate']) if options.get('rate') else None
+            workers = max(1, min(int(options.get('workers', 8)), 32))
+        except (TypeError, ValueError):
+            return jsonify({
+                'success': False,
+                'message': 'rate and workers must be numbers'
+            }), 400
+        if rate is not None and rate <= 0:
+            return jsonify({
+                'success': False,
+                'message': 'rate must be positive'
+            }), 400
+        
+        event_bus_name = self.clean_event_bus_name(options.get('event_bus_name')) or 'default'
+        publisher = self.explorer.create_event_publisher(event_bus_name, rate=rate, max_workers=workers)
+        report = publisher.publish(events)
+        print(report['message'])
+        return jsonify(report)
+    
+    @staticmethod
+    def clean_event_bus_name(event_bus_name: Optional[str]) -> Optional[str]:
+        """Strip the "Event Bus:" display prefix the UI may send with a bus name."""
+        if event_bus_name and "Event Bus:" in event_bus_name:
+            return event_bus_name.replace("Event Bus:", "").strip()
+        return event_bus_name
+    
+    @staticmethod
+    def is_truthy(value: Any) -> bool:
+        """Interpret a query string or JSON flag such as refresh=1 or refresh=true."""
+        if isinstance(value, str):
+            return value.strip().lower() in ('1', 'true', 'yes', 'on')
+        return bool(value)
+    
+    @contextmanager
+    def watch_disconnect(self, interval: float = DISCONNECT_POLL_INTERVAL):
+        """Yield an event that is set once the client of the current request disconnects.
+        
+        The connection is checked every interval seconds while the block runs. This
+        needs the socket the development server exposes as 'werkzeug.socket'; under
+        other servers the event is never set.
+        """
+        cancel_event = threading.Event()
+        done = threading.Event()
+        connection = request.environ.get('werkzeug.socket')
+        if connection is not None:
+            threading.Thread(target=self._watch_socket, args=(connection, cancel_event, done, interval),
+                             daemon=True).start()
+        try:
+            yield cancel_event
+        finally:
+            done.set()
+    
+    @staticmethod
+    def _watch_socket(connection, cancel_event: threading.Event, done: threading.Event, interval: float) -> None:
+        """Set cancel_event when the peer closes the connection, until done is set."""
+        while not done.wait(interval):
+            try:
+                readable, _, _ = select.select([connection], [], [], 0)
+                # A closed connection is readable with nothing left to read
+                if readable and not connection.recv(1, socket.MSG_PEEK):
+                    cancel_event.set()
+                    return
+            except (OSError, ValueError):
+                cancel_event.set()
+                return
+    
+    @staticmethod
+    def sse_message(event: str, data: Any, event_id: Optional[int] = None, retry: Optional[int] = None) -> str:
+        """Format one Server-Sent Events message with a JSON payload."""
+        lines = []
+        if retry is not None:
+            lines.append(f"retry: {retry}")
+        if event_id is not None:
+            lines.append(f"id: {event_id}")
+        lines.append(f"event: {event}")
+        lines.append(f"data: {json.dumps(data, default=str)}")
+        return "\n".join(lines) + "\n\n"
+    
+    def conditional_json(self, etag: str, build_payload: Callable[[], Dict[str, Any]]) -> Response:
+        """Return a JSON response tagged with an ETag, or 304 if the client already has it.
+        
+        Args:
+            etag: Content hash of the payload
+            build_payload: Callable producing the payload, only called on a cache miss
+        """
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        else:
+            response = jsonify(build_payload())
+        response.set_etag(etag)
+        # Make browsers revalidate with If-None-Match instead of reusing stale copies
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+    
     def convert_graph_to_elements(self, graph: nx.DiGraph) -> Dict[str, List[Dict[str, Any]]]:
         """Convert a NetworkX graph to Cytoscape.js elements format."""
         elements = {
@@ -536,7 +1063,8 @@ class EventBridgeWebServer:
                 'data': {
                     'id': f"{source}-{target}",
                     'source': source,
-                    'target': target
+                    'target': target,
+                    **graph.edges[source, target]
                 }
             })
         
@@ -549,7 +1077,8 @@ class EventBridgeWebServer:
             return
         
         def run_server():
-            self.app.run(host='127.0.0.1', port=self.port)
+            # Each request runs in its own thread and works on its own snapshot
+            self.app.run(host='127.0.0.1', port=self.port, threaded=True)
         
         self.server_thread = threading.Thread(target=run_server)
         self.server_thread.daemon = True
@@ -573,6 +1102,10 @@ class EventBridgeWebServer:
             print("Web server is not running.")
             return
         
+        # Stop Logs Insights queries still running on AWS so they do not use up the quota
+        self.explorer.query_runner.cancel_all()
+        self.tail_hub.stop_all()
+        
         # There's no clean way to stop a Flask server in a thread
         # We'll rely on the daemon thread to be terminated when the main program exits
         self.is_running = False
@@ -2,10 +2,16 @@
 Tests for the EventBridgeExplorer core class.
 """
 
+import threading
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import patch, MagicMock
 
+from botocore.exceptions import ClientError
+
+from eventbridge import clients
 from eventbridge.core import EventBridgeExplorer
+from eventbridge.topology import TopologySnapshot
 
 
 class TestEventBridgeExplorer(unittest.TestCase):
@@ -16,14 +22,18 @@ class TestEventBridgeExplorer(unittest.TestCase):
         """Set up the test case."""
         self.mock_eventbridge_client = MagicMock()
         self.mock_logs_client = MagicMock()
+        self.mock_logs_client.describe_log_groups.return_value = {'logGroups': []}
         
         # Configure boto3 client mock to return our mock clients
-        mock_boto3_client.side_effect = lambda service: {
+        clients.registry.clear()
+        mock_boto3_client.side_effect = lambda service, **kwargs: {
             'events': self.mock_eventbridge_client,
             'logs': self.mock_logs_client
         }[service]
         
         self.explorer = EventBridgeExplorer()
+        self.explorer._account_id = '123456789012'
+        self.mock_eventbridge_client.meta.region_name = 'us-east-1'
     
     def test_init(self):
         """Test the initialization of the EventBridgeExplorer class."""
@@ -52,6 +62,331 @@ class TestEventBridgeExplorer(unittest.TestCase):
         self.assertEqual(event_buses[0]['Name'], 'default')
         self.assertEqual(event_buses[1]['Name'], 'custom-bus')
 
+    def test_fetch_rules_concurrent_keeps_order_and_isolates_errors(self):
+        """Test that concurrent target fetching keeps rule order and per-rule errors."""
+        paginator = MagicMock()
+        paginator.paginate.return_value = [
+            {'Rules': [{'Name': f'rule-{i}'} for i in range(20)]}
+        ]
+        self.mock_eventbridge_client.get_paginator.return_value = paginator
+
+        def list_targets_by_rule(Rule, EventBusName):
+            if Rule == 'rule-3':
+                raise Exception('boom')
+            return {'Targets': [{'Id': f'{Rule}-target', 'Arn': 'arn:aws:sqs:us-east-1:123456789012:q'}]}
+
+        self.mock_eventbridge_client.list_targets_by_rule.side_effect = list_targets_by_rule
+
+        rules = self.explorer.fetch_rules('default', max_in_flight=4)
+
+        self.assertEqual([rule['Name'] for rule in rules], [f'rule-{i}' for i in range(20)])
+        self.assertEqual(rules[3]['Targets'], [])
+        self.assertEqual(rules[4]['Targets'][0]['Id'], 'rule-4-target')
+        self.assertEqual(self.mock_eventbridge_client.list_targets_by_rule.call_count, 20)
+
+    @patch('eventbridge.retry.time.sleep')
+    def test_fetch_rules_retries_throttled_target_calls(self, mock_sleep):
+        """Test that throttled list_targets_by_rule calls are retried."""
+        paginator = MagicMock()
+        paginator.paginate.return_value = [{'Rules': [{'Name': 'rule-a'}]}]
+        self.mock_eventbridge_client.get_paginator.return_value = paginator
+        throttled = ClientError({'Error': {'Code': 'ThrottlingException', 'Message': 'Rate exceeded'}},
+                                'ListTargetsByRule')
+        self.mock_eventbridge_client.list_targets_by_rule.side_effect = [
+            throttled,
+            {'Targets': [{'Id': 't1', 'Arn': 'arn:aws:sqs:us-east-1:123456789012:q'}]},
+        ]
+
+        rules = self.explorer.fetch_rules('default')
+
+        self.assertEqual(rules[0]['Targets'][0]['Id'], 't1')
+        self.assertEqual(mock_sleep.call_count, 1)
+
+    def test_build_graph_with_logs_uses_snapshot_without_aws_calls(self):
+        """Test that graphs are derived from the topology snapshot only."""
+        paginator = MagicMock()
+        paginator.paginate.return_value = [{'Rules': [
+            {'Name': 'orders', 'EventPattern': '{"source": ["orders"]}'},
+            {'Name': 'billing', 'EventPattern': '{"source": ["billing"]}'},
+        ]}]
+        self.mock_eventbridge_client.get_paginator.return_value = paginator
+        self.mock_eventbridge_client.list_targets_by_rule.return_value = {
+            'Targets': [{'Id': 'fn', 'Arn': 'arn:aws:lambda:us-east-1:123456789012:function:handler'}]
+        }
+
+        snapshot = self.explorer.build_topology_snapshot('default')
+        self.mock_eventbridge_client.reset_mock()
+
+        graph = self.explorer.build_graph_with_logs('default', ['orders'], snapshot=snapshot)
+
+        self.assertEqual(self.mock_eventbridge_client.method_calls, [])
+        self.assertIn('orders', graph.nodes)
+        self.assertNotIn('billing', graph.nodes)
+        self.assertEqual(graph.nodes['orders']['eventPattern'], '{"source": ["orders"]}')
+        self.assertEqual(graph.nodes['target:orders:fn']['label'], 'handler')
+        with self.assertRaises(TypeError):
+            snapshot.get_rule('orders')['Name'] = 'changed'
+
+    def test_build_graph_with_logs_connects_overlapping_rules(self):
+        """Test that rules matching the same events are joined by overlap edges."""
+        paginator = MagicMock()
+        paginator.paginate.return_value = [{'Rules': [
+            {'Name': 'orders', 'EventPattern': '{"source": ["orders"]}'},
+            {'Name': 'big-orders', 'EventPattern': '{"source": ["orders"], "detail": {"total": [{"numeric": [">", 100]}]}}'},
+            {'Name': 'billing', 'EventPattern': '{"source": ["billing"]}'},
+            {'Name': 'never', 'EventPattern': '{"detail": {"total": [{"numeric": [">", 5, "<", 1]}]}}'},
+        ]}]
+        self.mock_eventbridge_client.get_paginator.return_value = paginator
+        self.mock_eventbridge_client.list_targets_by_rule.return_value = {
+            'Targets': [{'Id': 'fn', 'Arn': 'arn:aws:lambda:us-east-1:123456789012:function:handler'}]
+        }
+        snapshot = self.explorer.build_topology_snapshot('default')
+
+        graph = self.explorer.build_graph_with_logs('default', snapshot=snapshot)
+        report = self.explorer.analyze_overlaps('default', snapshot)
+
+        self.assertEqual(graph.edges['big-orders', 'orders']['type'], 'overlap')
+        self.assertEqual(graph.edges['big-orders', 'orders']['relation'], 'subsumed')
+        self.assertEqual(graph.edges['big-orders', 'orders']['sharedTargets'],
+                         ['arn:aws:lambda:us-east-1:123456789012:function:handler'])
+        self.assertFalse(graph.has_edge('orders', 'billing'))
+        self.assertIn('numeric range', graph.nodes['never']['contradiction'])
+        self.assertIs(report, self.explorer.analyze_overlaps('default', snapshot))
+        self.assertNotIn(('big-orders', 'orders'),
+                         self.explorer.build_graph_with_logs('default', snapshot=snapshot, include_overlaps=False).edges)
+
+    def test_match_events_locally_compiles_patterns_once(self):
+        """Test that events are matched against the bus's rules without TestEventPattern."""
+        paginator = MagicMock()
+        paginator.paginate.return_value = [{'Rules': [
+            {'Name': 'orders', 'EventPattern': '{"source": ["orders"]}'},
+            {'Name': 'big-orders', 'EventPattern': '{"source": ["orders"], "detail": {"total": [{"numeric": [">", 100]}]}}'},
+            {'Name': 'scheduled', 'ScheduleExpression': 'rate(5 minutes)'},
+        ]}]
+        self.mock_eventbridge_client.get_paginator.return_value = paginator
+        self.mock_eventbridge_client.list_targets_by_rule.return_value = {'Targets': []}
+
+        results = self.explorer.match_events('default', [
+            {'Source': 'orders', 'DetailType': 'Order Placed', 'Detail': '{"total": 250}'},
+            {'source': 'orders', 'detail-type': 'Order Placed', 'detail': {'total': 5}},
+            {'source': 'billing', 'detail': {}},
+        ])
+
+        self.assertEqual(results, [['orders', 'big-orders'], ['orders'], []])
+        self.assertIs(self.explorer.get_routing_index('default'), self.explorer.get_routing_index('default'))
+        self.mock_eventbridge_client.test_event_pattern.assert_not_called()
+
+    def test_route_events_returns_targets_and_timings(self):
+        """Test that routed events list the matching rules with their targets."""
+        paginator = MagicMock()
+        paginator.paginate.return_value = [{'Rules': [
+            {'Name': 'orders', 'State': 'ENABLED', 'EventPattern': '{"source": ["orders"]}'},
+        ]}]
+        self.mock_eventbridge_client.get_paginator.return_value = paginator
+        self.mock_eventbridge_client.list_targets_by_rule.return_value = {
+            'Targets': [{'Id': 'fn', 'Arn': 'arn:aws:lambda:us-east-1:123456789012:function:handler'}]
+        }
+
+        routed = self.explorer.route_events('default', [{'source': 'orders'}, 'not an event'])
+
+        self.assertEqual(routed['results'][0]['rules'], [{
+            'name': 'orders', 'state': 'ENABLED',
+            'targets': [{'id': 'fn', 'arn': 'arn:aws:lambda:us-east-1:123456789012:function:handler'}]
+        }])
+        self.assertIn('error', routed['results'][1])
+        self.assertIn('match_ms', routed['timings'])
+        self.assertEqual(routed['index']['indexed_rules'], 1)
+
+    def test_route_events_uses_the_index_of_its_snapshot(self):
+        """Test that a refresh between the snapshot and index lookups cannot mix two topologies."""
+        older = TopologySnapshot('default', [{'Name': 'orders', 'State': 'ENABLED',
+                                              'EventPattern': '{"source": ["orders"]}', 'Targets': []}])
+        newer = TopologySnapshot('default', [{'Name': 'orders-v2', 'State': 'ENABLED',
+                                              'EventPattern': '{"source": ["orders"]}', 'Targets': []}])
+
+        with patch.object(self.explorer, 'get_topology_snapshot', side_effect=[older, newer]):
+            routed = self.explorer.route_events('default', [{'source': 'orders'}])
+
+        self.assertEqual([rule['name'] for rule in routed['results'][0]['rules']], ['orders'])
+
+    def test_topology_snapshot_is_cached_until_refresh(self):
+        """Test that cached topology snapshots are reused until a refresh is forced."""
+        paginator = MagicMock()
+        paginator.paginate.return_value = [{'Rules': [{'Name': 'orders'}]}]
+        self.mock_eventbridge_client.get_paginator.return_value = paginator
+        self.mock_eventbridge_client.list_targets_by_rule.return_value = {'Targets': []}
+
+        first = self.explorer.get_topology_snapshot('default')
+        second = self.explorer.get_topology_snapshot('default')
+        self.assertIs(first, second)
+        self.assertEqual(paginator.paginate.call_count, 1)
+
+        refreshed = self.explorer.get_topology_snapshot('default', force_refresh=True)
+        self.assertEqual(paginator.paginate.call_count, 2)
+        self.assertIsNot(refreshed, first)
+        # Unchanged rules keep the same content hash
+        self.assertEqual(refreshed.etag, first.etag)
+
+    @patch.object(EventBridgeExplorer, '_refresh_in_background')
+    def test_cold_start_serves_stored_topology(self, mock_refresh):
+        """Test that a stored topology is served immediately and refreshed in the background."""
+        store = MagicMock()
+        store.load_snapshot.return_value = TopologySnapshot('default', [{'Name': 'stored-rule', 'Targets': []}])
+        self.explorer.inventory_store = store
+
+        snapshot = self.explorer.get_topology_snapshot('default')
+
+        self.assertEqual(snapshot.rule_names, ['stored-rule'])
+        store.load_snapshot.assert_called_once_with('123456789012', 'us-east-1', 'default')
+        mock_refresh.assert_called_once_with('default')
+        self.mock_eventbridge_client.get_paginator.assert_not_called()
+
+    def test_explorer_uses_shared_clients(self):
+        """Test that explorers share the registry's clients instead of building new ones."""
+        with patch('boto3.client') as mock_boto3_client:
+            other = EventBridgeExplorer()
+            mock_boto3_client.assert_not_called()
+        self.assertIs(other.eventbridge_client, self.mock_eventbridge_client)
+        self.assertIs(other.logs_client, self.mock_logs_client)
+
+    def test_concurrent_snapshots_for_different_buses_run_in_parallel(self):
+        """Test that crawls of different buses overlap and leave explorer state alone."""
+        barrier = threading.Barrier(2, timeout=5)
+
+        def paginate(EventBusName):
+            # Both crawls must be in flight at once to pass the barrier
+            barrier.wait()
+            return [{'Rules': [{'Name': f'{EventBusName}-rule'}]}]
+
+        self.mock_eventbridge_client.get_paginator.return_value.paginate.side_effect = paginate
+        self.mock_eventbridge_client.list_targets_by_rule.return_value = {'Targets': []}
+        self.explorer.selected_bus = 'default'
+        self.explorer.rules = [{'Name': 'selected-rule', 'Targets': []}]
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            orders, billing = executor.map(self.explorer.get_topology_snapshot, ['orders', 'billing'])
+
+        self.assertEqual(orders.rule_names, ['orders-rule'])
+        self.assertEqual(billing.rule_names, ['billing-rule'])
+        self.assertEqual(self.explorer.selected_bus, 'default')
+        self.assertEqual(self.explorer.rules, [{'Name': 'selected-rule', 'Targets': []}])
+
+    @patch('eventbridge.insights.time.sleep')
+    def test_fetch_rule_events_and_logs_batched(self, mock_sleep):
+        """Test that rule log groups share one Insights query and are split back by @log."""
+        self.mock_logs_client.describe_log_groups.return_value = {
+            'logGroups': [{'logGroupName': '/aws/events/orders'}, {'logGroupName': '/aws/events/billing'}]
+        }
+        self.mock_logs_client.start_query.return_value = {'queryId': 'q-1'}
+
+        def row(log_group, timestamp, message):
+            return [{'field': '@timestamp', 'value': timestamp}, {'field': '@message', 'value': message},
+                    {'field': '@log', 'value': f'123456789012:{log_group}'}]
+
+        self.mock_logs_client.get_query_results.return_value = {'status': 'Complete', 'results': [
+            row('/aws/events/orders', '2024-01-01 10:00:01.000', 'order placed'),
+            row('/aws/events/billing', '2024-01-01 10:00:00.000', 'invoice sent'),
+        ]}
+        rules = [
+            {'Name': 'orders', 'EventPattern': '{"source": ["orders"]}'},
+            {'Name': 'billing'},
+            {'Name': 'missing'},
+        ]
+
+        result = self.explorer.fetch_rule_events_and_logs(rules, 'default', batched=True)
+
+        self.mock_logs_client.start_query.assert_called_once()
+        self.assertEqual(sorted(self.mock_logs_client.start_query.call_args.kwargs['logGroupNames']),
+                         ['/aws/events/billing', '/aws/events/orders'])
+        self.mock_eventbridge_client.describe_rule.assert_not_called()
+        self.assertEqual(result['logs']['orders'], '2024-01-01 10:00:01.000: order placed')
+        self.assertEqual(result['logs']['billing'], '2024-01-01 10:00:00.000: invoice sent')
+        self.assertIn('does not exist', result['logs']['missing'])
+        self.assertIn('{"source": ["orders"]}', result['payloads']['orders'])
+        self.assertEqual(result['payloads']['billing'], 'No event pattern defined for this rule.')
+
+    def test_fetch_stream_log_page_walks_backward(self):
+        """Test that stream pages are walked with tokens and empty pages are stepped over."""
+        self.mock_logs_client.get_log_events.side_effect = [
+            {'events': [{'timestamp': 2000, 'message': 'newest'}],
+             'nextForwardToken': 'f/2', 'nextBackwardToken': 'b/1'},
+            {'events': [], 'nextForwardToken': 'f/1', 'nextBackwardToken': 'b/0'},
+            {'events': [{'timestamp': 1000, 'message': 'oldest'}],
+             'nextForwardToken': 'f/1', 'nextBackwardToken': 'b/-1'},
+            {'events': [], 'nextForwardToken': 'f/0', 'nextBackwardToken': 'b/-1'},
+        ]
+
+        first = self.explorer.fetch_stream_log_page('/aws/lambda/orders', 'stream-1', limit=1)
+        second = self.explorer.fetch_stream_log_page('/aws/lambda/orders', 'stream-1', limit=1,
+                                                     token=first['prevToken'])
+        last = self.explorer.fetch_stream_log_page('/aws/lambda/orders', 'stream-1', limit=1,
+                                                   token=second['prevToken'])
+
+        self.assertEqual([event['message'] for event in first['events']], ['newest'])
+        self.assertEqual(first['nextToken'], 'f/2')
+        self.assertEqual([event['message'] for event in second['events']], ['oldest'])
+        self.assertEqual(second['events'][0]['logStream'], 'stream-1')
+        self.assertEqual(last, {'events': [], 'nextToken': 'f/0', 'prevToken': None})
+        calls = self.mock_logs_client.get_log_events.call_args_list
+        self.assertFalse(calls[0].kwargs['startFromHead'])
+        self.assertEqual(calls[2].kwargs['nextToken'], 'b/0')
+
+    def test_fetch_stream_log_page_forward_token_uses_start_from_head(self):
+        """Test that forward tokens are sent with startFromHead and stop at the end of the stream."""
+        self.mock_logs_client.get_log_events.return_value = {
+            'events': [], 'nextForwardToken': 'f/5', 'nextBackwardToken': 'b/5'}
+
+        page = self.explorer.fetch_stream_log_page('/aws/lambda/orders', 'stream-1', token='f/5')
+
+        self.assertIsNone(page['nextToken'])
+        self.mock_logs_client.get_log_events.assert_called_once()
+        self.assertTrue(self.mock_logs_client.get_log_events.call_args.kwargs['startFromHead'])
+
+    @patch('eventbridge.insights.time.sleep')
+    def test_fetch_target_logs_refined_search_uses_local_index(self, mock_sleep):
+        """Test that narrowing a complete search is answered without another Insights query."""
+        self.mock_logs_client.describe_log_groups.return_value = {
+            'logGroups': [{'logGroupName': '/aws/lambda/orders', 'storedBytes': 1024}]
+        }
+        self.mock_logs_client.start_query.return_value = {'queryId': 'q-1'}
+        self.mock_logs_client.get_query_results.return_value = {'status': 'Complete', 'results': [
+            [{'field': '@timestamp', 'value': '2024-01-01 10:00:02.000'}, {'field': '@message', 'value': 'Error: timeout'}],
+            [{'field': '@timestamp', 'value': '2024-01-01 10:00:01.000'}, {'field': '@message', 'value': 'retrying err'}],
+        ]}
+        arn = 'arn:aws:lambda:us-east-1:123456789012:function:orders'
+        start, end = 1704067200, 1704153600
+
+        first = self.explorer.fetch_target_logs(arn, limit=10, start_time=start, end_time=end, search_term='err')
+        second = self.explorer.fetch_target_logs(arn, limit=10, start_time=start, end_time=end, search_term='ERROR')
+
+        self.mock_logs_client.start_query.assert_called_once()
+        self.assertIn("filter @message like /(?i)(err)/", self.mock_logs_client.start_query.call_args.kwargs['queryString'])
+        self.assertEqual(first['metadata']['source'], 'insights')
+        self.assertEqual(second['metadata']['source'], 'index')
+        self.assertEqual([log['message'] for log in second['logs']], ['Error: timeout'])
+        self.assertEqual(second['logs'][0]['matches'], [{'start': 0, 'end': 5}])
+
+    def test_fetch_target_logs_short_window_uses_filter_log_events(self):
+        """Test that a five-minute search is answered by FilterLogEvents without an Insights query."""
+        self.mock_logs_client.describe_log_groups.return_value = {
+            'logGroups': [{'logGroupName': '/aws/lambda/orders', 'storedBytes': 50 * 1024 * 1024,
+                           'retentionInDays': 14}]
+        }
+        self.mock_logs_client.filter_log_events.return_value = {'events': [
+            {'timestamp': 1704067230000, 'message': 'Error: timeout', 'logStreamName': 'stream-1'},
+            {'timestamp': 1704067260000, 'message': 'ok', 'logStreamName': 'stream-1'},
+        ]}
+        arn = 'arn:aws:lambda:us-east-1:123456789012:function:orders'
+
+        result = self.explorer.fetch_target_logs(arn, limit=10, start_time=1704067200, end_time=1704067500,
+                                                 search_term='error')
+
+        self.mock_logs_client.start_query.assert_not_called()
+        self.assertEqual(result['metadata']['engine'], 'filter_log_events')
+        self.assertEqual([log['message'] for log in result['logs']], ['Error: timeout'])
+        self.assertEqual(result['logs'][0]['matches'], [{'start': 0, 'end': 5}])
+        self.assertEqual(self.explorer.engine_selector.get_stats()['filter_log_events']['searches'], 1)
+
 
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
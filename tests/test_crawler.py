@@ -0,0 +1,67 @@
+"""
+Tests for the account crawler.
+"""
+
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+
+from eventbridge.crawler import AccountCrawler
+
+
+class TestAccountCrawler(unittest.TestCase):
+    """Test cases for the AccountCrawler class."""
+
+    def setUp(self):
+        """Set up a mock EventBridge client with paginated buses."""
+        self.client = MagicMock()
+        self.client.list_event_buses.side_effect = [
+            {'EventBuses': [{'Name': 'default'}, {'Name': 'orders'}], 'NextToken': 'page-2'},
+            {'EventBuses': [{'Name': 'billing'}]},
+        ]
+
+        def paginate(EventBusName):
+            return [{'Rules': [{'Name': f'{EventBusName}-rule-{i}'} for i in range(5)]}]
+
+        self.client.get_paginator.return_value.paginate.side_effect = paginate
+
+    def test_list_event_buses_follows_next_token(self):
+        """Test that every page of event buses is returned."""
+        buses = AccountCrawler(self.client).list_event_buses()
+
+        self.assertEqual([bus['Name'] for bus in buses], ['default', 'orders', 'billing'])
+        self.client.list_event_buses.assert_called_with(NextToken='page-2')
+
+    def test_crawl_respects_shared_limit_and_reports_progress(self):
+        """Test that all buses are crawled without exceeding max_in_flight calls."""
+        lock = threading.Lock()
+        state = {'in_flight': 0, 'peak': 0}
+
+        def list_targets_by_rule(Rule, EventBusName):
+            with lock:
+                state['in_flight'] += 1
+                state['peak'] = max(state['peak'], state['in_flight'])
+            time.sleep(0.01)
+            with lock:
+                state['in_flight'] -= 1
+            if Rule == 'orders-rule-2':
+                raise Exception('boom')
+            return {'Targets': [{'Id': Rule}]}
+
+        self.client.list_targets_by_rule.side_effect = list_targets_by_rule
+        progress = []
+
+        inventory = AccountCrawler(self.client, max_in_flight=3, progress_callback=progress.append).crawl()
+
+        self.assertEqual(sorted(inventory.snapshots), ['billing', 'default', 'orders'])
+        self.assertEqual(inventory.rule_count, 15)
+        self.assertEqual(inventory.snapshots['orders'].get_targets('orders-rule-2'), ())
+        self.assertLessEqual(state['peak'], 3)
+        self.assertEqual(len(progress), 3)
+        self.assertEqual(progress[-1]['completed'], 3)
+        self.assertEqual(set(inventory.timings), {'billing', 'default', 'orders'})
+
+
+if __name__ == '__main__':
+    unittest.main()
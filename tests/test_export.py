@@ -0,0 +1,111 @@
+"""
+Tests for the bulk log exporter.
+"""
+
+import datetime
+import gzip
+import json
+import os
+import tempfile
+import unittest
+
+from eventbridge.export import LogExporter, export_to_file
+
+GROUP = '/aws/lambda/orders'
+
+
+class FakeRunner:
+    """Query runner answering from a list of event timestamps like Logs Insights would."""
+
+    def __init__(self, timestamps, fail_ranges=()):
+        self.timestamps = sorted(timestamps)
+        self.fail_ranges = set(fail_ranges)
+        self.calls = []
+
+    def run(self, logs_client, query_string, start_time, end_time, log_group_name=None, limit=None,
+            timeout=None, cancel_event=None):
+        self.calls.append((start_time, end_time))
+        if (start_time, end_time) in self.fail_ranges:
+            return {'status': 'Failed', 'results': [], 'partial': True, 'error': 'boom'}
+        # Both ends are inclusive at second granularity
+        matching = [ts for ts in self.timestamps if start_time <= ts < end_time + 1][:limit]
+        rows = [[{'field': '@timestamp', 'value': datetime.datetime.fromtimestamp(
+                    ts, datetime.timezone.utc).strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]},
+                 {'field': '@message', 'value': f'event at {ts}'},
+                 {'field': '@ptr', 'value': 'ptr'}] for ts in matching]
+        return {'status': 'Complete', 'results': rows, 'partial': False}
+
+
+def read_records(data):
+    """Decompress concatenated gzip members into NDJSON records."""
+    return [json.loads(line) for line in gzip.decompress(data).decode('utf-8').splitlines()]
+
+
+class TestLogExporter(unittest.TestCase):
+    """Test cases for the LogExporter class."""
+
+    def setUp(self):
+        """Set up an uneven range: a burst of dense seconds between sparse ones."""
+        self.timestamps = [1000 + second * 10 for second in range(100)]
+        self.timestamps += [1501 + offset / 40 for offset in range(200)]
+        self.expected = sorted(self.timestamps)
+
+    def test_dense_slices_are_split_until_under_the_cap(self):
+        """Test that every row is exported exactly once, oldest first, despite the row cap."""
+        runner = FakeRunner(self.timestamps)
+        exporter = LogExporter(runner, None, GROUP, max_workers=3, row_cap=50)
+
+        records = read_records(b''.join(exporter.export(1000, 2000)))
+
+        self.assertEqual([record['epochMillis'] / 1000 for record in records], self.expected)
+        self.assertNotIn('ptr', records[0])
+        self.assertEqual(records[0]['message'], 'event at 1000')
+        self.assertGreater(exporter.stats['splits'], 0)
+        self.assertEqual(exporter.stats['rows'], len(self.expected))
+        self.assertEqual(exporter.stats['truncated_slices'], 0)
+
+    def test_checkpoint_advances_per_member(self):
+        """Test that checkpoints count the bytes and rows handed out so far."""
+        checkpoints = []
+        exporter = LogExporter(FakeRunner(self.timestamps), None, GROUP, max_workers=2, row_cap=50)
+
+        data = b''.join(exporter.export(1000, 2000, on_checkpoint=checkpoints.append))
+
+        self.assertEqual(checkpoints[-1]['bytes'], len(data))
+        self.assertEqual(checkpoints[-1]['cursor'], 2000)
+        self.assertEqual([checkpoint['cursor'] for checkpoint in checkpoints],
+                         sorted(checkpoint['cursor'] for checkpoint in checkpoints))
+
+    def test_interrupted_file_export_resumes(self):
+        """Test that a failed export continues from its checkpoint without duplicates."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'orders.ndjson.gz')
+            failing = LogExporter(FakeRunner(self.timestamps, fail_ranges={(1750, 2000)}), None, GROUP,
+                                  max_workers=4, row_cap=1000)
+            with self.assertRaises(RuntimeError):
+                export_to_file(failing, 1000, 2000, path)
+            self.assertTrue(os.path.exists(path + '.checkpoint'))
+
+            runner = FakeRunner(self.timestamps)
+            result = export_to_file(LogExporter(runner, None, GROUP, max_workers=4, row_cap=1000), 1000, 2000, path)
+
+            self.assertTrue(result['success'])
+            self.assertTrue(result['resumed'])
+            self.assertTrue(all(start >= 1750 for start, _ in runner.calls))
+            self.assertFalse(os.path.exists(path + '.checkpoint'))
+            with open(path, 'rb') as f:
+                records = read_records(f.read())
+            self.assertEqual([record['epochMillis'] / 1000 for record in records], self.expected)
+
+    def test_checkpoint_of_another_export_is_rejected(self):
+        """Test that a checkpoint for a different range is not resumed."""
+        exporter = LogExporter(FakeRunner(self.timestamps), None, GROUP)
+        checkpoint = {'log_group': GROUP, 'query': exporter.query, 'start_time': 0, 'end_time': 10,
+                      'cursor': 5, 'rows': 1, 'bytes': 10}
+
+        with self.assertRaises(ValueError):
+            list(exporter.export(1000, 2000, checkpoint=checkpoint))
+
+
+if __name__ == '__main__':
+    unittest.main()
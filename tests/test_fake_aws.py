@@ -0,0 +1,166 @@
+"""
+Tests for the in-process fake AWS backend.
+"""
+
+import json
+import time
+import unittest
+from unittest.mock import patch
+
+from botocore.exceptions import ClientError
+
+from eventbridge import clients
+from eventbridge.core import EventBridgeExplorer
+from eventbridge.crawler import AccountCrawler
+from eventbridge.fake_aws import FakeAWSBackend, parse_query
+from eventbridge.publisher import EventPublisher
+
+FUNCTION_ARN = 'arn:aws:lambda:us-east-1:123456789012:function:fn-1'
+
+
+class TestFakeAWSBackend(unittest.TestCase):
+    """Test cases for the fake backend's API behaviour."""
+
+    def setUp(self):
+        """Set up a small account with stored logs."""
+        self.backend = FakeAWSBackend(page_sizes={'list_rules': 2, 'filter_log_events': 3, 'get_log_events': 2})
+        self.backend.add_rule('default', 'orders', {'source': ['orders']}, ['arn:aws:sqs:us-east-1:1:queue'])
+        self.backend.add_log_events('/aws/lambda/app', 'a', [(1000, 'INFO one'), (3000, 'ERROR three')])
+        self.backend.add_log_events('/aws/lambda/app', 'b', [(2000, 'ERROR two'), (4000, 'INFO four')])
+        self.logs = self.backend.client('logs')
+
+    def test_filter_log_events_merges_streams_across_pages(self):
+        """Test that events come back in time order, paged by nextToken and filtered by terms."""
+        first = self.logs.filter_log_events(logGroupName='/aws/lambda/app', startTime=0, endTime=5000)
+        second = self.logs.filter_log_events(logGroupName='/aws/lambda/app', startTime=0, endTime=5000,
+                                             nextToken=first['nextToken'])
+        errors = self.logs.filter_log_events(logGroupName='/aws/lambda/app', filterPattern='ERROR')
+
+        self.assertEqual([event['message'] for event in first['events']], ['INFO one', 'ERROR two', 'ERROR three'])
+        self.assertEqual([event['message'] for event in second['events']], ['INFO four'])
+        self.assertNotIn('nextToken', second)
+        self.assertEqual([event['timestamp'] for event in errors['events']], [2000, 3000])
+
+    def test_get_log_events_tokens(self):
+        """Test that backward tokens walk to older events and forward tokens stay put at the end."""
+        newest = self.logs.get_log_events(logGroupName='/aws/lambda/app', logStreamName='a', limit=1)
+        older = self.logs.get_log_events(logGroupName='/aws/lambda/app', logStreamName='a',
+                                         nextToken=newest['nextBackwardToken'])
+
+        self.assertEqual([event['message'] for event in newest['events']], ['ERROR three'])
+        self.assertEqual([event['message'] for event in older['events']], ['INFO one'])
+        self.assertEqual(newest['nextForwardToken'], 'f/2')
+
+    def test_insights_query_lifecycle(self):
+        """Test that queries run for the query latency, honour the concurrency cap and can be stopped."""
+        self.backend.query_latency = 60
+        self.backend.max_concurrent_queries = 1
+        query = 'fields @timestamp, @message | filter @message like /(?i)(error)/ | sort @timestamp asc | limit 5'
+        query_id = self.logs.start_query(logGroupName='/aws/lambda/app', queryString=query,
+                                         startTime=0, endTime=10)['queryId']
+
+        self.assertEqual(self.logs.get_query_results(queryId=query_id)['status'], 'Running')
+        with self.assertRaises(ClientError) as context:
+            self.logs.start_query(logGroupName='/aws/lambda/app', queryString=query, startTime=0, endTime=10)
+        self.assertEqual(context.exception.response['Error']['Code'], 'LimitExceededException')
+        self.logs.stop_query(queryId=query_id)
+        self.assertEqual(self.logs.get_query_results(queryId=query_id)['status'], 'Cancelled')
+
+        self.backend.query_latency = 0
+        query_id = self.logs.start_query(logGroupName='/aws/lambda/app', queryString=query,
+                                         startTime=0, endTime=10)['queryId']
+        results = self.logs.get_query_results(queryId=query_id)
+        self.assertEqual(results['status'], 'Complete')
+        self.assertEqual([[field['value'] for field in row[:2]] for row in results['results']],
+                         [['1970-01-01 00:00:02.000', 'ERROR two'], ['1970-01-01 00:00:03.000', 'ERROR three']])
+        with self.assertRaises(ValueError):
+            parse_query('stats count(*) by bin(5m)')
+
+    def test_throttling_and_paginated_rules(self):
+        """Test that configured operations are throttled and paginators follow NextToken."""
+        for number in range(4):
+            self.backend.add_rule('default', f'extra-{number}', {'source': ['x']})
+        self.backend.throttle_probability = {'describe_rule': 1.0}
+        events = self.backend.client('events')
+
+        pages = list(events.get_paginator('list_rules').paginate(EventBusName='default'))
+        with self.assertRaises(ClientError) as context:
+            events.describe_rule(Name='orders')
+
+        self.assertEqual([len(page['Rules']) for page in pages], [2, 2, 1])
+        self.assertEqual(context.exception.response['Error']['Code'], 'ThrottlingException')
+        self.assertEqual(self.backend.get_stats()['throttled'], {'describe_rule': 1})
+
+    def test_put_events_routes_to_rule_log_groups(self):
+        """Test that published events are validated, routed and delivered to rule log groups."""
+        self.backend.add_log_group('/aws/events/orders')
+        publisher = EventPublisher(self.backend.client('events'), max_workers=2)
+
+        report = publisher.publish([{'source': 'orders', 'detail': {'n': number}} for number in range(15)]
+                                   + [{'source': 'billing', 'detail': {}}, '{"Source": "x", "DetailType": "y", "Detail": "[1]"}'])
+        pages = self.logs.get_paginator('filter_log_events').paginate(logGroupName='/aws/events/orders')
+        delivered = [event for page in pages for event in page['events']]
+
+        self.assertEqual(report['published'], 16)
+        self.assertEqual(report['errors'], {'MalformedDetail': 1})
+        self.assertEqual(len(delivered), 15)
+        self.assertEqual(json.loads(delivered[0]['message'])['source'], 'orders')
+        self.assertEqual(self.backend.get_stats()['deliveries'], 15)
+
+
+class TestExplorerAgainstFakeAWS(unittest.TestCase):
+    """Test cases running the explorer offline against a synthetic account."""
+
+    def setUp(self):
+        """Install a synthetic account into the shared client registry."""
+        self.backend = FakeAWSBackend.synthetic(rules=10000, functions=20, hours=2,
+                                                page_sizes={'list_rules': 25},
+                                                throttle_probability={'list_targets_by_rule': 0.05})
+        self.backend.install(clients.registry)
+        self.explorer = EventBridgeExplorer(max_in_flight=8, cache_ttl=0)
+
+    def tearDown(self):
+        """Give the shared client registry back to boto3."""
+        clients.registry.client_factory = None
+        clients.registry.clear()
+
+    @patch('eventbridge.retry.time.sleep')
+    def test_crawl_of_ten_thousand_rules_survives_throttling(self, mock_sleep):
+        """Test that every rule and target of a 10k-rule account is crawled despite throttled calls."""
+        started = time.monotonic()
+        inventory = AccountCrawler(self.backend.client('events'), max_in_flight=8).crawl()
+        elapsed = time.monotonic() - started
+
+        rules = [rule for snapshot in inventory.snapshots.values() for rule in snapshot.rules]
+        self.assertEqual(inventory.errors, {})
+        self.assertEqual(len(rules), 10000)
+        self.assertEqual(sum(len(rule['Targets']) for rule in rules), 12000)
+        self.assertTrue(self.backend.get_stats()['throttled'])
+        self.assertLess(elapsed, 60)
+
+    def test_log_engines_return_the_same_rows(self):
+        """Test that FilterLogEvents and Logs Insights searches over synthetic logs agree."""
+        now = int(time.time())
+        results = [self.explorer.fetch_target_logs(FUNCTION_ARN, limit=20, start_time=now - 3600, end_time=now,
+                                                   search_term='Failed', engine=engine)
+                   for engine in ('filter_log_events', 'insights')]
+
+        for result in results:
+            self.assertTrue(result['success'], result.get('message'))
+        self.assertEqual(len(results[0]['logs']), 20)
+        self.assertEqual([log['message'] for log in results[0]['logs']],
+                         [log['message'] for log in results[1]['logs']])
+
+    def test_stream_pages_walk_backwards(self):
+        """Test that stream pages of a live synthetic stream chain without gaps."""
+        stream = self.backend.client('logs').describe_log_streams(logGroupName='/aws/lambda/fn-1')['logStreams'][0]
+        newest = self.explorer.fetch_stream_log_page('/aws/lambda/fn-1', stream['logStreamName'], limit=50)
+        older = self.explorer.fetch_stream_log_page('/aws/lambda/fn-1', stream['logStreamName'], limit=50,
+                                                    token=newest['prevToken'])
+
+        self.assertEqual(len(newest['events']), 50)
+        self.assertLess(older['events'][-1]['timestamp'], newest['events'][0]['timestamp'])
+
+
+if __name__ == '__main__':
+    unittest.main()
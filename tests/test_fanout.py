@@ -0,0 +1,65 @@
+"""
+Tests for the multi-region fan-out engine.
+"""
+
+import unittest
+from unittest.mock import MagicMock
+
+from eventbridge.clients import ClientRegistry
+from eventbridge.fanout import FanoutEngine, parse_crawl_targets
+
+
+class TestFanoutEngine(unittest.TestCase):
+    """Test cases for the FanoutEngine class."""
+
+    def make_session(self, profile_name=None):
+        """Build a fake session whose EventBridge clients serve one bus per region."""
+        account = {'prod': '111111111111', 'dev': '222222222222'}[profile_name]
+
+        def make_client(service, region_name=None, config=None):
+            client = MagicMock()
+            client.meta.region_name = region_name
+            if region_name == 'ap-south-1':
+                client.list_event_buses.side_effect = Exception('region disabled')
+            client.list_event_buses.return_value = {'EventBuses': [
+                {'Name': 'default', 'Arn': f'arn:aws:events:{region_name}:{account}:event-bus/default'}
+            ]}
+            client.get_paginator.return_value.paginate.return_value = [{'Rules': [{'Name': 'orders'}]}]
+            client.list_targets_by_rule.return_value = {'Targets': []}
+            return client
+
+        session = MagicMock()
+        session.client.side_effect = make_client
+        return session
+
+    def test_parse_crawl_targets(self):
+        """Test parsing of profile:region lists."""
+        self.assertEqual(parse_crawl_targets('prod:us-east-1, :eu-west-1,dev:,us-west-2'), [
+            ('prod', 'us-east-1'), (None, 'eu-west-1'), ('dev', None), (None, 'us-west-2')
+        ])
+
+    def test_crawl_merges_targets_by_account_and_region(self):
+        """Test that targets are crawled independently and merged with tags."""
+        registry = ClientRegistry(session_factory=self.make_session)
+        engine = FanoutEngine([('prod', 'us-east-1'), ('prod', 'eu-west-1'), ('dev', 'us-east-1'),
+                               ('prod', 'ap-south-1')], registry=registry)
+
+        merged = engine.crawl()
+
+        self.assertEqual(set(merged.inventories), {
+            ('111111111111', 'us-east-1'), ('111111111111', 'eu-west-1'), ('222222222222', 'us-east-1')
+        })
+        self.assertEqual(len(merged.errors), 1)
+        self.assertEqual(merged.errors[0]['region'], 'ap-south-1')
+        tags = {(rule['Account'], rule['Region'], rule['EventBusName']) for rule in merged.rules()}
+        self.assertIn(('222222222222', 'us-east-1', 'default'), tags)
+        self.assertEqual(len(merged.rules()), 3)
+        # One client per service, region and profile
+        self.assertIsNot(registry.get_client('events', 'us-east-1', 'prod'),
+                         registry.get_client('events', 'us-east-1', 'dev'))
+        self.assertIs(registry.get_client('events', 'us-east-1', 'prod'),
+                      registry.get_client('events', 'us-east-1', 'prod'))
+
+
+if __name__ == '__main__':
+    unittest.main()
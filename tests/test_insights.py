@@ -0,0 +1,180 @@
+"""
+Tests for the Logs Insights query runner.
+"""
+
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+
+from eventbridge.insights import InsightsQueryRunner, split_time_range
+
+HOUR = 3600
+
+
+def rows(*messages):
+    """Build Insights result rows for the given messages."""
+    return [[{'field': '@message', 'value': message}] for message in messages]
+
+
+class FakeLogsClient:
+    """Logs client answering queries from rows one per hour, with older hours answering slower."""
+
+    def __init__(self, end_time):
+        self.end_time = end_time
+        self.lock = threading.Lock()
+        self.queries = {}
+        self.stopped = []
+
+    def start_query(self, queryString, startTime, endTime, logGroupName=None, **kwargs):
+        with self.lock:
+            query_id = f'query-{len(self.queries)}'
+            self.queries[query_id] = (startTime, endTime, time.monotonic())
+        return {'queryId': query_id}
+
+    def get_query_results(self, queryId):
+        start, end, started = self.queries[queryId]
+        # A slice ending one hour further back takes another 20ms
+        if time.monotonic() - started < 0.02 * (self.end_time - end) / HOUR:
+            return {'status': 'Running', 'results': []}
+        stamps = [stamp for stamp in range(self.end_time, self.end_time - 48 * HOUR, -HOUR) if start <= stamp <= end]
+        results = [[{'field': '@timestamp', 'value': time.strftime('%Y-%m-%d %H:%M:%S.000', time.gmtime(stamp))}]
+                   for stamp in stamps]
+        return {'status': 'Complete', 'results': results}
+
+    def stop_query(self, queryId):
+        self.stopped.append(queryId)
+
+
+class TestInsightsQueryRunner(unittest.TestCase):
+    """Test cases for the InsightsQueryRunner class."""
+
+    def setUp(self):
+        """Set up a mock CloudWatch Logs client."""
+        self.client = MagicMock()
+        self.client.start_query.return_value = {'queryId': 'query-1'}
+
+    def test_poll_schedule_backs_off_to_maximum(self):
+        """Test that the poll delay grows exponentially up to the maximum."""
+        runner = InsightsQueryRunner(initial_poll_interval=0.1, max_poll_interval=0.5, poll_backoff=2.0)
+        schedule = runner.poll_schedule()
+
+        self.assertEqual([next(schedule) for _ in range(5)], [0.1, 0.2, 0.4, 0.5, 0.5])
+
+    def test_run_returns_complete_results(self):
+        """Test that a query is polled until it completes."""
+        self.client.get_query_results.side_effect = [
+            {'status': 'Scheduled', 'results': []},
+            {'status': 'Running', 'results': rows('first')},
+            {'status': 'Complete', 'results': rows('first', 'second'), 'statistics': {'recordsMatched': 2}},
+        ]
+        runner = InsightsQueryRunner(initial_poll_interval=0.001, max_poll_interval=0.001)
+
+        result = runner.run(self.client, 'fields @message', 0, 60, log_group_names=['/aws/lambda/a'], limit=5)
+
+        self.assertEqual(result['status'], 'Complete')
+        self.assertFalse(result['partial'])
+        self.assertEqual(len(result['results']), 2)
+        self.assertEqual(result['statistics'], {'recordsMatched': 2})
+        self.client.start_query.assert_called_once_with(
+            queryString='fields @message', startTime=0, endTime=60,
+            logGroupNames=['/aws/lambda/a'], limit=5)
+        self.client.stop_query.assert_not_called()
+        self.assertEqual(runner.stats['completed'], 1)
+
+    def test_timeout_stops_query_and_returns_partial_results(self):
+        """Test that a query past its deadline is stopped and keeps its rows so far."""
+        self.client.get_query_results.return_value = {'status': 'Running', 'results': rows('early')}
+        runner = InsightsQueryRunner(initial_poll_interval=0.01, max_poll_interval=0.01)
+
+        result = runner.run(self.client, 'fields @message', 0, 60, log_group_name='/aws/lambda/a', timeout=0.05)
+
+        self.assertEqual(result['status'], 'Timeout')
+        self.assertTrue(result['partial'])
+        self.assertEqual(result['results'], rows('early'))
+        self.client.stop_query.assert_called_once_with(queryId='query-1')
+        self.assertEqual(runner.stats['timed_out'], 1)
+
+    def test_cancel_event_stops_query(self):
+        """Test that setting the cancel event stops a running query."""
+        self.client.get_query_results.return_value = {'status': 'Running', 'results': []}
+        runner = InsightsQueryRunner(initial_poll_interval=0.01, max_poll_interval=0.01)
+        cancel_event = threading.Event()
+        threading.Timer(0.05, cancel_event.set).start()
+
+        result = runner.run(self.client, 'fields @message', 0, 60, log_group_name='/aws/lambda/a',
+                            timeout=5, cancel_event=cancel_event)
+
+        self.assertEqual(result['status'], 'Cancelled')
+        self.assertLess(result['elapsed'], 1)
+        self.client.stop_query.assert_called_once_with(queryId='query-1')
+
+    def test_concurrency_is_capped(self):
+        """Test that no more than max_concurrent queries run at once."""
+        lock = threading.Lock()
+        state = {'running': 0, 'peak': 0, 'next_id': 0}
+
+        def start_query(**kwargs):
+            with lock:
+                state['running'] += 1
+                state['peak'] = max(state['peak'], state['running'])
+                state['next_id'] += 1
+                return {'queryId': f"query-{state['next_id']}"}
+
+        def get_query_results(queryId):
+            time.sleep(0.01)
+            with lock:
+                state['running'] -= 1
+            return {'status': 'Complete', 'results': []}
+
+        self.client.start_query.side_effect = start_query
+        self.client.get_query_results.side_effect = get_query_results
+        runner = InsightsQueryRunner(max_concurrent=2, initial_poll_interval=0.001)
+
+        threads = [threading.Thread(target=runner.run, args=(self.client, 'fields @message', 0, 60),
+                                    kwargs={'log_group_name': '/aws/lambda/a'}) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(state['peak'], 2)
+        self.assertEqual(runner.stats['completed'], 6)
+
+    def test_failed_start_is_reported(self):
+        """Test that a start_query error is returned as a failed result."""
+        self.client.start_query.side_effect = Exception('MalformedQueryException')
+        runner = InsightsQueryRunner()
+
+        result = runner.run(self.client, 'bad query', 0, 60, log_group_name='/aws/lambda/a')
+
+        self.assertEqual(result['status'], 'Failed')
+        self.assertIn('MalformedQueryException', result['error'])
+
+    def test_split_time_range_is_newest_first(self):
+        """Test that a range is split into contiguous slices, newest first."""
+        self.assertEqual(split_time_range(0, 4 * HOUR, 4), [(3 * HOUR, 4 * HOUR), (2 * HOUR, 3 * HOUR),
+                                                            (HOUR, 2 * HOUR), (0, HOUR)])
+        self.assertEqual(split_time_range(0, HOUR, 8), [(0, HOUR)])
+
+    def test_run_sharded_merges_newest_first_and_stops_early(self):
+        """Test that slices are merged in time order and older slices are cancelled at the limit."""
+        end = 1704067200
+        client = FakeLogsClient(end)
+        runner = InsightsQueryRunner(max_concurrent=4, initial_poll_interval=0.005, max_poll_interval=0.005)
+
+        result = runner.run_sharded(client, 'fields @timestamp | sort @timestamp desc | limit 5',
+                                    end - 24 * HOUR, end, 5, shards=8, log_group_name='/aws/lambda/a', timeout=5)
+
+        stamps = [row[0]['value'] for row in result['results']]
+        self.assertEqual(result['status'], 'Complete')
+        self.assertEqual(len(stamps), 5)
+        self.assertEqual(stamps, sorted(stamps, reverse=True))
+        self.assertEqual(len(set(stamps)), 5)
+        # The newest two slices of three hours hold enough rows; the rest are not waited for
+        self.assertEqual(len(result['shards']), 2)
+        self.assertLess(len(client.queries) - len(client.stopped), 8)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+"""
+Tests for the Logs Insights result cache.
+"""
+
+import datetime
+import unittest
+from unittest.mock import MagicMock
+
+from eventbridge.insights_cache import InsightsResultCache, normalize_query
+
+QUERY = "fields @timestamp, @message | sort @timestamp desc | limit 5"
+
+# 2024-01-01 00:00:00 UTC, a multiple of the 900 second bucket
+DAY = 1704067200
+
+
+def row(epoch, message):
+    """Build an Insights result row at the given epoch second."""
+    stamp = datetime.datetime.fromtimestamp(epoch, tz=datetime.timezone.utc).strftime('%Y-%m-%d %H:%M:%S.000')
+    return [{'field': '@timestamp', 'value': stamp}, {'field': '@message', 'value': message}]
+
+
+class FakeRunner:
+    """Query runner answering from a fixed list of log rows."""
+
+    def __init__(self, epochs):
+        self.epochs = sorted(epochs, reverse=True)
+        self.calls = []
+
+    def run(self, logs_client, query, start_time, end_time, log_group_name=None, **kwargs):
+        self.calls.append((start_time, end_time))
+        limit = int(query.rsplit('limit', 1)[1])
+        rows = [row(epoch, f'event {epoch}') for epoch in self.epochs if start_time <= epoch <= end_time]
+        return {'status': 'Complete', 'results': rows[:limit], 'partial': False, 'statistics': {},
+                'query_id': f'query-{len(self.calls)}', 'elapsed': 0.0}
+
+
+class TestInsightsResultCache(unittest.TestCase):
+    """Test cases for the InsightsResultCache class."""
+
+    def setUp(self):
+        """Set up a cache whose clock is four buckets into the day."""
+        self.now = DAY + 4 * 900 + 300
+        self.cache = InsightsResultCache(bucket_seconds=900, settle_seconds=60, clock=lambda: self.now)
+
+    def test_normalize_query_keeps_quoted_strings(self):
+        """Test that whitespace is collapsed everywhere except inside quotes."""
+        self.assertEqual(
+            normalize_query("fields @message\n  |filter @message like '%a  b%'|  limit 5 "),
+            "fields @message | filter @message like '%a  b%' | limit 5")
+
+    def test_split_marks_only_closed_whole_buckets_cacheable(self):
+        """Test that edge pieces and the open bucket are not cacheable."""
+        pieces = self.cache.split(DAY + 100, self.now)
+
+        self.assertEqual(pieces[0], (DAY + 3600, self.now, False))
+        self.assertEqual(pieces[-1], (DAY + 100, DAY + 900, False))
+        self.assertTrue(all(cacheable for _, _, cacheable in pieces[1:-1]))
+
+    def test_closed_buckets_are_served_from_cache(self):
+        """Test that a repeated query only fetches the open bucket."""
+        runner = FakeRunner([DAY + 50, DAY + 1000, DAY + 2000, DAY + 3700])
+
+        first = self.cache.run(runner, None, '/aws/lambda/a', QUERY, DAY, self.now, limit=5)
+        second = self.cache.run(runner, None, '/aws/lambda/a', QUERY, DAY, self.now, limit=5)
+
+        self.assertEqual(first['results'], second['results'])
+        self.assertEqual(len(second['results']), 4)
+        self.assertEqual(runner.calls, [(DAY, self.now), (DAY + 3600, self.now)])
+        self.assertEqual(second['cache'], {'hits': 4, 'queries': 1})
+        self.assertEqual(self.cache.get_stats()['hits'], 4)
+
+    def test_truncated_query_caches_only_complete_buckets(self):
+        """Test that buckets older than the oldest row of a full result are fetched again."""
+        epochs = [DAY + 10 * i for i in range(20)] + [DAY + 1000, DAY + 2000]
+        runner = FakeRunner(epochs)
+
+        first = self.cache.run(runner, None, '/aws/lambda/a', QUERY, DAY, self.now, limit=5)
+        # The first bucket lost rows to the limit, so it must not be cached
+        self.assertFalse(self.cache._peek(('/aws/lambda/a', normalize_query(QUERY), DAY)))
+        self.assertTrue(self.cache._peek(('/aws/lambda/a', normalize_query(QUERY), DAY + 900)))
+
+        self.now += 900
+        second = self.cache.run(runner, None, '/aws/lambda/a', QUERY, DAY, self.now, limit=5)
+        self.assertEqual(first['results'], second['results'])
+        self.assertEqual(runner.calls[-1], (DAY, DAY + 900))
+
+    def test_lru_eviction_respects_max_bytes(self):
+        """Test that the least recently used buckets are evicted beyond the size budget."""
+        runner = FakeRunner([DAY + 900 * i + 1 for i in range(4)])
+        cache = InsightsResultCache(bucket_seconds=900, settle_seconds=60, max_bytes=800,
+                                    clock=lambda: self.now)
+
+        cache.run(runner, None, '/aws/lambda/a', QUERY, DAY, self.now, limit=5)
+        stats = cache.get_stats()
+
+        self.assertLessEqual(stats['bytes'], 800)
+        self.assertGreater(stats['evictions'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
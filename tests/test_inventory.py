@@ -0,0 +1,58 @@
+"""
+Tests for the persistent inventory store.
+"""
+
+import os
+import tempfile
+import unittest
+
+from eventbridge.inventory import InventoryStore
+from eventbridge.topology import TopologySnapshot
+
+
+class TestInventoryStore(unittest.TestCase):
+    """Test cases for the InventoryStore class."""
+
+    def setUp(self):
+        """Set up a store in a temporary directory."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.store = InventoryStore(os.path.join(self.tmpdir.name, 'inventory.db'))
+
+    def tearDown(self):
+        """Close the store and remove the temporary directory."""
+        self.store.close()
+        self.tmpdir.cleanup()
+
+    def test_snapshot_round_trip_is_keyed_by_account_and_region(self):
+        """Test that snapshots are restored per account and region."""
+        snapshot = TopologySnapshot('orders-bus', [
+            {'Name': 'b-rule', 'EventPattern': '{"source": ["b"]}',
+             'Targets': [{'Id': 't2', 'Arn': 'arn:aws:sqs:us-east-1:111111111111:b'},
+                         {'Id': 't1', 'Arn': 'arn:aws:sqs:us-east-1:111111111111:a'}]},
+            {'Name': 'a-rule', 'Targets': []},
+        ])
+        self.store.save_snapshot('111111111111', 'us-east-1', snapshot)
+
+        restored = self.store.load_snapshot('111111111111', 'us-east-1', 'orders-bus')
+
+        self.assertEqual(restored.to_list(), snapshot.to_list())
+        self.assertEqual(restored.etag, snapshot.etag)
+        self.assertIsNone(self.store.load_snapshot('222222222222', 'us-east-1', 'orders-bus'))
+        self.assertIsNone(self.store.load_snapshot('111111111111', 'eu-west-1', 'orders-bus'))
+
+    def test_event_buses_and_log_groups_are_replaced(self):
+        """Test that saving buses and log groups replaces earlier rows."""
+        self.store.save_event_buses('111111111111', 'us-east-1', [{'Name': 'default'}, {'Name': 'old'}])
+        self.store.save_event_buses('111111111111', 'us-east-1', [{'Name': 'default'}])
+        self.assertEqual(self.store.load_event_buses('111111111111', 'us-east-1'), [{'Name': 'default'}])
+
+        self.store.save_log_groups('111111111111', 'us-east-1', [
+            {'logGroupName': '/aws/lambda/fn', 'storedBytes': 42, 'retentionInDays': 7},
+        ])
+        log_groups, fetched_at = self.store.load_log_groups('111111111111', 'us-east-1')
+        self.assertEqual(log_groups[0]['storedBytes'], 42)
+        self.assertIsNotNone(fetched_at)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+"""
+Tests for the log group catalog.
+"""
+
+import unittest
+from unittest.mock import MagicMock
+
+from eventbridge.inventory import InventoryStore
+from eventbridge.log_catalog import LogGroupCatalog
+
+KEY = ('123456789012', 'us-east-1')
+
+
+class TestLogGroupCatalog(unittest.TestCase):
+    """Test cases for the LogGroupCatalog class."""
+
+    def setUp(self):
+        """Set up a mock CloudWatch Logs client with two pages of log groups."""
+        self.pages = {
+            None: {'logGroups': [{'logGroupName': '/aws/lambda/orders', 'storedBytes': 10},
+                                 {'logGroupName': '/aws/events/orders'}], 'nextToken': 'page-2'},
+            'page-2': {'logGroups': [{'logGroupName': '/aws/lambda/orders-v2', 'retentionInDays': 7},
+                                     {'logGroupName': '/aws/events/billing'}]},
+        }
+        self.client = MagicMock()
+        self.client.describe_log_groups.side_effect = self.describe
+
+    def describe(self, logGroupNamePrefix=None, nextToken=None):
+        """Answer describe_log_groups from the pages, filtered by prefix."""
+        page = self.pages[nextToken]
+        groups = [group for group in page['logGroups']
+                  if not logGroupNamePrefix or group['logGroupName'].startswith(logGroupNamePrefix)]
+        return {'logGroups': groups, **({'nextToken': page['nextToken']} if 'nextToken' in page else {})}
+
+    def test_refresh_pages_through_all_groups(self):
+        """Test that a group on the second page is found without further calls."""
+        catalog = LogGroupCatalog(self.client)
+        catalog.refresh()
+        calls = self.client.describe_log_groups.call_count
+
+        self.assertEqual(len(catalog), 4)
+        self.assertEqual(catalog.retention_days('/aws/lambda/orders-v2'), 7)
+        self.assertEqual(catalog.stored_bytes('/aws/lambda/orders'), 10)
+        self.assertEqual(catalog.names_with_prefix('/aws/events/'), ['/aws/events/billing', '/aws/events/orders'])
+        self.assertEqual(self.client.describe_log_groups.call_count, calls)
+
+    def test_miss_is_rechecked_once_per_ttl(self):
+        """Test that a missing group is checked with AWS and the answer is remembered."""
+        catalog = LogGroupCatalog(self.client, miss_ttl=60)
+        catalog.refresh()
+        calls = self.client.describe_log_groups.call_count
+
+        self.assertFalse(catalog.exists('/aws/lambda/missing'))
+        self.assertGreater(self.client.describe_log_groups.call_count, calls)
+        self.client.describe_log_groups.assert_called_with(logGroupNamePrefix='/aws/lambda/missing',
+                                                           nextToken='page-2')
+        calls = self.client.describe_log_groups.call_count
+
+        self.assertFalse(catalog.exists('/aws/lambda/missing'))
+        self.assertEqual(self.client.describe_log_groups.call_count, calls)
+
+    def test_new_group_is_merged_on_miss(self):
+        """Test that a group created after the refresh is found and indexed."""
+        catalog = LogGroupCatalog(self.client)
+        catalog.refresh()
+        self.pages['page-2']['logGroups'].append({'logGroupName': '/aws/lambda/payments'})
+
+        self.assertTrue(catalog.exists('/aws/lambda/payments'))
+        self.assertIn('/aws/lambda/payments', catalog.names_with_prefix('/aws/lambda/'))
+        self.assertEqual(len(catalog), 5)
+
+    def test_starts_from_inventory_store(self):
+        """Test that a stored catalog answers lookups without AWS calls."""
+        store = InventoryStore(':memory:')
+        LogGroupCatalog(self.client, store=store, inventory_key=KEY).refresh()
+        self.client.describe_log_groups.reset_mock()
+
+        catalog = LogGroupCatalog(self.client, store=store, inventory_key=KEY)
+
+        self.assertTrue(catalog.loaded)
+        self.assertTrue(catalog.exists('/aws/events/billing'))
+        self.client.describe_log_groups.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
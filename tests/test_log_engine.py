@@ -0,0 +1,78 @@
+"""
+Tests for the log retrieval engine selector.
+"""
+
+import unittest
+from unittest.mock import MagicMock
+
+from eventbridge.log_engine import ENGINE_FILTER, ENGINE_INSIGHTS, LogEngineSelector
+from eventbridge.search import compile_search
+
+MB = 1024 * 1024
+
+
+def event(timestamp, message, stream='stream-1'):
+    """Build a filter_log_events event."""
+    return {'eventId': str(timestamp), 'timestamp': timestamp, 'message': message, 'logStreamName': stream}
+
+
+class TestLogEngineSelector(unittest.TestCase):
+    """Test cases for the LogEngineSelector class."""
+
+    def setUp(self):
+        """Set up a selector with default thresholds."""
+        self.selector = LogEngineSelector()
+
+    def test_choose(self):
+        """Test that short windows over moderate log groups use FilterLogEvents."""
+        # 300 MB over 30 days is about 35 KB in 5 minutes
+        self.assertEqual(self.selector.choose(300, 300 * MB, 30)[0], ENGINE_FILTER)
+        self.assertEqual(self.selector.choose(300, 300 * MB, 30, compile_search('error'))[0], ENGINE_FILTER)
+
+        self.assertEqual(self.selector.choose(86400, 300 * MB, 30)[0], ENGINE_INSIGHTS)
+        self.assertEqual(self.selector.choose(300, 2000 * 1024 * MB, 1)[0], ENGINE_INSIGHTS)
+        self.assertEqual(self.selector.choose(300, None, 30)[0], ENGINE_INSIGHTS)
+        self.assertEqual(self.selector.choose(300, MB, 30, compile_search(search_regex='x+'))[0], ENGINE_INSIGHTS)
+        self.assertEqual(self.selector.choose(300, MB, 30, sharded=True)[0], ENGINE_INSIGHTS)
+        self.assertEqual(self.selector.choose(86400, None, None, engine=ENGINE_FILTER), (ENGINE_FILTER, 'requested'))
+
+    def test_fetch_returns_newest_matches_first(self):
+        """Test that every page is read and only the newest matching events are kept."""
+        client = MagicMock()
+        client.filter_log_events.side_effect = [
+            {'events': [event(1000, 'ERROR one'), event(2000, 'ok'), event(3000, 'error two')], 'nextToken': 't'},
+            {'events': [event(2500, 'Error late', 'stream-2'), event(4000, 'error three')]},
+        ]
+
+        response = self.selector.fetch(client, '/aws/lambda/orders', 0, 5000, 3, search=compile_search('error'))
+
+        messages = [next(field['value'] for field in row if field['field'] == '@message')
+                    for row in response['results']]
+        self.assertEqual(messages, ['error three', 'error two', 'Error late'])
+        self.assertEqual(response['results'][0][0], {'field': '@timestamp', 'value': '1970-01-01 00:00:04.000'})
+        self.assertEqual(response['statistics']['recordsScanned'], 5)
+        self.assertEqual(client.filter_log_events.call_args.kwargs['nextToken'], 't')
+
+    def test_fetch_gives_up_beyond_event_budget(self):
+        """Test that a window with too many events is left to Insights."""
+        selector = LogEngineSelector(max_filter_events=2)
+        client = MagicMock()
+        client.filter_log_events.return_value = {'events': [event(1, 'a'), event(2, 'b'), event(3, 'c')]}
+
+        self.assertIsNone(selector.fetch(client, '/aws/lambda/orders', 0, 5000, 10))
+
+    def test_stats_record_latency_per_engine(self):
+        """Test that searches and latencies are counted per engine."""
+        self.selector.record(ENGINE_FILTER, 0.1)
+        self.selector.record(ENGINE_FILTER, 0.3)
+        self.selector.record(ENGINE_INSIGHTS, 2.0, fallback=True)
+
+        stats = self.selector.get_stats()
+        self.assertEqual(stats[ENGINE_FILTER]['searches'], 2)
+        self.assertAlmostEqual(stats[ENGINE_FILTER]['average_ms'], 200.0)
+        self.assertAlmostEqual(stats[ENGINE_INSIGHTS]['max_ms'], 2000.0)
+        self.assertEqual(stats['fallbacks'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+"""
+Tests for the local log search index.
+"""
+
+import unittest
+
+from eventbridge.log_index import LogWindowIndex
+from eventbridge.search import compile_search
+
+GROUP = '/aws/lambda/orders'
+
+
+def row(seconds, message):
+    """Build an Insights result row at the given second of 2024-01-01 00:00 UTC."""
+    return [{'field': '@timestamp', 'value': f'2024-01-01 00:00:{seconds:02d}.000'},
+            {'field': '@message', 'value': message}]
+
+
+# 2024-01-01 00:00:00 UTC in milliseconds
+START = 1704067200000
+
+
+class TestLogWindowIndex(unittest.TestCase):
+    """Test cases for the LogWindowIndex class."""
+
+    def setUp(self):
+        """Set up an index holding one unfiltered window, newest row first."""
+        self.rows = [row(30, 'Order 42 FAILED'), row(20, 'order 41 shipped'), row(10, 'Order 40 failed again')]
+        self.index = LogWindowIndex(tolerance_ms=1000)
+        self.index.add(GROUP, START, START + 60000, self.rows)
+
+    def test_search_is_case_insensitive_and_newest_first(self):
+        """Test that matching rows are returned in stored order."""
+        results = self.index.search(GROUP, START, START + 60000, compile_search('failed'), limit=10)
+
+        self.assertEqual(results, [self.rows[0], self.rows[2]])
+        self.assertEqual(self.index.get_stats()['hits'], 1)
+
+    def test_search_respects_range_and_limit(self):
+        """Test that rows outside the range are skipped and the limit applies."""
+        self.assertEqual(self.index.search(GROUP, START, START + 15000, compile_search('order'), limit=10), [self.rows[2]])
+        self.assertEqual(self.index.search(GROUP, START, START + 60000, compile_search('order'), limit=1), [self.rows[0]])
+        self.assertEqual(self.index.search(GROUP, START, START + 60000, compile_search('x'), limit=10), [])
+
+    def test_uncovered_searches_miss(self):
+        """Test that other log groups, wider ranges and broader terms are not answered."""
+        self.assertIsNone(self.index.search('/aws/lambda/other', START, START + 60000, compile_search('order'), 10))
+        self.assertIsNone(self.index.search(GROUP, START - 5000, START + 60000, compile_search('order'), 10))
+
+        self.index.add(GROUP, START, START + 120000, [self.rows[0]], search=compile_search('FAIL'))
+        self.assertEqual(self.index.search(GROUP, START, START + 120000, compile_search('failed'), 10), [self.rows[0]])
+        self.assertIsNone(self.index.search(GROUP, START, START + 120000, compile_search('order'), 10))
+        self.assertEqual(self.index.get_stats()['misses'], 3)
+
+    def test_multi_term_and_regex_searches(self):
+        """Test that any-of-terms and regex searches are answered from an unfiltered window."""
+        results = self.index.search(GROUP, START, START + 60000, compile_search(search_terms=['41', '40']), 10)
+        self.assertEqual(results, [self.rows[1], self.rows[2]])
+
+        results = self.index.search(GROUP, START, START + 60000, compile_search(search_regex=r'order \d+ failed$'), 10)
+        self.assertEqual(results, [self.rows[0]])
+
+        # A window fetched for two terms answers a search for one of them, but not for a third
+        self.index.add(GROUP, START, START + 120000, [self.rows[0], self.rows[1]],
+                       search=compile_search(search_terms=['42', '41']))
+        self.assertEqual(self.index.search(GROUP, START, START + 120000, compile_search('order 41'), 10),
+                         [self.rows[1]])
+        self.assertIsNone(self.index.search(GROUP, START, START + 120000, compile_search('40'), 10))
+
+    def test_memory_cap_evicts_least_recently_used(self):
+        """Test that windows beyond the memory budget are evicted oldest first."""
+        index = LogWindowIndex(max_bytes=2000)
+        for second in range(10):
+            index.add(GROUP, START + second, START + 60000, [row(second, 'x' * 200)])
+
+        stats = index.get_stats()
+        self.assertLessEqual(stats['bytes'], 2000)
+        self.assertGreater(stats['evictions'], 0)
+        self.assertIsNotNone(index.search(GROUP, START + 9, START + 60000, compile_search('xxx'), 10))
+
+
+if __name__ == '__main__':
+    unittest.main()
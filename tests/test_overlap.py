@@ -0,0 +1,149 @@
+"""
+Tests for the rule overlap analysis.
+"""
+
+import time
+import unittest
+
+from eventbridge.overlap import analyze_rule_overlaps, candidate_pairs, relation
+from eventbridge.patterns import CompiledPattern
+
+
+def rule(name, pattern, *arns, state='ENABLED'):
+    """Build a rule as listed by the topology snapshot."""
+    return {'Name': name, 'EventPattern': pattern, 'State': state,
+            'Targets': [{'Id': arn.split(':')[-1], 'Arn': arn} for arn in arns]}
+
+
+def compare(first, second):
+    """Relate two patterns given as objects."""
+    return relation(CompiledPattern(first), CompiledPattern(second))
+
+
+class TestRelation(unittest.TestCase):
+    """Test cases for relating two event patterns."""
+
+    def test_duplicates_ignore_value_order(self):
+        """Test that patterns accepting the same values are duplicates."""
+        self.assertEqual(compare({'source': ['a', 'b']}, {'source': ['b', 'a']})[0], 'duplicate')
+
+    def test_subsumed_patterns_name_the_narrower_one(self):
+        """Test that a pattern with extra or tighter checks is subsumed by the broader one."""
+        cases = [
+            ({'source': ['a'], 'detail': {'x': ['1']}}, {'source': ['a']}),
+            ({'source': ['a']}, {'source': ['a', 'b']}),
+            ({'detail': {'id': [{'prefix': 'order-eu'}]}}, {'detail': {'id': [{'prefix': 'order-'}]}}),
+            ({'detail': {'id': ['order-1']}}, {'detail': {'id': [{'prefix': 'order-'}]}}),
+            ({'detail': {'n': [{'numeric': ['>', 10, '<', 20]}]}}, {'detail': {'n': [{'numeric': ['>=', 10]}]}}),
+            ({'detail': {'n': [5]}}, {'detail': {'n': [{'exists': True}]}}),
+        ]
+        for narrow, broad in cases:
+            with self.subTest(narrow=narrow, broad=broad):
+                self.assertEqual(compare(narrow, broad)[:2], ('subsumed', 0))
+                self.assertEqual(compare(broad, narrow)[:2], ('subsumed', 1))
+
+    def test_partial_overlaps(self):
+        """Test that patterns sharing only some events overlap."""
+        cases = [
+            ({'source': ['a'], 'detail': {'x': ['1']}}, {'source': ['a'], 'detail': {'y': ['2']}}),
+            ({'detail': {'n': [{'numeric': ['>', 10]}]}}, {'detail': {'n': [{'numeric': ['<', 20]}]}}),
+            ({'detail': {'id': [{'prefix': 'ab'}]}}, {'detail': {'id': [{'suffix': 'yz'}]}}),
+            ({'$or': [{'source': ['a']}, {'source': ['b']}]}, {'source': ['a']}),
+        ]
+        for first, second in cases:
+            with self.subTest(first=first, second=second):
+                self.assertEqual(compare(first, second)[0], 'overlap')
+
+    def test_disjoint_patterns(self):
+        """Test that patterns that can never match the same event are not related."""
+        cases = [
+            ({'source': ['a']}, {'source': ['b']}),
+            ({'detail': {'n': [{'numeric': ['<', 10]}]}}, {'detail': {'n': [{'numeric': ['>=', 10]}]}}),
+            ({'detail': {'id': [{'prefix': 'eu-'}]}}, {'detail': {'id': [{'prefix': 'us-'}]}}),
+            ({'detail': {'id': [{'exists': False}]}}, {'detail': {'id': ['x']}}),
+            ({'detail': {'n': [{'numeric': ['>', 0]}]}}, {'detail': {'n': [{'prefix': '1'}]}}),
+            ({'$or': [{'source': ['x']}, {'source': ['y']}]}, {'source': ['z']}),
+            ({'$or': [{'source': ['x']}, {'detail': {'id': [{'prefix': 'eu-'}]}}]},
+             {'source': ['z'], 'detail': {'id': [{'prefix': 'us-'}]}}),
+        ]
+        for first, second in cases:
+            with self.subTest(first=first, second=second):
+                self.assertIsNone(compare(first, second))
+
+
+class TestAnalyzeRuleOverlaps(unittest.TestCase):
+    """Test cases for the overlap report of a bus."""
+
+    def test_report(self):
+        """Test findings, shared targets, contradictions and skipped rules."""
+        report = analyze_rule_overlaps([
+            rule('orders', '{"source": ["orders"]}', 'arn:aws:sqs:us-east-1:1:queue'),
+            rule('orders-copy', '{"source": ["orders"]}', 'arn:aws:sqs:us-east-1:1:queue'),
+            rule('big-orders', '{"source": ["orders"], "detail": {"total": [{"numeric": [">", 100]}]}}',
+                 'arn:aws:lambda:us-east-1:1:function:audit'),
+            rule('billing', '{"source": ["billing"]}', 'arn:aws:sqs:us-east-1:1:queue'),
+            rule('never', '{"detail": {"total": [{"numeric": [">", 5, "<=", 5]}]}}'),
+            rule('off', '{"source": ["orders"]}', state='DISABLED'),
+            rule('broken', '{"source": "orders"}'),
+            {'Name': 'scheduled', 'ScheduleExpression': 'rate(5 minutes)'},
+        ])
+
+        by_rules = {tuple(finding['rules']): finding for finding in report['findings']}
+        self.assertEqual(report['rules'], 4)
+        self.assertEqual(set(by_rules), {('orders', 'orders-copy'), ('orders', 'big-orders'),
+                                         ('orders-copy', 'big-orders')})
+        self.assertEqual(by_rules['orders', 'orders-copy']['relation'], 'duplicate')
+        self.assertEqual(by_rules['orders', 'orders-copy']['shared_targets'], ['arn:aws:sqs:us-east-1:1:queue'])
+        self.assertEqual(by_rules['orders', 'big-orders']['narrower'], 'big-orders')
+        self.assertEqual(by_rules['orders', 'big-orders']['fields'], ['source'])
+        self.assertEqual([item['rule'] for item in report['contradictions']], ['never'])
+        self.assertIn('broken', report['invalid_patterns'])
+        self.assertEqual(report['stats']['findings_by_relation'], {'duplicate': 1, 'subsumed': 2, 'overlap': 0})
+
+    def test_candidate_pairs_are_pruned_by_source_and_detail_type(self):
+        """Test that rules with different exact sources or detail-types are never compared."""
+        patterns = [CompiledPattern(pattern) for pattern in [
+            {'source': ['a'], 'detail-type': ['x']},
+            {'source': ['a'], 'detail-type': ['y']},
+            {'source': ['a', 'b'], 'detail-type': ['x']},
+            {'source': ['b']},
+            {'detail': {'n': [1]}},
+        ]]
+
+        self.assertEqual(candidate_pairs(patterns), {(0, 2), (2, 3), (0, 4), (1, 4), (2, 4), (3, 4)})
+
+    def test_or_rules_are_grouped_by_the_values_of_their_alternatives(self):
+        """Test that an $or rule is paired only with rules sharing a value of one of its alternatives."""
+        patterns = [CompiledPattern(pattern) for pattern in [
+            {'$or': [{'source': ['x']}, {'source': ['y']}]},
+            {'source': ['z']},
+            {'source': ['y']},
+        ]]
+        report = analyze_rule_overlaps([rule('either', '{"$or": [{"source": ["x"]}, {"source": ["y"]}]}'),
+                                        rule('z', '{"source": ["z"]}'), rule('y', '{"source": ["y"]}')])
+
+        self.assertEqual(candidate_pairs(patterns), {(0, 2)})
+        self.assertEqual([finding['rules'] for finding in report['findings']], [['either', 'y']])
+
+    def test_large_bus_is_analyzed_quickly(self):
+        """Test that a 2k-rule bus compares only a small share of all pairs."""
+        rules = []
+        for number in range(2000):
+            if number % 100 == 0:
+                pattern = f'{{"detail": {{"amount": [{{"numeric": [">", {number}]}}]}}}}'
+            else:
+                pattern = (f'{{"source": ["app.{number % 50}"], "detail-type": ["Type {number % 13}"], '
+                           f'"detail": {{"state": ["ok", {{"prefix": "fail"}}]}}}}')
+            rules.append(rule(f'rule-{number}', pattern))
+
+        started = time.monotonic()
+        report = analyze_rule_overlaps(rules)
+        elapsed = time.monotonic() - started
+
+        self.assertLess(report['stats']['candidate_pairs'], report['stats']['total_pairs'] // 20)
+        self.assertTrue(report['findings'])
+        self.assertLess(elapsed, 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
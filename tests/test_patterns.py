@@ -0,0 +1,199 @@
+"""
+Conformance tests for the local event pattern matcher.
+
+The cases follow the event pattern examples of the Amazon EventBridge user guide.
+"""
+
+import json
+import time
+import unittest
+
+from eventbridge.patterns import PatternSet, compile_pattern, normalize_event
+
+EVENT = {
+    'version': '0',
+    'id': '6a7e8feb-b491-4cf7-a9f1-bf3703467718',
+    'detail-type': 'EC2 Instance State-change Notification',
+    'source': 'aws.ec2',
+    'account': '111122223333',
+    'time': '2017-12-22T18:43:48Z',
+    'region': 'us-west-1',
+    'resources': ['arn:aws:ec2:us-west-1:123456789012:instance/i-1234567890abcdef0'],
+    'detail': {
+        'instance-id': 'i-1234567890abcdef0',
+        'state': 'terminated',
+        'c-count': 5,
+        'd-count': 0.5,
+        'x-limit': 3.018e2,
+        'flag': True,
+        'note': None,
+        'source-ip': '10.0.0.123',
+        'filename': 'image.PNG',
+        'items': [{'sku': 'A-1', 'qty': 2}, {'sku': 'B-7', 'qty': 12}],
+        'tags': ['blue', 'green'],
+        'location': {'city': 'Seattle', 'zone': 'us-west-1a'},
+    },
+}
+
+# (description, pattern, expected match against EVENT)
+CASES = [
+    # Exact matching
+    ('exact source', {'source': ['aws.ec2']}, True),
+    ('exact source mismatch', {'source': ['aws.s3']}, False),
+    ('any of several values', {'source': ['aws.s3', 'aws.ec2']}, True),
+    ('nested exact', {'detail': {'state': ['terminated']}}, True),
+    ('all fields must match', {'source': ['aws.ec2'], 'detail': {'state': ['running']}}, False),
+    ('exact is case-sensitive', {'detail': {'state': ['Terminated']}}, False),
+    ('number equals number', {'detail': {'c-count': [5.0]}}, True),
+    ('string does not equal number', {'detail': {'c-count': ['5']}}, False),
+    ('boolean', {'detail': {'flag': [True]}}, True),
+    ('boolean is not a number', {'detail': {'flag': [1]}}, False),
+    ('null matches null value', {'detail': {'note': [None]}}, True),
+    ('null does not match missing field', {'detail': {'missing': [None]}}, False),
+    ('empty string does not match missing field', {'detail': {'missing': ['']}}, False),
+    ('missing field', {'detail': {'missing': ['x']}}, False),
+    ('array value matches any element', {'detail': {'tags': ['green', 'red']}}, True),
+    ('array value without common element', {'detail': {'tags': ['red']}}, False),
+    ('resources array', {'resources': ['arn:aws:ec2:us-west-1:123456789012:instance/i-1234567890abcdef0']}, True),
+    ('array of objects', {'detail': {'items': {'sku': ['B-7']}}}, True),
+    ('array of objects mismatch', {'detail': {'items': {'sku': ['C-1']}}}, False),
+    ('object field is not a leaf', {'detail': {'location': ['Seattle']}}, False),
+    # Prefix and suffix
+    ('prefix', {'detail': {'instance-id': [{'prefix': 'i-1234'}]}}, True),
+    ('prefix mismatch', {'detail': {'instance-id': [{'prefix': 'i-9'}]}}, False),
+    ('prefix on number', {'detail': {'c-count': [{'prefix': '5'}]}}, False),
+    ('prefix ignoring case', {'detail-type': [{'prefix': {'equals-ignore-case': 'ec2 INSTANCE'}}]}, True),
+    ('suffix', {'detail': {'filename': [{'suffix': '.PNG'}]}}, True),
+    ('suffix is case-sensitive', {'detail': {'filename': [{'suffix': '.png'}]}}, False),
+    ('suffix ignoring case', {'detail': {'filename': [{'suffix': {'equals-ignore-case': '.png'}}]}}, True),
+    ('equals-ignore-case', {'detail': {'state': [{'equals-ignore-case': 'TERMINATED'}]}}, True),
+    # Anything-but
+    ('anything-but value', {'detail': {'state': [{'anything-but': 'running'}]}}, True),
+    ('anything-but excluded value', {'detail': {'state': [{'anything-but': ['stopped', 'terminated']}]}}, False),
+    ('anything-but number', {'detail': {'c-count': [{'anything-but': [0, 5]}]}}, False),
+    ('anything-but on missing field', {'detail': {'missing': [{'anything-but': 'x'}]}}, False),
+    ('anything-but prefix', {'detail': {'state': [{'anything-but': {'prefix': 'run'}}]}}, True),
+    ('anything-but prefix excluded', {'detail': {'state': [{'anything-but': {'prefix': 'term'}}]}}, False),
+    ('anything-but suffix', {'detail': {'filename': [{'anything-but': {'suffix': '.PNG'}}]}}, False),
+    ('anything-but ignoring case', {'detail': {'state': [{'anything-but': {'equals-ignore-case': ['TERMINATED']}}]}},
+     False),
+    ('anything-but wildcard', {'detail': {'filename': [{'anything-but': {'wildcard': '*.jpg'}}]}}, True),
+    ('anything-but with array value', {'detail': {'tags': [{'anything-but': 'blue'}]}}, True),
+    # Numeric
+    ('numeric range', {'detail': {'c-count': [{'numeric': ['>', 0, '<=', 5]}]}}, True),
+    ('numeric range excludes', {'detail': {'c-count': [{'numeric': ['>', 5]}]}}, False),
+    ('numeric equals float', {'detail': {'x-limit': [{'numeric': ['=', 301.8]}]}}, True),
+    ('numeric on fraction', {'detail': {'d-count': [{'numeric': ['<', 10]}]}}, True),
+    ('numeric on string', {'detail': {'state': [{'numeric': ['>', 0]}]}}, False),
+    ('numeric on boolean', {'detail': {'flag': [{'numeric': ['>=', 1]}]}}, False),
+    ('numeric in array of objects', {'detail': {'items': {'qty': [{'numeric': ['>', 10]}]}}}, True),
+    # Exists
+    ('exists true', {'detail': {'state': [{'exists': True}]}}, True),
+    ('exists true on missing field', {'detail': {'missing': [{'exists': True}]}}, False),
+    ('exists false on missing field', {'detail': {'missing': [{'exists': False}]}}, True),
+    ('exists false on present field', {'detail': {'state': [{'exists': False}]}}, False),
+    ('exists only on leaves', {'detail': {'location': [{'exists': True}]}}, False),
+    ('exists true on null value', {'detail': {'note': [{'exists': True}]}}, True),
+    # Wildcard
+    ('wildcard', {'detail': {'filename': [{'wildcard': 'image.*'}]}}, True),
+    ('wildcard in the middle', {'source': [{'wildcard': 'aws.*2'}]}, True),
+    ('wildcard must match whole value', {'source': [{'wildcard': 'aws'}]}, False),
+    ('escaped star is literal', {'source': [{'wildcard': 'aws\\*'}]}, False),
+    # CIDR
+    ('cidr', {'detail': {'source-ip': [{'cidr': '10.0.0.0/24'}]}}, True),
+    ('cidr outside', {'detail': {'source-ip': [{'cidr': '10.0.1.0/24'}]}}, False),
+    # Mixed matchers in one array
+    ('literal or prefix', {'detail': {'state': ['running', {'prefix': 'term'}]}}, True),
+    ('exists false or value', {'detail': {'state': [{'exists': False}, 'terminated']}}, True),
+    # $or
+    ('$or first alternative', {'source': ['aws.ec2'],
+                               '$or': [{'detail': {'state': ['terminated']}}, {'detail': {'c-count': [1]}}]}, True),
+    ('$or second alternative', {'$or': [{'source': ['aws.s3']}, {'detail': {'c-count': [{'numeric': ['=', 5]}]}}]},
+     True),
+    ('$or no alternative', {'$or': [{'source': ['aws.s3']}, {'detail': {'state': ['running']}}]}, False),
+    ('$or nested in detail', {'detail': {'$or': [{'state': ['running']}, {'filename': [{'suffix': 'PNG'}]}]}}, True),
+    ('$or and other field', {'source': ['aws.s3'], '$or': [{'region': ['us-west-1']}, {'account': ['1']}]}, False),
+]
+
+INVALID_PATTERNS = [
+    'not json',
+    [],
+    {},
+    {'source': 'aws.ec2'},
+    {'source': []},
+    {'detail': {}},
+    {'detail': {'state': [{'prefix': 5}]}},
+    {'detail': {'state': [{'unknown-filter': 'x'}]}},
+    {'detail': {'state': [{'numeric': ['>']}]}},
+    {'detail': {'state': [{'numeric': ['~', 5]}]}},
+    {'detail': {'state': [{'exists': 'yes'}]}},
+    {'detail': {'state': [{'prefix': 'a', 'suffix': 'b'}]}},
+    {'detail': {'source-ip': [{'cidr': 'not-a-network'}]}},
+    {'$or': [{'source': ['aws.ec2']}]},
+]
+
+
+class TestEventPatternConformance(unittest.TestCase):
+    """Conformance cases for single patterns."""
+
+    def test_cases(self):
+        """Test every documented matching behavior against the sample event."""
+        for description, pattern, expected in CASES:
+            with self.subTest(description):
+                self.assertEqual(compile_pattern(pattern).matches(EVENT), expected)
+                # Patterns are usually stored as JSON strings
+                self.assertEqual(compile_pattern(json.dumps(pattern)).matches(EVENT), expected)
+
+    def test_invalid_patterns_are_rejected(self):
+        """Test that malformed patterns raise ValueError."""
+        for pattern in INVALID_PATTERNS:
+            with self.subTest(pattern=pattern):
+                with self.assertRaises(ValueError):
+                    compile_pattern(pattern)
+
+    def test_put_events_entry_is_normalized(self):
+        """Test that PutEvents entries are matched like delivered events."""
+        entry = {'Source': 'orders', 'DetailType': 'Order Placed', 'Detail': json.dumps({'total': 120})}
+        pattern = compile_pattern({'source': ['orders'], 'detail-type': ['Order Placed'],
+                                   'detail': {'total': [{'numeric': ['>=', 100]}]}})
+
+        self.assertTrue(pattern.matches(normalize_event(entry)))
+        self.assertEqual(normalize_event(EVENT), EVENT)
+
+
+class TestPatternSet(unittest.TestCase):
+    """Test cases for batch evaluation of many patterns."""
+
+    def test_match_batch(self):
+        """Test that each event gets the rules whose pattern matches it."""
+        patterns = PatternSet({
+            'ec2': {'source': ['aws.ec2']},
+            'terminated': json.dumps({'detail': {'state': ['terminated']}}),
+            'broken': '{"source": "aws.ec2"}',
+        })
+        other = dict(EVENT, source='aws.s3', detail={'state': 'running'})
+
+        self.assertEqual(patterns.match_batch([EVENT, other]), [['ec2', 'terminated'], []])
+        self.assertIn('broken', patterns.errors)
+
+    def test_bulk_evaluation_is_fast(self):
+        """Test that thousands of events are checked against hundreds of rules within seconds."""
+        patterns = PatternSet({
+            f'rule-{number}': {'source': [f'app.service-{number % 50}'],
+                               'detail': {'amount': [{'numeric': ['>', number]}]}}
+            for number in range(500)
+        })
+        events = [{'source': f'app.service-{number % 50}', 'detail-type': 'Order',
+                   'detail': {'amount': number % 600}} for number in range(2000)]
+
+        started = time.monotonic()
+        results = patterns.match_batch(events)
+        elapsed = time.monotonic() - started
+
+        self.assertEqual(results[7], [])
+        self.assertEqual(results[1999], [f'rule-{number}' for number in range(49, 199, 50)])
+        self.assertLess(elapsed, 10.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
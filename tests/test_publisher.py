@@ -0,0 +1,132 @@
+"""
+Tests for the bulk event publisher.
+"""
+
+import json
+import threading
+import unittest
+
+from eventbridge.publisher import EventPublisher, RateLimiter, entry_size, pack_batches, percentile, to_entry
+
+
+class FakeEventsClient:
+    """EventBridge client recording put_events calls and failing chosen entries once."""
+
+    def __init__(self, fail_once=None):
+        self.fail_once = dict(fail_once or {})
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def put_events(self, Entries):
+        with self._lock:
+            self.calls.append([json.loads(entry['Detail'])['n'] for entry in Entries])
+            results = []
+            for entry in Entries:
+                number = json.loads(entry['Detail'])['n']
+                code = self.fail_once.pop(number, None)
+                if code == 'MalformedDetail':
+                    self.fail_once[number] = code
+                results.append({'ErrorCode': code, 'ErrorMessage': 'failed'} if code else {'EventId': f'id-{number}'})
+        return {'FailedEntryCount': sum(1 for result in results if 'ErrorCode' in result), 'Entries': results}
+
+
+class TestBatching(unittest.TestCase):
+    """Test cases for converting and packing entries."""
+
+    def test_to_entry_accepts_delivered_events_entries_and_lines(self):
+        """Test that all supported event forms become PutEvents entries."""
+        delivered = to_entry({'source': 'orders', 'detail-type': 'Placed', 'detail': {'n': 1}}, 'bus')
+        entry = to_entry('{"Source": "orders", "DetailType": "Placed", "Detail": {"n": 1}, "EventBusName": "other"}',
+                         'bus')
+
+        self.assertEqual(delivered, {'Source': 'orders', 'DetailType': 'Placed', 'Detail': '{"n": 1}',
+                                     'EventBusName': 'bus'})
+        self.assertEqual(entry['Detail'], '{"n": 1}')
+        self.assertEqual(entry['EventBusName'], 'other')
+        with self.assertRaises(ValueError):
+            to_entry('[1, 2]', 'bus')
+
+    def test_batches_respect_entry_and_size_limits(self):
+        """Test that batches hold at most 10 entries and 256 KB, in input order."""
+        small = [(number, to_entry({'detail': {'n': number}}, 'bus')) for number in range(25)]
+        large = [(number, to_entry({'detail': {'n': number, 'pad': 'x' * 100000}}, 'bus')) for number in range(5)]
+
+        small_batches = list(pack_batches(small))
+        large_batches = list(pack_batches(large))
+
+        self.assertEqual([len(batch) for batch in small_batches], [10, 10, 5])
+        self.assertEqual([position for batch in small_batches for position, _ in batch], list(range(25)))
+        self.assertEqual([len(batch) for batch in large_batches], [2, 2, 1])
+        for batch in large_batches:
+            self.assertLessEqual(sum(entry_size(entry) for _, entry in batch), 256 * 1024)
+
+    def test_percentile_and_rate_limiter(self):
+        """Test nearest-rank percentiles and that the limiter spaces out units."""
+        self.assertEqual(percentile([1.0, 2.0, 3.0, 4.0], 0.5), 2.0)
+        self.assertEqual(percentile([1.0, 2.0, 3.0, 4.0], 0.99), 4.0)
+        self.assertEqual(percentile([], 0.5), 0.0)
+
+        now = [100.0]
+        slept = []
+        limiter = RateLimiter(100, clock=lambda: now[0], sleep=slept.append)
+        for _ in range(3):
+            limiter.acquire(10)
+
+        self.assertEqual([round(delay, 6) for delay in slept], [0.1, 0.2])
+
+
+class TestEventPublisher(unittest.TestCase):
+    """Test cases for the EventPublisher class."""
+
+    def test_retries_only_failed_entries(self):
+        """Test that transiently failed entries are resent alone and permanent failures reported."""
+        client = FakeEventsClient(fail_once={3: 'ThrottlingException', 7: 'InternalFailure', 12: 'MalformedDetail'})
+        publisher = EventPublisher(client, 'bus', max_workers=1, base_delay=0)
+        lines = [json.dumps({'source': 'load', 'detail': {'n': number}}) for number in range(20)]
+
+        report = publisher.publish(lines + ['', 'not json'])
+
+        self.assertEqual(client.calls[:2], [list(range(10)), [3, 7]])
+        self.assertEqual(report['events'], 21)
+        self.assertEqual(report['published'], 19)
+        self.assertEqual(report['retried'], 2)
+        self.assertEqual(report['errors'], {'MalformedDetail': 1, 'InvalidEvent': 1})
+        self.assertEqual([failure['index'] for failure in report['failures']], [12, 21])
+        self.assertFalse(report['success'])
+        self.assertEqual(report['calls'], 3)
+        self.assertEqual(set(report['latency_ms']), {'p50', 'p90', 'p99', 'max'})
+
+    def test_missing_results_and_worker_errors_are_failures(self):
+        """Test that entries without a result, or whose batch broke a worker, are reported as failed."""
+        short = FakeEventsClient()
+        short.put_events = lambda Entries: {'FailedEntryCount': 0, 'Entries': [{'EventId': 'id'}]}
+        broken = FakeEventsClient()
+        broken.put_events = lambda Entries: {'FailedEntryCount': 0, 'Entries': [None] * len(Entries)}
+        events = [{'detail': {'n': number}} for number in range(3)]
+
+        short_report = EventPublisher(short, 'bus', max_workers=1).publish(events)
+        broken_report = EventPublisher(broken, 'bus', max_workers=1).publish(events)
+
+        self.assertFalse(short_report['success'])
+        self.assertEqual(short_report['published'], 1)
+        self.assertEqual(short_report['errors'], {'MissingResult': 2})
+        self.assertFalse(broken_report['success'])
+        self.assertEqual(broken_report['published'], 0)
+        self.assertEqual(broken_report['errors'], {'AttributeError': 3})
+
+    def test_concurrent_generator_input(self):
+        """Test that a generator of events is published completely by several workers."""
+        client = FakeEventsClient()
+        publisher = EventPublisher(client, 'bus', max_workers=4)
+
+        report = publisher.publish({'detail': {'n': number}} for number in range(1000))
+
+        self.assertTrue(report['success'])
+        self.assertEqual(report['published'], 1000)
+        self.assertEqual(report['batches'], 100)
+        self.assertEqual(sorted(number for call in client.calls for number in call), list(range(1000)))
+        self.assertGreater(report['throughput'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
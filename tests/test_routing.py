@@ -0,0 +1,86 @@
+"""
+Tests for the rule routing index.
+"""
+
+import random
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from eventbridge.patterns import PatternSet
+from eventbridge.routing import RuleRoutingIndex
+
+
+def bus_patterns(count):
+    """Build a bus of rules keyed on source, on detail-type only, or on neither."""
+    patterns = {}
+    for number in range(count):
+        if number % 10 == 0:
+            patterns[f'rule-{number}'] = {'detail': {'amount': [{'numeric': ['>', number]}]}}
+        elif number % 10 == 1:
+            patterns[f'rule-{number}'] = {'detail-type': [f'Type {number % 7}']}
+        else:
+            patterns[f'rule-{number}'] = {'source': [f'app.{number % 40}', f'app.{(number + 1) % 40}'],
+                                          'detail': {'state': ['ok', {'prefix': 'fail'}]}}
+    return patterns
+
+
+class TestRuleRoutingIndex(unittest.TestCase):
+    """Test cases for the RuleRoutingIndex class."""
+
+    def test_matches_like_evaluating_every_rule(self):
+        """Test that the index returns exactly the brute-force matches, in bus order."""
+        patterns = bus_patterns(400)
+        index = RuleRoutingIndex(patterns)
+        brute_force = PatternSet(patterns)
+        generator = random.Random(7)
+        events = [{'source': f'app.{generator.randrange(45)}', 'detail-type': f'Type {generator.randrange(9)}',
+                   'detail': {'state': generator.choice(['ok', 'failed', 'pending']),
+                              'amount': generator.randrange(500)}} for _ in range(300)]
+
+        self.assertEqual(index.match_batch(events), brute_force.match_batch(events))
+
+    def test_candidates_are_narrowed_by_source_and_detail_type(self):
+        """Test that an event is only evaluated against the rules of its source and detail-type."""
+        index = RuleRoutingIndex(bus_patterns(400))
+        event = {'source': 'app.5', 'detail-type': 'Type 3', 'detail': {'state': 'ok', 'amount': 1}}
+
+        candidates = index.candidates(event)
+
+        self.assertEqual(index.indexed_count, 360)
+        self.assertLess(len(candidates), 120)
+        self.assertIn('rule-0', candidates)
+        self.assertIn('rule-5', candidates)
+        self.assertNotIn('rule-7', candidates)
+        self.assertEqual(index.match(event)[:2], ['rule-0', 'rule-4'])
+
+    def test_or_patterns_and_invalid_rules(self):
+        """Test that $or rules are indexed only if every alternative keys on the field, and invalid ones reported."""
+        index = RuleRoutingIndex({
+            'either': {'$or': [{'source': ['a']}, {'source': ['b']}]},
+            'mixed': {'$or': [{'source': ['a']}, {'detail-type': ['x']}]},
+            'broken': {'source': 'a'},
+            'exact': {'source': ['b']},
+        })
+
+        self.assertEqual(index.indexed_count, 2)
+        self.assertEqual(index.match({'source': 'b'}), ['either', 'exact'])
+        self.assertEqual(index.candidates({'source': 'c', 'detail-type': 'x'}), ['mixed'])
+        self.assertIn('broken', index.errors)
+        self.assertEqual(index.get_stats()['invalid_rules'], 1)
+
+    def test_stats_are_counted_across_threads(self):
+        """Test that a shared index counts every event matched from concurrent threads."""
+        index = RuleRoutingIndex(bus_patterns(200))
+        events = [{'source': f'app.{number % 50}', 'detail-type': f'Type {number % 7}', 'detail': {}}
+                  for number in range(100)]
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(index.match_batch, [events] * 40))
+
+        stats = index.get_stats()
+        self.assertEqual(stats['events'], 4000)
+        self.assertEqual(stats['matches'], sum(len(matched) for batch in results for matched in batch))
+
+
+if __name__ == '__main__':
+    unittest.main()
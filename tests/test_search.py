@@ -0,0 +1,89 @@
+"""
+Tests for the log search compiler.
+"""
+
+import time
+import unittest
+
+from eventbridge.search import AhoCorasick, CompiledSearch, compile_search, merge_spans
+
+
+class TestAhoCorasick(unittest.TestCase):
+    """Test cases for the AhoCorasick class."""
+
+    def test_finds_overlapping_terms(self):
+        """Test that terms sharing suffixes and prefixes are all found."""
+        automaton = AhoCorasick(['he', 'she', 'his', 'hers'])
+
+        self.assertEqual(automaton.find_all('ushers'), [(1, 4), (2, 4), (2, 6)])
+
+    def test_ignores_empty_and_duplicate_terms(self):
+        """Test that empty and repeated terms do not produce extra matches."""
+        automaton = AhoCorasick(['ab', '', 'ab'])
+
+        self.assertEqual(automaton.terms, ['ab'])
+        self.assertEqual(automaton.find_all('abab'), [(0, 2), (2, 4)])
+
+    def test_many_terms_scan_in_one_pass(self):
+        """Test that hundreds of terms are matched without scanning once per term."""
+        terms = [f'order-{number:05d}' for number in range(500)]
+        automaton = AhoCorasick(terms)
+        message = ' '.join(f'order-{number:05d}' for number in range(0, 1000, 7)) * 20
+
+        started = time.monotonic()
+        spans = automaton.find_all(message)
+        elapsed = time.monotonic() - started
+
+        self.assertEqual(len(spans), len(range(0, 500, 7)) * 20)
+        self.assertLess(elapsed, 1.0)
+
+
+class TestCompiledSearch(unittest.TestCase):
+    """Test cases for the CompiledSearch class."""
+
+    def test_spans_are_case_insensitive_and_merged(self):
+        """Test that overlapping matches of terms and regexes become one highlight."""
+        search = compile_search('ERROR', ['timeout'], r'\d+ms')
+
+        self.assertEqual(search.spans('error: Timeout after 300ms, error'), [(0, 5), (7, 14), (21, 26), (28, 33)])
+        self.assertEqual(compile_search(search_terms=['err', 'error']).spans('an error'), [(3, 8)])
+        self.assertEqual(merge_spans([(5, 8), (0, 2), (2, 3)]), [(0, 3), (5, 8)])
+
+    def test_matches_any_term_or_regex(self):
+        """Test that a message matches if it contains any term or matches the regex."""
+        search = compile_search(search_terms=['order-1', 'order-2'], search_regex=r'^FATAL')
+
+        self.assertTrue(search.matches('shipped ORDER-2'))
+        self.assertTrue(search.matches('fatal: disk full'))
+        self.assertFalse(search.matches('order-3 shipped, not fatal'))
+        self.assertTrue(compile_search().matches('anything'))
+
+    def test_case_sensitive_search(self):
+        """Test that case-sensitive searches only match the exact case."""
+        search = CompiledSearch(terms=['Error'], case_sensitive=True)
+
+        self.assertEqual(search.spans('error Error'), [(6, 11)])
+        self.assertNotIn('(?i)', search.insights_filter())
+
+    def test_insights_filter_escapes_terms(self):
+        """Test that terms are pushed down as escaped literals in one alternation."""
+        search = compile_search('a.b', ['path/x'], 'id-[0-9]+')
+
+        self.assertEqual(search.insights_filter(),
+                         r'filter @message like /(?i)(a\.b|path\/x|(?:id-[0-9]+))/')
+        self.assertIsNone(compile_search().insights_filter())
+
+    def test_narrows(self):
+        """Test which searches can be answered from the results of another."""
+        self.assertTrue(compile_search('error').narrows(compile_search('err')))
+        self.assertTrue(compile_search(search_terms=['a1', 'b1']).narrows(compile_search(search_terms=['a', 'b'])))
+        self.assertTrue(compile_search(search_regex='x+').narrows(compile_search(search_regex='x+')))
+        self.assertTrue(compile_search('anything').narrows(None))
+        self.assertFalse(compile_search('err').narrows(compile_search('error')))
+        self.assertFalse(compile_search(search_terms=['a1', 'c1']).narrows(compile_search(search_terms=['a', 'b'])))
+        self.assertFalse(compile_search(search_regex='x+').narrows(compile_search('x')))
+        self.assertFalse(compile_search().narrows(compile_search('x')))
+
+
+if __name__ == '__main__':
+    unittest.main()
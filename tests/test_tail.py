@@ -0,0 +1,179 @@
+"""
+Tests for the live log tailer.
+"""
+
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+
+from eventbridge.tail import LogTailer, TailHub
+
+
+def event(event_id, timestamp, stream='stream-1'):
+    """Build a filter_log_events event."""
+    return {'eventId': event_id, 'timestamp': timestamp, 'message': f'message {event_id}',
+            'logStreamName': stream}
+
+
+class TestLogTailer(unittest.TestCase):
+    """Test cases for the LogTailer class."""
+
+    def setUp(self):
+        """Set up a mock CloudWatch Logs client."""
+        self.client = MagicMock()
+
+    def test_filtered_poll_returns_only_new_events(self):
+        """Test that events seen in the lookback window are not returned again."""
+        self.client.filter_log_events.side_effect = [
+            {'events': [event('a', 1000), event('b', 2000)]},
+            {'events': [event('b', 2000), event('c', 1500, 'stream-2'), event('d', 3000)]},
+        ]
+        tailer = LogTailer(self.client, '/aws/lambda/orders', start_time=0, lookback_ms=5000)
+
+        first = tailer.poll()
+        second = tailer.poll()
+
+        self.assertEqual([item['eventId'] for item in first], ['a', 'b'])
+        # The late event is found through the lookback and returned in time order
+        self.assertEqual([item['eventId'] for item in second], ['c', 'd'])
+        self.assertEqual(second[0]['logGroup'], '/aws/lambda/orders')
+        self.assertEqual(self.client.filter_log_events.call_args.kwargs['startTime'], 0)
+        self.assertEqual(tailer.cursor, 3000)
+
+    def test_filtered_poll_follows_next_token(self):
+        """Test that every page of a poll is read."""
+        self.client.filter_log_events.side_effect = [
+            {'events': [event('a', 1000)], 'nextToken': 'page-2'},
+            {'events': [event('b', 1100)]},
+        ]
+        tailer = LogTailer(self.client, '/aws/lambda/orders', log_stream_names=['s1', 's2'],
+                           filter_pattern='ERROR', start_time=0)
+
+        self.assertEqual([item['eventId'] for item in tailer.poll()], ['a', 'b'])
+        self.assertEqual(self.client.filter_log_events.call_args.kwargs['nextToken'], 'page-2')
+        self.assertEqual(self.client.filter_log_events.call_args.kwargs['filterPattern'], 'ERROR')
+
+    def test_filtered_poll_continues_unread_pages(self):
+        """Test that pages left over when max_pages is reached are read by the next poll."""
+        self.client.filter_log_events.side_effect = [
+            {'events': [event('a', 50000, 'stream-1')], 'nextToken': 'page-2'},
+            {'events': [event('b', 1000, 'stream-2')]},
+            {'events': []},
+        ]
+        tailer = LogTailer(self.client, '/aws/lambda/orders', start_time=0, lookback_ms=5000, max_pages=1)
+
+        first = tailer.poll()
+        second = tailer.poll()
+        tailer.poll()
+
+        self.assertEqual([item['eventId'] for item in first], ['a'])
+        self.assertEqual([item['eventId'] for item in second], ['b'])
+        calls = self.client.filter_log_events.call_args_list
+        self.assertEqual(calls[1].kwargs['nextToken'], 'page-2')
+        self.assertEqual(calls[1].kwargs['startTime'], 0)
+        self.assertNotIn('nextToken', calls[2].kwargs)
+        self.assertEqual(calls[2].kwargs['startTime'], 45000)
+
+    def test_single_stream_uses_forward_token(self):
+        """Test that a single stream is followed with nextForwardToken."""
+        self.client.get_log_events.side_effect = [
+            {'events': [{'timestamp': 1000, 'message': 'one'}], 'nextForwardToken': 'f/1'},
+            {'events': [], 'nextForwardToken': 'f/1'},
+            {'events': [{'timestamp': 2000, 'message': 'two'}], 'nextForwardToken': 'f/2'},
+            {'events': [], 'nextForwardToken': 'f/2'},
+        ]
+        tailer = LogTailer(self.client, '/aws/lambda/orders', log_stream_names=['stream-1'], start_time=500)
+
+        first = tailer.poll()
+        second = tailer.poll()
+
+        self.assertEqual([item['message'] for item in first], ['one'])
+        self.assertEqual([item['message'] for item in second], ['two'])
+        self.assertEqual(self.client.get_log_events.call_args_list[0].kwargs['startTime'], 500)
+        self.assertEqual(self.client.get_log_events.call_args_list[2].kwargs['nextToken'], 'f/1')
+        self.client.filter_log_events.assert_not_called()
+
+
+class FakeTailer:
+    """Tailer returning one new event per poll and counting the polls."""
+
+    created = 0
+
+    def __init__(self, logs_client, log_group_name, log_stream_names=None, filter_pattern=None, start_time=None):
+        FakeTailer.created += 1
+        self.log_group_name = log_group_name
+        self.polls = 0
+
+    def poll(self):
+        self.polls += 1
+        return [{'eventId': str(self.polls), 'timestamp': self.polls, 'message': f'event {self.polls}'}]
+
+
+class TestTailHub(unittest.TestCase):
+    """Test cases for the TailHub class."""
+
+    def setUp(self):
+        """Set up a hub with fast polling and a fake tailer."""
+        FakeTailer.created = 0
+        self.hub = TailHub(MagicMock(), buffer_size=3, min_interval=0.01, max_interval=0.01,
+                           tailer_factory=FakeTailer)
+
+    def wait_for(self, condition, timeout=2.0):
+        """Wait until a condition holds."""
+        deadline = time.monotonic() + timeout
+        while not condition():
+            self.assertLess(time.monotonic(), deadline, 'condition not met in time')
+            time.sleep(0.01)
+
+    def test_viewers_of_a_log_group_share_one_poller(self):
+        """Test that several subscriptions to the same log group create a single poller."""
+        wake_event = threading.Event()
+        first = self.hub.subscribe('/aws/lambda/orders', wake_event=wake_event)
+        second = self.hub.subscribe('/aws/lambda/orders')
+        other = self.hub.subscribe('/aws/lambda/orders', filter_pattern='ERROR')
+
+        self.assertTrue(wake_event.wait(1))
+        self.assertEqual(FakeTailer.created, 2)
+        stats = self.hub.get_stats()
+        self.assertEqual(stats['pollers'], 2)
+        self.assertEqual(stats['subscribers'], 3)
+
+        for subscription in (first, second, other):
+            self.hub.unsubscribe(subscription)
+
+    def test_slow_viewer_drops_oldest_events(self):
+        """Test that a full ring buffer drops the oldest events and counts them."""
+        subscription = self.hub.subscribe('/aws/lambda/orders')
+        self.wait_for(lambda: subscription.dropped > 0)
+
+        events, errors = subscription.drain()
+        self.assertLessEqual(len(events), 3)
+        self.assertEqual(events, sorted(events, key=lambda event: event['timestamp']))
+        self.assertEqual(errors, [])
+        self.assertGreater(self.hub.get_stats()['dropped'], 0)
+        self.hub.unsubscribe(subscription)
+
+    def test_poller_stops_when_last_viewer_leaves(self):
+        """Test that the poller is removed once its last subscription is gone."""
+        first = self.hub.subscribe('/aws/lambda/orders')
+        second = self.hub.subscribe('/aws/lambda/orders')
+        poller = first.poller
+
+        self.hub.unsubscribe(first)
+        self.assertEqual(self.hub.get_stats()['pollers'], 1)
+        self.hub.unsubscribe(second)
+        self.assertEqual(self.hub.get_stats()['pollers'], 0)
+
+        polls = poller.polls
+        time.sleep(0.05)
+        self.assertLessEqual(poller.polls, polls + 1)
+
+        # A new viewer starts a fresh poller
+        third = self.hub.subscribe('/aws/lambda/orders')
+        self.assertIsNot(third.poller, poller)
+        self.hub.unsubscribe(third)
+
+
+if __name__ == '__main__':
+    unittest.main()
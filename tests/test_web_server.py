@@ -0,0 +1,105 @@
+"""
+Tests for the EventBridge Explorer web server.
+"""
+
+import socket
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+from eventbridge import clients
+from eventbridge.core import EventBridgeExplorer
+from eventbridge.fake_aws import FakeAWSBackend
+from eventbridge.web_server import EventBridgeWebServer
+
+
+class TestWebServer(unittest.TestCase):
+    """Test cases for the web server routes."""
+
+    def setUp(self):
+        """Set up a server on a fake account whose Insights queries never finish on their own."""
+        self.backend = FakeAWSBackend(query_latency=60)
+        self.backend.add_log_events('/aws/lambda/app', 'stream', [(int(time.time() * 1000) - 1000, 'ERROR boom')])
+        self.backend.install(clients.registry)
+        self.server = EventBridgeWebServer(explorer=EventBridgeExplorer(query_timeout=30))
+        self.client = self.server.app.test_client()
+
+    def tearDown(self):
+        """Give the shared client registry back to boto3."""
+        clients.registry.client_factory = None
+        clients.registry.clear()
+
+    def test_disconnect_stops_the_query(self):
+        """Test that an Insights query is stopped once the requesting client disconnects."""
+        connection, peer = socket.socketpair()
+        self.addCleanup(connection.close)
+        threading.Timer(0.2, peer.close).start()
+
+        started = time.monotonic()
+        response = self.client.post('/api/search_logs', environ_base={'werkzeug.socket': connection}, json={
+            'targetArn': 'arn:aws:lambda:us-east-1:123456789012:function:app',
+            'searchTerm': 'ERROR',
+            'engine': 'insights'
+        })
+
+        self.assertLess(time.monotonic() - started, 10)
+        self.assertFalse(response.get_json()['success'])
+        self.assertEqual(self.backend.get_stats()['calls'].get('stop_query'), 1)
+        self.assertEqual([query['status'] for query in self.backend.queries.values()], ['Cancelled'])
+
+    def test_tail_rejects_invalid_since(self):
+        """Test that a since value that is not a number of seconds is a bad request."""
+        for since in ('abc', '-5', 'nan'):
+            with self.subTest(since=since):
+                response = self.client.get('/api/tail', query_string={'logGroup': '/aws/lambda/app', 'since': since})
+
+                self.assertEqual(response.status_code, 400)
+                self.assertFalse(response.get_json()['success'])
+
+    def test_graph_with_logs_treats_null_rules_as_all_rules(self):
+        """Test that "rules": null selects every rule like a missing selection does."""
+        self.backend.add_rule('default', 'orders', {'source': ['orders']}, ['arn:aws:sqs:us-east-1:1:queue'])
+
+        response = self.client.post('/api/graph/with-logs', json={'event_bus': 'default', 'rules': None})
+
+        self.assertEqual(response.status_code, 200)
+        node_ids = {element['data']['id'] for element in response.get_json()['data']['elements']['nodes']}
+        self.assertIn('orders', node_ids)
+
+    def test_failed_export_aborts_the_download(self):
+        """Test that an export failing midway ends the response with an error instead of a short file."""
+        exporter = MagicMock(query='query')
+
+        def export(start_time, end_time, checkpoint=None):
+            yield b'first member'
+            raise RuntimeError('slice query failed')
+
+        exporter.export.side_effect = export
+        with patch.object(self.server.explorer, 'create_log_exporter', return_value=exporter):
+            response = self.client.post('/api/export_logs', buffered=False, json={
+                'logGroup': '/aws/lambda/app', 'startTime': 100, 'endTime': 200})
+            chunks = response.iter_encoded()
+
+            self.assertEqual(next(chunks), b'first member')
+            with self.assertRaises(RuntimeError):
+                next(chunks)
+
+    def test_export_resumes_from_a_timestamp(self):
+        """Test that resumeFrom starts the export at that second of the original range."""
+        exporter = MagicMock(query='query')
+        exporter.export.return_value = iter([b'rest'])
+        with patch.object(self.server.explorer, 'create_log_exporter', return_value=exporter):
+            response = self.client.post('/api/export_logs', json={
+                'logGroup': '/aws/lambda/app', 'startTime': 100, 'endTime': 200, 'resumeFrom': 150})
+            invalid = self.client.post('/api/export_logs', json={
+                'logGroup': '/aws/lambda/app', 'startTime': 100, 'endTime': 200, 'resumeFrom': 250})
+
+        self.assertEqual(response.data, b'rest')
+        self.assertEqual(exporter.export.call_args.args, (100, 200))
+        self.assertEqual(exporter.export.call_args.kwargs['checkpoint']['cursor'], 150)
+        self.assertEqual(invalid.status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()